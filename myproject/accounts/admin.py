@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, DailyRecord, Transaction
+from .models import Category, CustomUser, DailyRecord, Transaction
 
 # Đăng ký CustomUser với UserAdmin
 admin.site.register(CustomUser, UserAdmin)
@@ -16,5 +16,12 @@ class DailyRecordAdmin(admin.ModelAdmin):
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('daily_record', 'type', 'category', 'amount', 'created_at')
-    list_filter = ('type', 'category', 'daily_record__user')
-    search_fields = ('daily_record__user__username', 'category')
\ No newline at end of file
+    list_filter = ('type', 'user')
+    search_fields = ('user__username', 'category__key')
+    list_select_related = ('daily_record__user', 'category')
+
+# Đăng ký Category
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'user')
+    search_fields = ('key', 'user__username')
\ No newline at end of file
@@ -0,0 +1,106 @@
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.utils.encoders import JSONEncoder
+from core.services.transaction_cache import TransactionCacheService
+from core.services.token_cache import TokenCacheService
+from .views import format_data_version_etag
+
+# Async views served by the ASGI profile (gunicorn + uvicorn workers, see docker-compose).
+# DRF views are synchronous, so these plain Django views reproduce the parts of DRF they
+# need: token authentication, the permission responses and JSON rendering of Decimals.
+
+def api_response(data, status=200) -> JsonResponse:
+    """JSON response rendered like DRF's (Decimals as numbers, dates as ISO strings)"""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, json_dumps_params={'ensure_ascii': False})
+
+async def authenticate_token(request):
+    """
+    Async CachedTokenAuthentication: "Authorization: Token <key>" -> active user
+    Returns: user, None when the request carries no token
+    Raises: AuthenticationFailed with DRF's messages
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return None
+    if len(auth) == 1:
+        raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+    if len(auth) > 2:
+        raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed(
+            _('Invalid token header. Token string should not contain invalid characters.'))
+
+    user = await TokenCacheService.aget_user(key)
+    if user is None:
+        raise exceptions.AuthenticationFailed(_('Invalid token.'))
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+    return user
+
+class AsyncTokenAuthenticatedView(View):
+    """
+    Base async view: token authentication and IsAuthenticated / IsAdminUser checks,
+    answered with DRF's status codes and bodies
+    """
+    admin_only = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await authenticate_token(request)
+        except exceptions.AuthenticationFailed as e:
+            return self.unauthorized(e.detail)
+        if user is None:
+            return self.unauthorized(exceptions.NotAuthenticated.default_detail)
+        if self.admin_only and not user.is_staff:
+            return api_response({'detail': exceptions.PermissionDenied.default_detail}, status=403)
+
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def unauthorized(detail) -> JsonResponse:
+        response = api_response({'detail': detail}, status=401)
+        response['WWW-Authenticate'] = 'Token'
+        return response
+
+class AsyncDashboardView(AsyncTokenAuthenticatedView):
+    async def get(self, request):
+        """
+        Async DashboardView: same payload and conditional GET (data version ETag),
+        a matching If-None-Match gets a 304 from one cache read
+        """
+        version = await TransactionCacheService.aget_data_version(request.user.id)
+        if version is None:
+            # No data version to compare against: always answer with the payload
+            return await self.dashboard(request)
+
+        etag = quote_etag(format_data_version_etag(request, version, 'json'))
+        response = get_conditional_response(request, etag=etag) or await self.dashboard(request)
+        response['ETag'] = etag
+        return response
+
+    @staticmethod
+    async def dashboard(request) -> JsonResponse:
+        return api_response({
+            'status': 'success',
+            'data': await TransactionCacheService.aget_user_totals(request.user.id)
+        })
+
+class AsyncSystemStatsView(AsyncTokenAuthenticatedView):
+    admin_only = True
+
+    async def get(self, request):
+        """Async SystemStatsView (admin only)"""
+        system_totals = await TransactionCacheService.aget_system_totals()
+
+        return api_response({
+            'status': 'success',
+            'data': system_totals
+        })
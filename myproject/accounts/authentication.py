@@ -0,0 +1,21 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from core.services.token_cache import TokenCacheService
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication resolving the token through TokenCacheService
+    (in-process LRU, then the cache), so an authenticated request usually
+    runs no authentication query
+    request.auth is the token key instead of the Token instance
+    """
+
+    def authenticate_credentials(self, key):
+        user = TokenCacheService.get_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (user, key)
@@ -0,0 +1,47 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+from accounts.models import DailyRecord, Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Set Transaction.user to its daily record's user where they differ, in short per-batch "
+        "transactions. Safe to run against a live database and to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50000, help="Transaction ids updated per transaction")
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between batches, to leave room for the live workload")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        start_time = time.monotonic()
+        bounds = Transaction.objects.aggregate(first=Min('id'), last=Max('id'))
+        updated = 0
+        if bounds['first'] is not None:
+            for start_id in range(bounds['first'], bounds['last'] + 1, batch_size):
+                # Autocommit: every batch is its own short transaction
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"""
+                        UPDATE {Transaction._meta.db_table} t
+                        SET user_id = dr.user_id
+                        FROM {DailyRecord._meta.db_table} dr
+                        WHERE dr.id = t.daily_record_id
+                          AND t.id >= %s AND t.id < %s
+                          AND t.user_id IS DISTINCT FROM dr.user_id
+                        """,
+                        [start_id, start_id + batch_size]
+                    )
+                    updated += cursor.rowcount
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(self.style.SUCCESS(f"Updated the user of {updated} transactions in {elapsed:.2f}s"))
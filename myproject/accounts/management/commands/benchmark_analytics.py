@@ -0,0 +1,88 @@
+import json
+import statistics
+import time
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import CustomUser, Transaction
+from core.services.spending_analytics import SpendingAnalyticsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark SpendingAnalyticsService over histories of increasing length, one generated user "
+        "per length. Reports the load (values_list -> NumPy) and compute times and the time per "
+        "transaction, which stays flat when the cost is linear in the history length."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', default='1,2,5,10,15',
+                            help="Comma-separated history lengths in years, one user each")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=date(2025, 6, 30),
+                            help="Last day of every history, also the `today` of the analytics")
+        parser.add_argument('--seed', type=int, default=42, help="Seed of the generated histories")
+        parser.add_argument('--username-prefix', default='analytics', help="Users are <prefix><years>y1")
+        parser.add_argument('--provision', action='store_true',
+                            help="Generate the missing users (generate_fake_data) first")
+        parser.add_argument('--iterations', type=int, default=10, help="Measured runs per history length")
+        parser.add_argument('--output', help="Where to write the JSON results")
+
+    def handle(self, *args, **options):
+        try:
+            lengths = sorted({int(value) for value in options['years'].split(',')})
+        except ValueError:
+            raise CommandError("--years must be comma-separated integers")
+        if not lengths or lengths[0] < 1 or options['iterations'] < 1:
+            raise CommandError("--years and --iterations must be positive")
+
+        results = [self.run_length(years, options) for years in lengths]
+
+        self.stdout.write(f"{'years':>5} {'transactions':>12} {'load ms':>9} {'compute ms':>10} {'us/transaction':>14}")
+        for result in results:
+            self.stdout.write(
+                f"{result['years']:>5} {result['transactions']:>12,} {result['load_ms']:>9.2f} "
+                f"{result['compute_ms']:>10.2f} {result['us_per_transaction']:>14.3f}"
+            )
+        # Linear scaling: the cost per transaction of the longest history stays close to the shortest's
+        ratio = results[-1]['us_per_transaction'] / results[0]['us_per_transaction']
+        self.stdout.write(f"Cost per transaction, {lengths[-1]} vs {lengths[0]} years: x{ratio:.2f}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'end_date': options['end_date'].isoformat(), 'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_length(self, years, options):
+        prefix = f"{options['username_prefix']}{years}y"
+        user = CustomUser.objects.filter(username=f"{prefix}1").first()
+        if user is None:
+            if not options['provision']:
+                raise CommandError(f"No user {prefix}1, run with --provision to generate the histories")
+            call_command(
+                'generate_fake_data', '--users', '1', '--days', str(years * 365),
+                '--end-date', options['end_date'].isoformat(), '--seed', str(options['seed']),
+                '--username-prefix', prefix, '--workers', '1', stdout=self.stdout, stderr=self.stderr
+            )
+            user = CustomUser.objects.get(username=f"{prefix}1")
+
+        # One unmeasured run warms the connection and the plan cache
+        SpendingAnalyticsService.compute(SpendingAnalyticsService.load(user.id), options['end_date'])
+
+        load_times, compute_times = [], []
+        for _ in range(options['iterations']):
+            start = time.perf_counter()
+            history = SpendingAnalyticsService.load(user.id)
+            loaded = time.perf_counter()
+            SpendingAnalyticsService.compute(history, options['end_date'])
+            load_times.append((loaded - start) * 1000)
+            compute_times.append((time.perf_counter() - loaded) * 1000)
+
+        transactions = Transaction.objects.filter(user_id=user.id).count()
+        load_ms, compute_ms = statistics.median(load_times), statistics.median(compute_times)
+        return {
+            'years': years,
+            'transactions': transactions,
+            'load_ms': round(load_ms, 3),
+            'compute_ms': round(compute_ms, 3),
+            'us_per_transaction': round((load_ms + compute_ms) * 1000 / transactions, 3) if transactions else 0,
+        }
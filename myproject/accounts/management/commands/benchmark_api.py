@@ -0,0 +1,215 @@
+import json
+import math
+import random
+import subprocess
+import time
+from copy import copy
+from datetime import date, datetime, timezone
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from accounts.models import CustomUser, Transaction
+from core.services.redis_cache import RedisCacheService
+from core.services.transaction_cache import TransactionCacheService
+
+# (name, path, query params) of the benchmarked endpoints, params are filled per run
+ENDPOINTS = (
+    ('dashboard', '/api/dashboard/', {}),
+    ('system_stats', '/api/system-stats/', {}),
+    ('monthly', '/api/transactions/monthly/', {'month': None, 'year': None}),
+    ('daily_expenses', '/api/transactions/daily-expenses/', {'month': None, 'year': None}),
+    ('transactions_list', '/api/transactions/', {'page_size': 50}),
+    ('daily_records_list', '/api/daily-records/', {'page_size': 50}),
+)
+MODES = ('cold', 'warm')
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API endpoints through the Django test client over a generated dataset. "
+        "Reports p50/p95/p99 latency, query counts and cache hit ratios with cold and warm caches, "
+        "and writes the results as JSON (compare two runs with --compare)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help="Users of the benchmark dataset")
+        parser.add_argument('--days', type=int, default=90, help="Days of history per user")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=date(2025, 6, 30),
+                            help="Last day of history, the month benchmarked by monthly/daily_expenses")
+        parser.add_argument('--seed', type=int, default=42, help="Seed of the dataset and of the sampled users")
+        parser.add_argument('--username-prefix', default='bench', help="Usernames of the benchmark dataset")
+        parser.add_argument('--provision', action='store_true',
+                            help="Generate the dataset (generate_fake_data) when it does not exist yet")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes used to provision")
+        parser.add_argument('--sample-users', type=int, default=10, help="Users the requests are spread over")
+        parser.add_argument('--iterations', type=int, default=50, help="Measured requests per endpoint and mode")
+        parser.add_argument('--output', default='benchmark-results.json', help="Where to write the JSON results")
+        parser.add_argument('--compare', help="Earlier JSON results to compare against")
+
+    def handle(self, *args, **options):
+        prefix = options['username_prefix']
+        users = CustomUser.objects.filter(username__startswith=prefix)
+        if not users.exists():
+            if not options['provision']:
+                raise CommandError(f"No {prefix}<n> users, run with --provision to generate the dataset")
+            self.provision(options)
+
+        rng = random.Random(options['seed'])
+        user_ids = sorted(users.values_list('id', flat=True))
+        sample = list(CustomUser.objects.filter(
+            id__in=rng.sample(user_ids, min(options['sample_users'], len(user_ids)))
+        ).order_by('id'))
+
+        # The test client's host must pass ALLOWED_HOSTS
+        with override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+            results = {
+                name: {mode: self.run_endpoint(name, path, params, sample, mode, options) for mode in MODES}
+                for name, path, params in ENDPOINTS
+            }
+
+        report = {
+            'meta': {
+                'commit': self.git_commit(),
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'dataset': {
+                    'username_prefix': prefix,
+                    'users': len(user_ids),
+                    'transactions': Transaction.objects.filter(user_id__in=user_ids).count(),
+                    'end_date': options['end_date'].isoformat(),
+                    'seed': options['seed'],
+                },
+                'sample_users': len(sample),
+                'iterations': options['iterations'],
+                'database': connection.vendor,
+                'cache_backend': settings.CACHES['default']['BACKEND'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.print_results(results)
+        if options['compare']:
+            self.print_comparison(options['compare'], results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def provision(self, options):
+        args = [
+            '--users', str(options['users']),
+            '--days', str(options['days']),
+            '--end-date', options['end_date'].isoformat(),
+            '--seed', str(options['seed']),
+            '--username-prefix', options['username_prefix'],
+        ]
+        if options['workers']:
+            args += ['--workers', str(options['workers'])]
+        call_command('generate_fake_data', *args, stdout=self.stdout, stderr=self.stderr)
+
+    def run_endpoint(self, name, path, params, sample, mode, options):
+        """
+        Request one endpoint `iterations` times, round-robin over the sampled users
+        cold: the user's and the system cache namespaces are invalidated before every request
+        warm: every user's request is made once, unmeasured, before measuring
+        """
+        end_date = options['end_date']
+        params = {
+            key: value if value is not None else getattr(end_date, key)
+            for key, value in params.items()
+        }
+        clients = [self.client_for(user, staff=name == 'system_stats') for user in sample]
+
+        if mode == 'warm':
+            for client in clients:
+                client.get(path, params)
+
+        latencies, query_counts = [], []
+        cache_stats = {'hit': 0, 'stale_hit': 0, 'miss': 0}
+        errors = 0
+        for iteration in range(options['iterations']):
+            index = iteration % len(sample)
+            if mode == 'cold':
+                TransactionCacheService.invalidate_user_cache(sample[index].id)
+                TransactionCacheService.invalidate_system_cache()
+
+            RedisCacheService.reset_stats()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = clients[index].get(path, params)
+                latencies.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+            for outcome, count in RedisCacheService.get_stats().items():
+                cache_stats[outcome] += count
+            if response.status_code != 200:
+                errors += 1
+
+        lookups = sum(cache_stats.values())
+        return {
+            'samples': len(latencies),
+            'errors': errors,
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries_mean': round(sum(query_counts) / len(query_counts), 2),
+            'queries_max': max(query_counts),
+            'cache_lookups': lookups,
+            'cache_hit_ratio': round((cache_stats['hit'] + cache_stats['stale_hit']) / lookups, 3) if lookups else None,
+        }
+
+    def client_for(self, user, staff=False):
+        client = APIClient()
+        if staff:
+            # Admin-only endpoints: authenticate a staff copy, the stored user is left unchanged
+            user = copy(user)
+            user.is_staff = True
+        client.force_authenticate(user=user)
+        return client
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'endpoint':<20} {'mode':<5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'hit ratio':>9}"
+        )
+        for name, modes in results.items():
+            for mode, result in modes.items():
+                hit_ratio = '-' if result['cache_hit_ratio'] is None else f"{result['cache_hit_ratio']:.2f}"
+                self.stdout.write(
+                    f"{name:<20} {mode:<5} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['queries_mean']:>8.2f} {hit_ratio:>9}"
+                )
+
+    def print_comparison(self, path, results):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        self.stdout.write(f"\nCompared to {baseline['meta'].get('commit') or path}:")
+        self.stdout.write(f"{'endpoint':<20} {'mode':<5} {'p95 ms':>16} {'change':>8} {'queries':>14}")
+        for name, modes in results.items():
+            for mode, result in modes.items():
+                before = baseline['results'].get(name, {}).get(mode)
+                if not before:
+                    continue
+                change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+                self.stdout.write(
+                    f"{name:<20} {mode:<5} {before['p95_ms']:>7.2f} -> {result['p95_ms']:>6.2f} {change:>+7.1f}% "
+                    f"{before['queries_mean']:>5.1f} -> {result['queries_mean']:>5.1f}"
+                )
@@ -0,0 +1,107 @@
+import json
+import statistics
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from accounts.authentication import CachedTokenAuthentication
+from accounts.models import CustomUser
+from accounts.views import DashboardView, TransactionViewSet
+from core.services.token_cache import TokenCacheService
+from .benchmark_api import percentile
+
+# (name, path, query params, view) of the benchmarked token-authenticated requests
+ENDPOINTS = (
+    ('dashboard', '/api/dashboard/', {}, DashboardView),
+    ('monthly', '/api/transactions/monthly/', {'month': 6, 'year': 2025}, TransactionViewSet),
+)
+# mode: (authentication class, clear this process's LRU before every request)
+MODES = {
+    'token': (TokenAuthentication, False),
+    'cached_shared': (CachedTokenAuthentication, True),
+    'cached_local': (CachedTokenAuthentication, False),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark token authentication: the same token-authenticated requests with DRF's "
+        "TokenAuthentication and with CachedTokenAuthentication (shared cache only, and with "
+        "the in-process LRU). Reports queries and latency per request. Runs on a temporary "
+        "user that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help="Measured requests per endpoint and mode")
+        parser.add_argument('--output', help="Where to write the JSON results")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be positive")
+
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(username=f"bench-auth-{time.time_ns()}", password=None)
+            token = Token.objects.create(user=user)
+            results = {
+                name: {mode: self.run_endpoint(path, params, view, token.key, mode, options) for mode in MODES}
+                for name, path, params, view in ENDPOINTS
+            }
+            transaction.set_rollback(True)
+        TokenCacheService.forget([token.key])
+
+        self.stdout.write(f"{'endpoint':<10} {'mode':<14} {'queries':>8} {'auth queries':>12} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, modes in results.items():
+            for mode, result in modes.items():
+                self.stdout.write(
+                    f"{name:<10} {mode:<14} {result['queries_mean']:>8.2f} {result['auth_queries_mean']:>12.2f} "
+                    f"{result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'date': date.today().isoformat(), 'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_endpoint(self, path, params, view_class, key, mode, options):
+        """
+        Request one endpoint `iterations` times with one authentication mode
+        One unmeasured request first fills the endpoint's and the token's caches
+        """
+        authentication_class, clear_local = MODES[mode]
+        initkwargs = {'authentication_classes': [authentication_class]}
+        if view_class is TransactionViewSet:
+            view = view_class.as_view({'get': path.strip('/').split('/')[-1]}, **initkwargs)
+        else:
+            view = view_class.as_view(**initkwargs)
+        factory = RequestFactory()
+
+        def request():
+            return view(factory.get(path, params, HTTP_AUTHORIZATION=f"Token {key}"))
+
+        TokenCacheService.forget([key])
+        request()
+
+        latencies, query_counts, auth_query_counts = [], [], []
+        for _ in range(options['iterations']):
+            if clear_local:
+                TokenCacheService.clear_local()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{path} answered {response.status_code} in mode {mode}")
+            query_counts.append(len(queries))
+            auth_query_counts.append(sum('authtoken_token' in query['sql'] for query in queries.captured_queries))
+
+        return {
+            'samples': len(latencies),
+            'queries_mean': round(statistics.mean(query_counts), 2),
+            'auth_queries_mean': round(statistics.mean(auth_query_counts), 2),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+        }
@@ -0,0 +1,153 @@
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from faker import Faker
+from tqdm import tqdm
+from accounts.models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from core.services.transaction_cache import TransactionCacheService
+from core.services.transaction_import import TransactionImportService
+
+# (type, category, min amount, max amount) of the transactions generated for every day
+DAILY_TRANSACTIONS = (
+    ('income', 'salary', 30, 60),
+    ('income', 'coffeeSales', 10, 40),
+    ('expense', 'transport', 15, 30),
+    ('expense', 'food', 15, 50),
+)
+
+def generate_shard(shard_index, user_ids, days, end_date, seed):
+    """
+    Generate the transactions of a shard of users and load them with COPY
+    Runs in a worker process: the random stream only depends on (seed, shard_index)
+    """
+    rng = random.Random(f"{seed}:{shard_index}")
+    dates = [end_date - timedelta(days=offset) for offset in range(days)]
+
+    rows = (
+        (user_id, day, type, category, round(rng.uniform(low, high), 2))
+        for user_id in user_ids
+        for day in dates
+        for type, category, low, high in DAILY_TRANSACTIONS
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        TransactionImportService.create_staging(cursor)
+        TransactionImportService.copy_rows(cursor, rows)
+        return TransactionImportService.merge(cursor)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset for load testing: users with one DailyRecord per day and "
+        f"{len(DAILY_TRANSACTIONS)} transactions per record. Shards of users are generated in parallel "
+        "worker processes and loaded with COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help="Number of users to create")
+        parser.add_argument('--days', type=int, default=365, help="Days of history per user")
+        parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                            help="Last day of history, YYYY-MM-DD (default: today)")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, same seed gives the same dataset")
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help="Worker processes, 1 generates in-process")
+        parser.add_argument('--shard-size', type=int, default=250, help="Users per generated shard")
+        parser.add_argument('--username-prefix', default='customer', help="Generated usernames are <prefix><n>")
+        parser.add_argument('--password', default='password123', help="Password of every generated user")
+        parser.add_argument('--reset', action='store_true',
+                            help="Delete all transactions, daily records and previously generated users first")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['days'] < 1 or options['shard_size'] < 1 or options['workers'] < 1:
+            raise CommandError("--users, --days, --shard-size and --workers must be positive")
+
+        start_time = time.monotonic()
+        prefix = options['username_prefix']
+        end_date = options['end_date'] or date.today()
+
+        if options['reset']:
+            self.reset(prefix)
+
+        user_ids = self.create_users(options['users'], prefix, options['password'], options['seed'])
+        shard_size = options['shard_size']
+        shards = [user_ids[i:i + shard_size] for i in range(0, len(user_ids), shard_size)]
+
+        totals = {'daily_records_created': 0, 'transactions_created': 0}
+        for result in self.run_shards(shards, options['days'], end_date, options['seed'], options['workers']):
+            for key in totals:
+                totals[key] += result[key]
+
+        TransactionCacheService.invalidate_all_cache()
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(user_ids)} users, {totals['daily_records_created']} daily records and "
+            f"{totals['transactions_created']} transactions in {elapsed:.2f}s "
+            f"({totals['transactions_created'] / elapsed if elapsed else 0:,.0f} transactions/s)"
+        ))
+
+    def reset(self, prefix):
+        self.stdout.write("Deleting existing data...")
+        tables = [model._meta.db_table for model in (Transaction, UserMonthlySummary, DailyRecord)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(tables)}")
+        CustomUser.objects.filter(username__startswith=prefix, is_superuser=False).delete()
+        # Cached totals of the remaining users now count truncated transactions
+        for user_id in CustomUser.objects.values_list('id', flat=True).iterator():
+            TransactionCacheService.invalidate_user_cache(user_id)
+
+    def create_users(self, num_users, prefix, password, seed):
+        """
+        bulk_create the users, all sharing one password hash
+        Returns: ids of the created users
+        """
+        usernames = [f"{prefix}{n}" for n in range(1, num_users + 1)]
+        if CustomUser.objects.filter(username__in=usernames).exists():
+            raise CommandError(f"Users named {prefix}<n> already exist, use --reset or another --username-prefix")
+
+        fake = Faker()
+        fake.seed_instance(seed)
+        # Hashing is deliberately slow: hash once, reuse for every user
+        password_hash = make_password(password)
+
+        users = [
+            CustomUser(
+                username=username,
+                email=fake.email(),
+                password=password_hash,
+                first_name=fake.first_name(),
+                last_name=fake.last_name()
+            )
+            for username in tqdm(usernames, desc="Creating users", file=self.stderr)
+        ]
+        CustomUser.objects.bulk_create(users, batch_size=1000)
+        return [user.id for user in users]
+
+    def run_shards(self, shards, days, end_date, seed, workers):
+        """Yield the merge result of every shard"""
+        progress = tqdm(total=len(shards), desc="Generating shards", file=self.stderr)
+
+        if workers == 1:
+            for shard_index, user_ids in enumerate(shards):
+                yield generate_shard(shard_index, user_ids, days, end_date, seed)
+                progress.update()
+            progress.close()
+            return
+
+        # Forked workers must not share the parent's DB connection
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(generate_shard, shard_index, user_ids, days, end_date, seed)
+                for shard_index, user_ids in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+                progress.update()
+        progress.close()
@@ -0,0 +1,144 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from accounts.models import CustomUser
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.transaction_cache import TransactionCacheService
+from core.services.transaction_import import TransactionImportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Import transactions from a CSV file (columns: username or user_id, date, type, category, amount). "
+        "Rows are stream-parsed, loaded with COPY into a staging table and merged set-based; "
+        "invalid rows are written to a rejects file."
+    )
+
+    REQUIRED_COLUMNS = {'date', 'type', 'category', 'amount'}
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file to import")
+        parser.add_argument('--rejects', help="Where to write rejected rows (default: <path>.rejects.csv)")
+        parser.add_argument('--chunk-size', type=int, default=50000, help="Rows parsed and copied per COPY")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        rejects_path = options['rejects'] or f"{path}.rejects.csv"
+        chunk_size = options['chunk_size']
+
+        start_time = time.monotonic()
+        self.copied = 0
+        self.rejected = 0
+        self.rejects_file = None
+        self.rejects_writer = None
+
+        try:
+            with open(path, newline='', encoding='utf-8') as source, transaction.atomic():
+                reader = csv.DictReader(source)
+                self.check_columns(reader.fieldnames)
+
+                with connection.cursor() as cursor:
+                    TransactionImportService.create_staging(cursor)
+
+                    chunk = []
+                    for row in reader:
+                        chunk.append((reader.line_num, row))
+                        if len(chunk) >= chunk_size:
+                            self.load_chunk(cursor, chunk, reader.fieldnames, rejects_path)
+                            self.report_progress(start_time)
+                            chunk = []
+                    if chunk:
+                        self.load_chunk(cursor, chunk, reader.fieldnames, rejects_path)
+                        self.report_progress(start_time)
+
+                    load_time = time.monotonic()
+                    result = TransactionImportService.merge(cursor)
+                    deltas = TransactionImportService.cache_deltas(cursor)
+                    merge_time = time.monotonic() - load_time
+
+                transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(deltas))
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {path}")
+        finally:
+            if self.rejects_file:
+                self.rejects_file.close()
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['transactions_created']} transactions "
+            f"({result['daily_records_created']} new daily records) in {elapsed:.2f}s, "
+            f"{self.copied / elapsed if elapsed else 0:,.0f} rows/s, merge {merge_time:.2f}s"
+        ))
+        if self.rejected:
+            self.stdout.write(self.style.WARNING(f"Rejected {self.rejected} rows, see {rejects_path}"))
+
+    def check_columns(self, fieldnames):
+        columns = set(fieldnames or [])
+        missing = self.REQUIRED_COLUMNS - columns
+        if missing or not columns & {'username', 'user_id'}:
+            raise CommandError(
+                f"CSV must have the columns {', '.join(sorted(self.REQUIRED_COLUMNS))} and username or user_id"
+            )
+
+    def resolve_users(self, chunk):
+        """
+        Look up the chunk's users with one query
+        Returns: ({username: id}, {id: id})
+        """
+        usernames = set()
+        user_ids = set()
+        for _, row in chunk:
+            if row.get('username'):
+                usernames.add(row['username'].strip())
+            elif str(row.get('user_id') or '').strip().isdigit():
+                user_ids.add(int(row['user_id']))
+
+        by_username, by_id = {}, {}
+        if usernames or user_ids:
+            users = CustomUser.objects.filter(
+                Q(username__in=usernames) | Q(id__in=user_ids)
+            ).values_list('id', 'username')
+            for user_id, username in users:
+                by_username[username] = user_id
+                by_id[user_id] = user_id
+        return by_username, by_id
+
+    def load_chunk(self, cursor, chunk, fieldnames, rejects_path):
+        by_username, by_id = self.resolve_users(chunk)
+
+        rows = []
+        for line, row in chunk:
+            if row.get('username'):
+                user_id = by_username.get(row['username'].strip())
+            else:
+                raw_id = str(row.get('user_id') or '').strip()
+                user_id = by_id.get(int(raw_id)) if raw_id.isdigit() else None
+
+            clean_row, errors = BulkTransactionService.validate_row(row)
+            if user_id is None:
+                errors = [('user', "Unknown user")] + errors
+            if errors:
+                self.reject(rejects_path, fieldnames, line, row, errors)
+                continue
+            rows.append((user_id, clean_row['date'], clean_row['type'], clean_row['category'], clean_row['amount']))
+
+        self.copied += TransactionImportService.copy_rows(cursor, rows)
+
+    def reject(self, rejects_path, fieldnames, line, row, errors):
+        if self.rejects_writer is None:
+            self.rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8')
+            self.rejects_writer = csv.DictWriter(
+                self.rejects_file, fieldnames=['line'] + list(fieldnames) + ['error'], extrasaction='ignore')
+            self.rejects_writer.writeheader()
+        error = "; ".join(f"{field}: {message}" if field else message for field, message in errors)
+        self.rejects_writer.writerow({**row, 'line': line, 'error': error})
+        self.rejected += 1
+
+    def report_progress(self, start_time):
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(
+            f"Copied {self.copied:,} rows, rejected {self.rejected:,} "
+            f"({self.copied / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
@@ -0,0 +1,39 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.services.transaction_partitions import TransactionPartitionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the coming months' partitions of accounts_transaction and detach the partitions "
+        "past retention. Also run daily by the celery beat job of the same name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.TRANSACTION_PARTITION_MONTHS_AHEAD,
+                            help="Months ahead of the current one to create partitions for")
+        parser.add_argument('--retain-months', type=int, default=settings.TRANSACTION_PARTITION_RETENTION_MONTHS,
+                            help="Previous months to keep attached, 0 keeps every partition")
+        parser.add_argument('--list', action='store_true', help="Only list the attached partitions")
+
+    def handle(self, *args, **options):
+        if options['ahead'] < 0 or options['retain_months'] < 0:
+            raise CommandError("--ahead and --retain-months must not be negative")
+
+        if options['list']:
+            for name, start, end in TransactionPartitionService.get_partitions():
+                self.stdout.write(f"{name}: {start} to {end}")
+            return
+
+        start_time = time.monotonic()
+        created, detached = TransactionPartitionService.maintain(options['ahead'], options['retain_months'])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        for name in detached:
+            self.stdout.write(f"Detached {name}")
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created)} and detached {len(detached)} partitions in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,16 @@
+import time
+from django.core.management.base import BaseCommand
+from core.services.monthly_summary import MonthlySummaryService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the UserMonthlySummary rollup from accounts_transaction in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Only rebuild the summaries of this user id")
+
+    def handle(self, *args, **options):
+        start_time = time.monotonic()
+        rows = MonthlySummaryService.rebuild(user_id=options['user'])
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} monthly summary rows in {elapsed:.2f}s"))
@@ -0,0 +1,46 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.services.daily_totals import DailyTotalsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute DailyRecord.total_income / total_expense from their transactions and report the drift. "
+        "Runs one short transaction per id batch, so it can run against a live database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DailyTotalsService.BATCH_SIZE,
+                            help="Daily record ids recomputed per transaction")
+        parser.add_argument('--sleep', type=float, default=0,
+                            help="Seconds to pause between batches, to leave room for the live workload")
+        parser.add_argument('--dry-run', action='store_true', help="Only report the drift, do not fix it")
+        parser.add_argument('--show', type=int, default=20, help="Number of drifted records to list")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        start_time = time.monotonic()
+        batches = 0
+        drifted = 0
+        shown = 0
+
+        for start_id, end_id, rows in DailyTotalsService.reconcile(options['batch_size'], fix=not options['dry_run']):
+            batches += 1
+            drifted += len(rows)
+            for daily_record_id, stored_income, stored_expense, income, expense in rows:
+                if shown < options['show']:
+                    self.stdout.write(
+                        f"  daily record {daily_record_id}: income {stored_income} -> {income}, "
+                        f"expense {stored_expense} -> {expense}"
+                    )
+                    shown += 1
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - start_time
+        verb = "found" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {batches} batches in {elapsed:.2f}s, {verb} {drifted} drifted daily records"
+        ))
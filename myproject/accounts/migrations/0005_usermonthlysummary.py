@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_dailyrecord_accounts_da_user_id_70a2e5_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('type', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('category', models.CharField(max_length=50)),
+                ('total', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='usermonthlysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'year', 'month', 'type', 'category'), name='unique_user_monthly_summary'),
+        ),
+        # Backfill from existing transactions (same query as `manage.py rebuild_monthly_summaries`)
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO accounts_usermonthlysummary (user_id, year, month, type, category, total, count)
+                SELECT dr.user_id,
+                       EXTRACT(YEAR FROM t.date)::int,
+                       EXTRACT(MONTH FROM t.date)::int,
+                       t.type,
+                       t.category,
+                       SUM(t.amount),
+                       COUNT(*)
+                FROM accounts_transaction t
+                JOIN accounts_dailyrecord dr ON dr.id = t.daily_record_id
+                WHERE t.date IS NOT NULL
+                GROUP BY 1, 2, 3, 4, 5
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_usermonthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyrecord',
+            index=models.Index(fields=['user', 'date', 'id'], name='accounts_da_user_id_77d1d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date', 'id'], name='accounts_tr_date_e052da_idx'),
+        ),
+        # Superseded by the indexes above
+        migrations.RemoveIndex(
+            model_name='dailyrecord',
+            name='accounts_da_user_id_70a2e5_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='accounts_tr_date_4ebe57_idx',
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Convert accounts_transaction into a table range-partitioned by month on `date`.
+# Partitions are named accounts_transaction_pYYYY_MM; rows without a date (or outside
+# every partition) go to accounts_transaction_default. Future partitions are created
+# by `manage.py manage_transaction_partitions` / the beat job of the same name.
+#
+# Postgres requires the partition key in every unique index, and `date` is nullable,
+# so the table has no PRIMARY KEY: ids stay unique through the sequence and
+# (id, date) is unique. Postgres 13 (docker-compose) does not support identity
+# columns on partitioned tables, so `id` uses a plain sequence.
+#
+# The rows are copied, which rewrites the table once: on a large deployment run
+# it in a maintenance window.
+
+from django.db import migrations
+
+INDEXES = """
+    CREATE UNIQUE INDEX accounts_transaction_id_date_uniq ON accounts_transaction (id, date);
+    CREATE INDEX accounts_tr_daily_r_a40a63_idx ON accounts_transaction (daily_record_id, type);
+    CREATE INDEX accounts_tr_type_a5db8f_idx ON accounts_transaction (type, category);
+    CREATE INDEX accounts_tr_date_e052da_idx ON accounts_transaction (date, id);
+    CREATE INDEX accounts_transaction_daily_record_id_f98442a2 ON accounts_transaction (daily_record_id);
+    ALTER TABLE accounts_transaction
+        ADD CONSTRAINT accounts_transaction_daily_record_id_f98442a2_fk_accounts_
+        FOREIGN KEY (daily_record_id) REFERENCES accounts_dailyrecord (id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+PARTITION = """
+    CREATE SEQUENCE accounts_transaction_partitioned_id_seq;
+    CREATE TABLE accounts_transaction_partitioned (
+        id bigint NOT NULL DEFAULT nextval('accounts_transaction_partitioned_id_seq'),
+        type varchar(10) NOT NULL,
+        category varchar(50) NOT NULL,
+        amount numeric(10, 2) NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        daily_record_id bigint NOT NULL,
+        date date NULL
+    ) PARTITION BY RANGE (date);
+    CREATE TABLE accounts_transaction_default PARTITION OF accounts_transaction_partitioned DEFAULT;
+
+    -- One partition per month of the existing rows, through 3 months ahead
+    DO $$
+    DECLARE
+        month date := date_trunc('month', COALESCE(
+            (SELECT MIN(date) FROM accounts_transaction), CURRENT_DATE))::date;
+        last_month date := (date_trunc('month', CURRENT_DATE) + interval '3 months')::date;
+    BEGIN
+        WHILE month <= last_month LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF accounts_transaction_partitioned FOR VALUES FROM (%L) TO (%L)',
+                'accounts_transaction_p' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+            );
+            month := (month + interval '1 month')::date;
+        END LOOP;
+    END
+    $$;
+
+    INSERT INTO accounts_transaction_partitioned (id, type, category, amount, created_at, daily_record_id, date)
+    SELECT id, type, category, amount, created_at, daily_record_id, date FROM accounts_transaction;
+    SELECT setval('accounts_transaction_partitioned_id_seq',
+                  COALESCE((SELECT MAX(id) FROM accounts_transaction), 0) + 1, false);
+
+    DROP TABLE accounts_transaction;
+    ALTER TABLE accounts_transaction_partitioned RENAME TO accounts_transaction;
+    ALTER SEQUENCE accounts_transaction_partitioned_id_seq RENAME TO accounts_transaction_id_seq;
+    ALTER SEQUENCE accounts_transaction_id_seq OWNED BY accounts_transaction.id;
+""" + INDEXES + """
+    ANALYZE accounts_transaction;
+"""
+
+UNPARTITION = """
+    CREATE TABLE accounts_transaction_unpartitioned (
+        id bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        type varchar(10) NOT NULL,
+        category varchar(50) NOT NULL,
+        amount numeric(10, 2) NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        daily_record_id bigint NOT NULL,
+        date date NULL
+    );
+    INSERT INTO accounts_transaction_unpartitioned (id, type, category, amount, created_at, daily_record_id, date)
+    SELECT id, type, category, amount, created_at, daily_record_id, date FROM accounts_transaction;
+    SELECT setval(pg_get_serial_sequence('accounts_transaction_unpartitioned', 'id'),
+                  COALESCE((SELECT MAX(id) FROM accounts_transaction), 0) + 1, false);
+
+    DROP TABLE accounts_transaction;
+    ALTER TABLE accounts_transaction_unpartitioned RENAME TO accounts_transaction;
+    ALTER TABLE accounts_transaction RENAME CONSTRAINT accounts_transaction_unpartitioned_pkey TO accounts_transaction_pkey;
+    ALTER SEQUENCE accounts_transaction_unpartitioned_id_seq RENAME TO accounts_transaction_id_seq;
+""" + INDEXES.replace(
+    "CREATE UNIQUE INDEX accounts_transaction_id_date_uniq ON accounts_transaction (id, date);", ""
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_monthlyreportdelivery'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=PARTITION, reverse_sql=UNPARTITION),
+    ]
@@ -0,0 +1,117 @@
+# Denormalized Transaction.user (= daily_record.user) with a covering index for per-user totals.
+# Non-atomic: the column is added nullable, backfilled in short per-batch transactions
+# (same UPDATE as `manage.py backfill_transaction_users`), then made NOT NULL.
+# No step scans the table under ACCESS EXCLUSIVE: NOT NULL is proven by a CHECK validated
+# under SHARE UPDATE EXCLUSIVE, and the index is built concurrently partition by partition.
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 50000
+
+
+def backfill_users(apps, schema_editor):
+    Transaction = apps.get_model('accounts', 'Transaction')
+    bounds = Transaction.objects.aggregate(first=models.Min('id'), last=models.Max('id'))
+    if bounds['first'] is None:
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for start_id in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+            # Autocommit: every batch is its own short transaction
+            cursor.execute(
+                """
+                UPDATE accounts_transaction t
+                SET user_id = dr.user_id
+                FROM accounts_dailyrecord dr
+                WHERE dr.id = t.daily_record_id
+                  AND t.id >= %s AND t.id < %s
+                  AND t.user_id IS DISTINCT FROM dr.user_id
+                """,
+                [start_id, start_id + BATCH_SIZE]
+            )
+
+
+def set_not_null(table, column):
+    """
+    SET NOT NULL without a scan under ACCESS EXCLUSIVE: a NOT VALID check (no scan),
+    validated under SHARE UPDATE EXCLUSIVE (reads and writes go on), lets Postgres 12+
+    skip the scan of SET NOT NULL. Each statement is its own transaction (non-atomic migration)
+    """
+    check = f"{table}_{column}_not_null"
+    return migrations.RunSQL(
+        sql=[
+            f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({column} IS NOT NULL) NOT VALID",
+            f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}",
+            f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL",
+            f"ALTER TABLE {table} DROP CONSTRAINT {check}",
+        ],
+        reverse_sql=f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL",
+    )
+
+
+def add_transaction_index(index, columns, partition_suffix):
+    """
+    AddIndex for the partitioned accounts_transaction: CREATE INDEX CONCURRENTLY is not
+    supported on a partitioned table, so the index is created invalid ON ONLY the parent,
+    built concurrently on every partition and attached; it is valid once all are attached.
+    Later partitions get theirs from the parent (CREATE TABLE ... PARTITION OF)
+    Args:
+        columns: the index's column list SQL, as in Django's CREATE INDEX of `index`
+        partition_suffix: follows Postgres' naming of partition indexes, <partition>_<columns>_idx
+    """
+    def create(apps, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'accounts_transaction'::regclass ORDER BY c.relname"
+            )
+            partitions = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index.name} ON ONLY accounts_transaction {columns}")
+            for partition in partitions:
+                partition_index = f"{partition}_{partition_suffix}"
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {columns}")
+                cursor.execute(f"ALTER INDEX {index.name} ATTACH PARTITION {partition_index}")
+
+    def drop(apps, schema_editor):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[migrations.RunPython(create, drop)],
+        state_operations=[migrations.AddIndex(model_name='transaction', index=index)],
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0008_partition_transaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_users, migrations.RunPython.noop),
+        # SET NOT NULL only, AlterField would drop and re-validate the foreign key
+        migrations.SeparateDatabaseAndState(
+            database_operations=[set_not_null('accounts_transaction', 'user_id')],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        add_transaction_index(
+            models.Index(fields=['user', 'type', 'date'], include=('amount',), name='accounts_tr_user_type_date_idx'),
+            '(user_id, type, date) INCLUDE (amount)', 'user_id_type_date_amount_idx',
+        ),
+    ]
@@ -0,0 +1,253 @@
+# Normalize Transaction.category and UserMonthlySummary.category into the Category table.
+# Non-atomic like 0009: the transactions are backfilled in short per-batch transactions.
+# 1. Global categories for the app's defaults, per-user categories for every other
+#    (user, lowercase name) found in the transactions
+# 2. Transaction.category becomes a 4-byte reference to Category, indexed by (category, type)
+# 3. The monthly rollup is rebuilt keyed by category id
+#    (same query as `manage.py rebuild_monthly_summaries`)
+# Dropping the text column frees its space as rows are rewritten (new partitions right away,
+# older ones after VACUUM FULL / pg_repack of the partition).
+# Like 0009, NOT NULL is proven by a validated CHECK and the transaction index is built
+# concurrently per partition. The category table is created empty and the rollup's unique
+# constraint is added right after its rebuild: their indexes are built with plain DDL.
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+
+BATCH_SIZE = 50000
+
+DEFAULT_CATEGORIES = [('salary', 'salary'), ('coffeesales', 'coffeeSales'), ('transport', 'transport'), ('food', 'food')]
+
+
+def create_categories(apps, schema_editor):
+    Category = apps.get_model('accounts', 'Category')
+    Category.objects.bulk_create([Category(key=key, name=name) for key, name in DEFAULT_CATEGORIES])
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO accounts_category (user_id, key, name)
+            SELECT DISTINCT ON (user_id, lower(btrim(category_name)))
+                   user_id, lower(btrim(category_name)), btrim(category_name)
+            FROM accounts_transaction t
+            WHERE NOT EXISTS (
+                SELECT 1 FROM accounts_category g
+                WHERE g.user_id IS NULL AND g.key = lower(btrim(t.category_name))
+            )
+            ORDER BY user_id, lower(btrim(category_name)), btrim(category_name)
+            """
+        )
+
+
+def backfill_categories(apps, schema_editor):
+    Transaction = apps.get_model('accounts', 'Transaction')
+    bounds = Transaction.objects.aggregate(first=models.Min('id'), last=models.Max('id'))
+    if bounds['first'] is None:
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for start_id in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+            # Autocommit: every batch is its own short transaction. Exactly one category
+            # matches: user categories only exist for keys without a global category
+            cursor.execute(
+                """
+                UPDATE accounts_transaction t
+                SET category_id = c.id
+                FROM accounts_category c
+                WHERE c.key = lower(btrim(t.category_name))
+                  AND (c.user_id IS NULL OR c.user_id = t.user_id)
+                  AND t.id >= %s AND t.id < %s
+                """,
+                [start_id, start_id + BATCH_SIZE]
+            )
+
+
+def restore_category_names(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE accounts_transaction t
+            SET category_name = c.name
+            FROM accounts_category c
+            WHERE c.id = t.category_id
+            """
+        )
+
+
+def rebuild_summaries(column):
+    def rebuild(apps, schema_editor):
+        with transaction.atomic(), schema_editor.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM accounts_usermonthlysummary")
+            cursor.execute(
+                f"""
+                INSERT INTO accounts_usermonthlysummary (user_id, year, month, type, {column}, total, count)
+                SELECT t.user_id,
+                       EXTRACT(YEAR FROM t.date)::int,
+                       EXTRACT(MONTH FROM t.date)::int,
+                       t.type,
+                       t.{column},
+                       SUM(t.amount),
+                       COUNT(*)
+                FROM accounts_transaction t
+                WHERE t.date IS NOT NULL
+                GROUP BY 1, 2, 3, 4, 5
+                """
+            )
+    return rebuild
+
+
+def clear_summaries(apps, schema_editor):
+    # Reverse: the rows are rebuilt by category name at the end
+    apps.get_model('accounts', 'UserMonthlySummary').objects.all().delete()
+
+
+def set_not_null(model_name, table, field):
+    """
+    SET NOT NULL only: AlterField on a ForeignKey would drop and re-validate its constraint
+    A NOT VALID check validated under SHARE UPDATE EXCLUSIVE lets Postgres 12+ skip the
+    scan of SET NOT NULL under ACCESS EXCLUSIVE (see 0009)
+    """
+    check = f"{table}_category_id_not_null"
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                sql=[
+                    f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK (category_id IS NOT NULL) NOT VALID",
+                    f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}",
+                    f"ALTER TABLE {table} ALTER COLUMN category_id SET NOT NULL",
+                    f"ALTER TABLE {table} DROP CONSTRAINT {check}",
+                ],
+                reverse_sql=f"ALTER TABLE {table} ALTER COLUMN category_id DROP NOT NULL",
+            ),
+        ],
+        state_operations=[
+            migrations.AlterField(model_name=model_name, name='category', field=field),
+        ],
+    )
+
+
+def add_transaction_index(index, columns, partition_suffix):
+    """
+    AddIndex built concurrently on every partition of accounts_transaction and attached
+    to the index created ON ONLY the parent (see 0009)
+    """
+    def create(apps, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'accounts_transaction'::regclass ORDER BY c.relname"
+            )
+            partitions = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index.name} ON ONLY accounts_transaction {columns}")
+            for partition in partitions:
+                partition_index = f"{partition}_{partition_suffix}"
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {columns}")
+                cursor.execute(f"ALTER INDEX {index.name} ATTACH PARTITION {partition_index}")
+
+    def drop(apps, schema_editor):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[migrations.RunPython(create, drop)],
+        state_operations=[migrations.AddIndex(model_name='transaction', index=index)],
+    )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0009_transaction_user'),
+    ]
+
+    operations = [
+        # Reverse only: rebuild the text-keyed rollup once the text columns are back
+        migrations.RunPython(migrations.RunPython.noop, rebuild_summaries('category')),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=50)),
+                ('name', models.CharField(max_length=50)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='unique_user_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('key',), name='unique_global_category'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['key'], name='accounts_ca_key_4919fe_idx'),
+        ),
+
+        # Transaction.category
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='accounts_tr_type_a5db8f_idx',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='category',
+            new_name='category_name',
+        ),
+        # Nullable, so that reversing the RemoveField below can re-add it to a non-empty table
+        migrations.AlterField(
+            model_name='transaction',
+            name='category_name',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='accounts.category'),
+        ),
+        migrations.RunPython(create_categories, migrations.RunPython.noop),
+        migrations.RunPython(backfill_categories, restore_category_names),
+        set_not_null(
+            'transaction', 'accounts_transaction',
+            models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='accounts.category'),
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category_name',
+        ),
+        add_transaction_index(
+            models.Index(fields=['category', 'type'], name='accounts_tr_categor_6dad86_idx'),
+            '(category_id, type)', 'category_id_type_idx',
+        ),
+
+        # UserMonthlySummary.category, rebuilt from the transactions
+        migrations.RemoveConstraint(
+            model_name='usermonthlysummary',
+            name='unique_user_monthly_summary',
+        ),
+        migrations.RemoveField(
+            model_name='usermonthlysummary',
+            name='category',
+        ),
+        migrations.AddField(
+            model_name='usermonthlysummary',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='accounts.category'),
+        ),
+        migrations.RunPython(rebuild_summaries('category_id'), clear_summaries),
+        set_not_null(
+            'usermonthlysummary', 'accounts_usermonthlysummary',
+            models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='accounts.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='usermonthlysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'year', 'month', 'type', 'category'), name='unique_user_monthly_summary'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date', 'id'], include=('type', 'amount'), name='accounts_tr_user_date_id_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
-from django.db import models
+from django.db import models, transaction
 
 class CustomUser(AbstractUser):
     groups = models.ManyToManyField(
@@ -31,10 +31,35 @@ class DailyRecord(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=['user', 'date']),  # Composite index for user's daily records
+            models.Index(fields=['user', 'date', 'id']),  # Composite index for user's daily records, keyset pagination
             models.Index(fields=['date']),  # Index for date-based queries
         ]
 
+# Category Model
+class Category(models.Model):
+    """
+    Transaction category: global (user is NULL) or owned by one user.
+    `key` is the canonical lowercase name, unique per owner; a user's name resolves to the
+    global category of its key first (core.services.categories.CategoryService)
+    """
+    id = models.AutoField(primary_key=True)  # 4-byte reference from every transaction
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True, related_name="categories")
+    key = models.CharField(max_length=50)
+    name = models.CharField(max_length=50)  # Display name, as first entered
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name_plural = 'categories'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_user_category'),
+            models.UniqueConstraint(fields=['key'], condition=models.Q(user__isnull=True), name='unique_global_category'),
+        ]
+        indexes = [
+            models.Index(fields=['key']),  # Category filters across all users
+        ]
+
 # Transaction Model
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
@@ -43,8 +68,11 @@ class Transaction(models.Model):
     ]
 
     daily_record = models.ForeignKey(DailyRecord, on_delete=models.CASCADE, related_name="transactions")
+    # Denormalized daily_record.user, so per-user queries need no join (indexed by (user, type, date) below)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="transactions", db_index=False)
     type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
-    category = models.CharField(max_length=50)  # e.g., "food", "transport", "salary"
+    # e.g., "food", "transport", "salary"; RESTRICT: deletable together with its transactions only
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name="transactions", db_index=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
     date = models.DateField(null=True, blank=True)
@@ -52,9 +80,67 @@ class Transaction(models.Model):
     def __str__(self):
         return f"{self.type.capitalize()} - {self.category} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        # Always the daily record's owner; bulk writers set it in their own INSERTs
+        self.user_id = self.daily_record.user_id
+        # Run the save signals (monthly rollup) in the same DB transaction as the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         indexes = [
             models.Index(fields=['daily_record', 'type']),  # Composite index for daily record transactions
-            models.Index(fields=['type', 'category']),  # Index for type and category queries
-            models.Index(fields=['date']),  # Index for date-based queries
-        ]
\ No newline at end of file
+            models.Index(fields=['category', 'type']),  # Index for category (and type) filters
+            models.Index(fields=['date', 'id']),  # Index for date-based queries across users
+            # A user's keyset pages ordered by (date, id), and per-day totals of a date range as index-only scans
+            models.Index(fields=['user', 'date', 'id'], include=['type', 'amount'], name='accounts_tr_user_date_id_idx'),
+            # Covering index: per-user totals by type and date range as index-only scans
+            models.Index(fields=['user', 'type', 'date'], include=['amount'], name='accounts_tr_user_type_date_idx'),
+        ]
+
+# UserMonthlySummary Model
+class UserMonthlySummary(models.Model):
+    """
+    Rollup of a user's transactions per (year, month, type, category).
+    Maintained incrementally by accounts.signals, rebuilt by `manage.py rebuild_monthly_summaries`
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="monthly_summaries")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="monthly_summaries", db_index=False)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.year}/{self.month:02d} - {self.type} - {self.category_id}"
+
+    class Meta:
+        constraints = [
+            # Also serves the (user, year, month) lookups of the monthly endpoints
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'type', 'category'],
+                name='unique_user_monthly_summary',
+            ),
+        ]
+
+# MonthlyReportDelivery Model
+class MonthlyReportDelivery(models.Model):
+    """
+    Marks a user's monthly report as sent, so a retried report chunk skips it
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="monthly_report_deliveries")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.year}/{self.month:02d}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month'],
+                name='unique_monthly_report_delivery',
+            ),
+        ]
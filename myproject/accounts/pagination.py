@@ -0,0 +1,108 @@
+import base64
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by (date DESC, id DESC), newest first
+    The cursor holds the (date, id) of the last row of the page and the next page
+    starts strictly after it, so every page is one index range scan of
+    page_size + 1 rows: no OFFSET, no COUNT(*), deep pages cost the same as the first.
+    Rows with a NULL date (nullable ordering field only) come after all dated rows.
+    """
+    ordering_field = 'date'
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        field = self.ordering_field
+        model_field = queryset.model._meta.get_field(field)
+        nullable = model_field.null
+        position = self.decode_cursor(request, model_field)
+        limit = self.page_size + 1
+
+        if position is None:
+            dated = queryset.filter(**{f'{field}__isnull': False})
+            undated = queryset.filter(**{f'{field}__isnull': True})
+        elif position[0] is None:
+            # Already past the dated rows
+            dated = None
+            undated = queryset.filter(**{f'{field}__isnull': True, 'id__lt': position[1]})
+        else:
+            value, pk = position
+            # `field <= value` is the index range, the OR only trims rows of the same date
+            dated = queryset.filter(**{f'{field}__lte': value}).filter(
+                Q(**{f'{field}__lt': value}) | Q(id__lt=pk)
+            )
+            undated = queryset.filter(**{f'{field}__isnull': True})
+
+        rows = []
+        if dated is not None:
+            rows = list(dated.order_by(f'-{field}', '-id')[:limit])
+        if nullable and len(rows) < limit:
+            rows += list(undated.order_by('-id')[:limit - len(rows)])
+
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        cursor = self.encode_cursor(getattr(last, self.ordering_field), last.pk)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, value, pk):
+        raw = f"{value.isoformat() if value is not None else ''}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request, model_field):
+        """
+        Returns: (value, pk) of the last row of the previous page, None on the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+            return (model_field.to_python(value) if value else None), int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
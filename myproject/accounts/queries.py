@@ -1,11 +1,39 @@
-from django.db.models import Sum, Count, Avg, F, Q
+from decimal import Decimal
+from django.db.models import Sum, Count, Avg, F, Q, Value, DecimalField
+from django.db.models.functions import Coalesce
 from django.db import connection
 from .models import DailyRecord, Transaction, CustomUser
+from core.services.categories import CategoryService
 from datetime import datetime, timedelta, date
 import logging
 
 logger = logging.getLogger(__name__)
 
+def month_date_range(year: int, month: int):
+    """
+    Get the [start_date, end_date) range of a month
+    Filter with date__gte/date__lt instead of date__year/date__month: the
+    extract() functions hide the column from the planner, a plain range keeps
+    the (date) and (user, date) indexes usable
+    """
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1)
+    else:
+        end_date = date(year, month + 1, 1)
+    return start_date, end_date
+
+def income_expense_aggregates(field: str = 'amount'):
+    """
+    Conditional aggregates computing income and expense totals in a single pass
+    Usage: queryset.aggregate(**income_expense_aggregates())
+    """
+    zero = Value(Decimal('0'), output_field=DecimalField())
+    return {
+        'total_income': Coalesce(Sum(field, filter=Q(type='income')), zero),
+        'total_expense': Coalesce(Sum(field, filter=Q(type='expense')), zero),
+    }
+
 class DailyRecordQueries:
     @staticmethod
     def get_user_daily_records(user_id: int, start_date: date, end_date: date):
@@ -33,10 +61,11 @@ class DailyRecordQueries:
         Get monthly summary for a user
         Using index: (user, date)
         """
+        start_date, end_date = month_date_range(year, month)
         return DailyRecord.objects.filter(
             user_id=user_id,
-            date__year=year,
-            date__month=month
+            date__gte=start_date,
+            date__lt=end_date
         ).aggregate(
             total_income=Sum('total_income'),
             total_expense=Sum('total_expense')
@@ -57,12 +86,12 @@ class TransactionQueries:
     @staticmethod
     def get_transactions_by_type_and_category(transaction_type: str, category: str):
         """
-        Get transactions by type and category
-        Using index: (type, category)
+        Get transactions by type and category name, case-insensitive
+        Using indexes: Category (key), Transaction (category, type)
         """
         return Transaction.objects.filter(
             type=transaction_type,
-            category__iexact=category
+            category__key=CategoryService.normalize(category)
         ).select_related('daily_record', 'daily_record__user')
 
     @staticmethod
@@ -77,22 +106,33 @@ class TransactionQueries:
         ).select_related('daily_record', 'daily_record__user')
 
     @staticmethod
-    def get_user_transactions_summary(user_id: int, start_date: date, end_date: date):
+    def get_user_daily_totals(user_id: int, start_date: date, end_date: date):
         """
-        Get detailed transaction summary for a user
-        Using multiple indexes
+        Get income, expense and net per day for a user, end_date excluded
+        Using index: (user, type, date) INCLUDE (amount), index-only
         """
-        # Get daily records first (using user, date index)
-        daily_records = DailyRecord.objects.filter(
+        return Transaction.objects.filter(
             user_id=user_id,
             date__gte=start_date,
-            date__lte=end_date
-        ).values_list('id', flat=True)
+            date__lt=end_date
+        ).values('date').annotate(
+            **income_expense_aggregates()
+        ).annotate(
+            net_balance=F('total_income') - F('total_expense')
+        ).order_by('date')
 
-        # Then get transactions (using daily_record, type index)
+    @staticmethod
+    def get_user_transactions_summary(user_id: int, start_date: date, end_date: date):
+        """
+        Get the totals of a user per (type, category) between two dates, end_date included
+        One join-free aggregate on the denormalized owner
+        Using index: (user, type, date) INCLUDE (amount)
+        """
         return Transaction.objects.filter(
-            daily_record_id__in=daily_records
-        ).values('type', 'category').annotate(
+            user_id=user_id,
+            date__gte=start_date,
+            date__lte=end_date
+        ).values('type', 'category_id').annotate(
             total_amount=Sum('amount'),
             transaction_count=Count('id')
         ).order_by('-total_amount')
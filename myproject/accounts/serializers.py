@@ -2,10 +2,18 @@ from rest_framework import serializers
 from .models import DailyRecord, Transaction
 from django.contrib.auth import get_user_model
 from datetime import datetime
+from core.services.categories import CategoryService
+from core.services.request_metrics import RequestMetricsService
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """Report serialization time to the request metrics (Server-Timing, /metrics)"""
+    def to_representation(self, instance):
+        with RequestMetricsService.serializer_timer():
+            return super().to_representation(instance)
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'password')
@@ -17,17 +25,38 @@ class UserSerializer(serializers.ModelSerializer):
         )
         return user
     
-class DailyRecordSerializer(serializers.ModelSerializer):
+class DailyRecordSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField()  # Hiển thị username thay vì user_id
 
     class Meta:
         model = DailyRecord
         fields = '__all__'  # Bao gồm tất cả các trường trong model
+        # Maintained from the record's transactions (accounts.signals, reconcile_daily_totals)
+        read_only_fields = ('total_income', 'total_expense')
         
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Read and written by name, stored as a Category reference (CategoryService)
+    category = serializers.CharField(source='category.name', max_length=50)
+
     class Meta:
         model = Transaction
         fields = '__all__'
+        # Always the daily record's owner (Transaction.save)
+        read_only_fields = ('user',)
+
+    def create(self, validated_data):
+        return super().create(self.resolve_category(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self.resolve_category(validated_data))
+
+    def resolve_category(self, validated_data):
+        """Replace the category name by the id of the daily record owner's category"""
+        category = validated_data.pop('category', None)
+        if category is not None:
+            daily_record = validated_data.get('daily_record') or self.instance.daily_record
+            validated_data['category_id'] = CategoryService.get_id(daily_record.user_id, category['name'])
+        return validated_data
 
     def validate_date(self, value):
         # Đảm bảo `date` là kiểu `date`
@@ -0,0 +1,170 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .models import Category, CustomUser, DailyRecord, Transaction
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.categories import CategoryService
+from core.services.daily_totals import DailyTotalsService
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.transaction_cache import TransactionCacheService
+from core.services.token_cache import TokenCacheService
+
+
+def _user_id(instance):
+    return instance.user_id
+
+
+def _amount(instance):
+    # `amount` may still be a float/str when the instance was built in Python
+    return Decimal(str(instance.amount))
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    """Keep the stored version of an updated transaction so post_save can apply the delta"""
+    instance._previous_state = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_state = Transaction.objects.filter(pk=instance.pk).values(
+        'daily_record_id', 'user_id', 'date', 'type', 'category_id', 'amount'
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_monthly_summary_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the transaction's amount into its (user, month, type, category) rollup row"""
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        MonthlySummaryService.apply_delta(
+            previous['user_id'],
+            previous['date'],
+            previous['type'],
+            previous['category_id'],
+            -previous['amount'],
+            -1
+        )
+
+    MonthlySummaryService.apply_delta(
+        _user_id(instance),
+        instance.date,
+        instance.type,
+        instance.category_id,
+        _amount(instance),
+        1
+    )
+
+
+@receiver(post_delete, sender=Transaction)
+def update_monthly_summary_on_delete(sender, instance, **kwargs):
+    """Remove a deleted transaction from its rollup row"""
+    MonthlySummaryService.apply_delta(
+        _user_id(instance),
+        instance.date,
+        instance.type,
+        instance.category_id,
+        -_amount(instance),
+        -1
+    )
+
+
+@receiver(post_save, sender=Transaction)
+def update_daily_totals_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the transaction's amount into its DailyRecord's totals"""
+    if raw:
+        return
+
+    deltas = {}
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        DailyTotalsService.add_delta(deltas, previous['daily_record_id'], previous['type'], -previous['amount'])
+    DailyTotalsService.add_delta(deltas, instance.daily_record_id, instance.type, _amount(instance))
+    DailyTotalsService.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_daily_totals_on_delete(sender, instance, **kwargs):
+    """Remove a deleted transaction from its DailyRecord's totals"""
+    deltas = {}
+    DailyTotalsService.add_delta(deltas, instance.daily_record_id, instance.type, -_amount(instance))
+    DailyTotalsService.apply_deltas(deltas)
+
+
+@receiver(post_save, sender=Transaction)
+def update_cached_totals_on_save(sender, instance, created, raw=False, **kwargs):
+    """Increment the cached dashboard totals by the transaction's delta once the write commits"""
+    if raw:
+        return
+
+    deltas = {}
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        key = (previous['user_id'], previous['type'])
+        deltas[key] = deltas.get(key, 0) - previous['amount']
+    key = (_user_id(instance), instance.type)
+    deltas[key] = deltas.get(key, 0) + _amount(instance)
+
+    transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(deltas))
+
+
+@receiver(post_delete, sender=Transaction)
+def update_cached_totals_on_delete(sender, instance, **kwargs):
+    """Decrement the cached dashboard totals once the delete commits"""
+    deltas = {(_user_id(instance), instance.type): -_amount(instance)}
+    transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(deltas))
+
+
+@receiver(pre_save, sender=DailyRecord)
+def remember_previous_daily_record_user(sender, instance, raw=False, **kwargs):
+    """Keep the stored owner of an updated DailyRecord so post_save can move its transactions"""
+    instance._previous_user_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_user_id = DailyRecord.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=DailyRecord)
+def move_transactions_with_daily_record(sender, instance, created, raw=False, **kwargs):
+    """Give the transactions (and their rollup and cached totals) of a reassigned DailyRecord to its new user"""
+    previous_user_id = getattr(instance, '_previous_user_id', None)
+    if raw or previous_user_id is None or previous_user_id == instance.user_id:
+        return
+    BulkTransactionService.reassign_daily_record(instance.pk, previous_user_id, instance.user_id)
+
+
+@receiver(post_save, sender=DailyRecord)
+@receiver(post_delete, sender=DailyRecord)
+def bump_data_version_on_daily_record_write(sender, instance, raw=False, **kwargs):
+    """Change the user's data version (and the ETags derived from it) once the write commits"""
+    if raw:
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: TransactionCacheService.bump_data_versions([user_id]))
+
+
+@receiver(post_delete, sender=Category)
+def forget_deleted_category(sender, instance, **kwargs):
+    """Drop a deleted category from the in-process name lookup once the delete commits"""
+    transaction.on_commit(lambda: CategoryService.forget(instance.user_id, instance.key))
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """Stop authenticating a deleted token (also deleted with its user) once the delete commits"""
+    key = instance.key  # The pk is cleared once the delete completes
+    transaction.on_commit(lambda: TokenCacheService.invalidate([key]))
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_saved_user_tokens(sender, instance, created, raw=False, **kwargs):
+    """
+    Drop the cached user of the user's tokens once the save commits,
+    so a deactivation (or any other change) applies to the next request
+    """
+    if raw or created:
+        return
+    transaction.on_commit(lambda: TokenCacheService.invalidate_user(instance.pk))
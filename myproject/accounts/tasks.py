@@ -1,8 +1,11 @@
 from celery import shared_task
 from django.core.mail import send_mail
-from django.db.models import Sum
 from datetime import datetime
-from .models import Transaction
+from smtplib import SMTPException
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.monthly_report import MonthlyReportService
+from core.services.transaction_partitions import TransactionPartitionService
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,36 +18,13 @@ def send_monthly_report(user_email, user_id):
 
         logger.info(f"Preparing report for user {user_id} ({user_email})")
 
-        total_income = Transaction.objects.filter(
-            daily_record__user_id=user_id,
-            type='income',
-            date__month=month,
-            date__year=year
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        total_expense = Transaction.objects.filter(
-            daily_record__user_id=user_id,
-            type='expense',
-            date__month=month,
-            date__year=year
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        net_balance = total_income - total_expense
-
-        subject = f"Monthly Financial Report - {now.strftime('%B %Y')}"
-        message = (
-            f"Hello,\n\n"
-            f"Here is your financial report for {now.strftime('%B %Y')}:\n"
-            f"- Total Income: {total_income} VND\n"
-            f"- Total Expense: {total_expense} VND\n"
-            f"- Net Balance: {net_balance} VND\n\n"
-            f"Thank you for using our service!"
-        )
+        totals = MonthlySummaryService.get_month_totals(user_id, year, month)
+        subject, message = MonthlyReportService.build_message(totals, year, month)
 
         send_mail(
             subject,
             message,
-            'noreply@financialapp.com',
+            MonthlyReportService.FROM_EMAIL,
             [user_email],
             fail_silently=False,
         )
@@ -53,4 +33,55 @@ def send_monthly_report(user_email, user_id):
 
     except Exception as e:
         logger.error(f"Error sending monthly report to {user_email}: {e}", exc_info=True)
-        raise e
\ No newline at end of file
+        raise e
+
+@shared_task
+def send_monthly_reports(year=None, month=None):
+    """
+    Fan out the monthly reports of all users, one send_monthly_report_chunk task per chunk
+    Scheduled by celery beat (CELERY_BEAT_SCHEDULE), reports the previous month by default
+    """
+    if year is None or month is None:
+        year, month = MonthlyReportService.previous_month()
+
+    chunks = list(MonthlyReportService.recipient_chunks(year, month))
+    MonthlyReportService.start_progress(year, month, len(chunks))
+    for user_ids in chunks:
+        send_monthly_report_chunk.delay(user_ids, year, month)
+
+    logger.info(f"Dispatched {len(chunks)} report chunks for {year}/{month:02d}")
+    return len(chunks)
+
+@shared_task(
+    bind=True,
+    autoretry_for=(SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=5
+)
+def send_monthly_report_chunk(self, user_ids, year, month):
+    """
+    Send the reports of one chunk of users over a single SMTP connection
+    Safe to retry: users whose report was already sent are skipped
+    """
+    sent = MonthlyReportService.send_chunk(user_ids, year, month)
+    MonthlyReportService.add_progress(year, month, 'chunks_done', 1)
+
+    progress = MonthlyReportService.get_progress(year, month)
+    logger.info(
+        f"Report chunk for {year}/{month:02d}: sent {sent}/{len(user_ids)}, "
+        f"chunks {progress['chunks_done']}/{progress['chunks']}, {progress['sent']} reports sent"
+    )
+    return sent
+
+@shared_task
+def manage_transaction_partitions():
+    """
+    Create the coming months' transaction partitions and detach the expired ones
+    Scheduled daily by celery beat (CELERY_BEAT_SCHEDULE), idempotent
+    """
+    created, detached = TransactionPartitionService.maintain(
+        settings.TRANSACTION_PARTITION_MONTHS_AHEAD,
+        settings.TRANSACTION_PARTITION_RETENTION_MONTHS
+    )
+    logger.info(f"Transaction partitions: created {created or 'none'}, detached {detached or 'none'}")
+    return {'created': created, 'detached': detached}
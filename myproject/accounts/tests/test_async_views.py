@@ -0,0 +1,104 @@
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.token_cache import TokenCacheService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestAsyncViews(TestCase):
+    def setUp(self):
+        cache.clear()
+        TokenCacheService.clear_local()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.admin = CustomUser.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.admin_token = Token.objects.create(user=self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, day, type, amount in [(self.user, date.today(), 'income', 100), (self.user, date(2024, 1, 5), 'expense', 30),
+                                            (self.admin, date.today(), 'expense', 5)]:
+                daily_record, _ = DailyRecord.objects.get_or_create(user=user, date=day)
+                Transaction.objects.create(daily_record=daily_record, type=type, category_id=CategoryService.get_id(None, 'food'),
+                                           amount=amount, date=day)
+
+    def headers(self, token):
+        return {'Authorization': f'Token {token.key}'}
+
+    async def test_authentication(self):
+        response = await self.async_client.get('/api/async/dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+
+        response = await self.async_client.get('/api/async/dashboard/', headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+        response = await self.async_client.get('/api/async/system-stats/', headers=self.headers(self.token))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_dashboard(self):
+        response = await self.async_client.get('/api/async/dashboard/', headers=self.headers(self.token))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data, {'status': 'success', 'data': {'total_income': 100.0, 'total_expense': 30.0}})
+        self.assertIn('cache;desc="0 hits, 1 misses"', response['Server-Timing'])
+
+        # Token and totals read from the cache
+        response = await self.async_client.get('/api/async/dashboard/', headers=self.headers(self.token))
+        self.assertEqual(response.json(), data)
+        self.assertIn('desc="0 queries"', response['Server-Timing'])
+        self.assertIn('cache;desc="1 hits, 0 misses"', response['Server-Timing'])
+
+    def test_dashboard_not_modified(self):
+        etag = self.client.get('/api/async/dashboard/', headers=self.headers(self.token))['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/async/dashboard/', headers={**self.headers(self.token), 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/async/dashboard/', headers={**self.headers(self.admin_token), 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            daily_record = DailyRecord.objects.get(user=self.user, date=date.today())
+            Transaction.objects.create(daily_record=daily_record, type='income', category_id=CategoryService.get_id(None, 'food'),
+                                       amount=5, date=daily_record.date)
+        response = self.client.get('/api/async/dashboard/', headers={**self.headers(self.token), 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['total_income'], 105.0)
+
+    def test_dashboard_miss_queries(self):
+        with self.assertNumQueries(2):  # Token + user join, one conditional aggregate for both totals
+            response = self.client.get('/api/async/dashboard/', headers=self.headers(self.token))
+        self.assertEqual(response.json()['data'], {'total_income': 100.0, 'total_expense': 30.0})
+
+    def test_dashboard_without_data_version(self):
+        etag = self.client.get('/api/async/dashboard/', headers=self.headers(self.token))['ETag']
+
+        with mock.patch.object(cache, 'get', side_effect=ConnectionError("cache down")):
+            response = self.client.get('/api/async/dashboard/', headers={**self.headers(self.token), 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_same_payload_and_cache_as_the_sync_views(self):
+        # Token and totals cached by the sync view
+        for path, token in [('dashboard/', self.token), ('system-stats/', self.admin_token)]:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            expected = client.get(f'/api/{path}').json()
+            with self.assertNumQueries(0):
+                response = self.client.get(f'/api/async/{path}', headers=self.headers(token))
+            self.assertEqual(response.json(), expected)
@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from ..management.commands.benchmark_api import ENDPOINTS, percentile
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestBenchmarkApi(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'results.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def benchmark(self, *args):
+        out = StringIO()
+        call_command(
+            'benchmark_api', '--provision', '--users', '4', '--days', '40', '--workers', '1',
+            '--sample-users', '2', '--iterations', '4', '--output', self.output, *args,
+            stdout=out, stderr=StringIO()
+        )
+        with open(self.output) as f:
+            return json.load(f), out.getvalue()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_results(self):
+        report, _ = self.benchmark()
+
+        self.assertEqual(report['meta']['dataset']['users'], 4)
+        self.assertEqual(report['meta']['dataset']['transactions'], 4 * 40 * 4)
+        self.assertEqual(set(report['results']), {name for name, _, _ in ENDPOINTS})
+        for modes in report['results'].values():
+            for result in modes.values():
+                self.assertEqual(result['errors'], 0)
+                self.assertEqual(result['samples'], 4)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+        dashboard = report['results']['dashboard']
+        self.assertEqual(dashboard['cold']['cache_hit_ratio'], 0)
+        self.assertEqual(dashboard['warm']['cache_hit_ratio'], 1)
+        self.assertLess(dashboard['warm']['queries_mean'], dashboard['cold']['queries_mean'])
+        self.assertIsNone(report['results']['transactions_list']['warm']['cache_hit_ratio'])
+
+    def test_compare(self):
+        self.benchmark()
+        baseline = os.path.join(self.directory.name, 'baseline.json')
+        os.rename(self.output, baseline)
+
+        _, output = self.benchmark('--compare', baseline)
+        self.assertIn("Compared to", output)
+
+    def test_missing_dataset(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', '--output', self.output, stdout=StringIO())
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from core.services.transaction_cache import TransactionCacheService
+from core.services.categories import CategoryService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestBulkTransactions(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.existing_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+
+    def test_bulk_create(self):
+        TransactionCacheService.get_user_totals(self.user.id)
+        rows = [
+            {'type': 'income', 'category': 'salary', 'amount': '100.00', 'date': '2025-03-01'},
+            {'type': 'expense', 'category': 'food', 'amount': 20.5, 'date': '2025-03-01'},
+            {'type': 'expense', 'category': 'food', 'amount': '10', 'date': '2025-03-02'},
+            {'type': 'expense', 'category': 'transport', 'amount': '5.25', 'date': '2025-04-10'},
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/transactions/bulk/', rows, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'transactions_created': 4, 'daily_records_created': 2})
+        self.assertEqual(Transaction.objects.filter(daily_record__user=self.user).count(), 4)
+
+        self.existing_record.refresh_from_db()
+        self.assertEqual(self.existing_record.total_income, Decimal('100.00'))
+        self.assertEqual(self.existing_record.total_expense, Decimal('20.50'))
+        self.assertEqual(DailyRecord.objects.get(user=self.user, date=date(2025, 3, 2)).total_expense, Decimal('10.00'))
+
+        food = UserMonthlySummary.objects.get(user=self.user, year=2025, month=3, type='expense', category_id=CategoryService.get_id(None, 'food'))
+        self.assertEqual((food.total, food.count), (Decimal('30.50'), 2))
+
+        totals = TransactionCacheService.get_user_totals(self.user.id)
+        self.assertEqual(totals['total_expense'], Decimal('35.75'))
+
+    def test_bulk_create_query_count_is_constant(self):
+        rows = [
+            {'type': 'expense', 'category': 'food', 'amount': '1.00', 'date': f'2025-03-{day:02d}'}
+            for day in range(1, 29)
+            for _ in range(10)
+        ]
+        # lock, select daily records, insert daily records, insert transactions, update totals, upsert rollup
+        # plus the savepoint pair of the atomic block
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/transactions/bulk/', rows, format='json')
+        self.assertEqual(response.data['transactions_created'], 280)
+
+    def test_invalid_rows_reject_the_batch(self):
+        rows = [
+            {'type': 'income', 'category': 'salary', 'amount': '100.00', 'date': '2025-03-01'},
+            {'type': 'gift', 'category': '', 'amount': 'abc', 'date': '2025-13-01'},
+        ]
+        response = self.client.post('/api/transactions/bulk/', {'transactions': rows}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual({error['field'] for error in response.data['errors']}, {'type', 'category', 'amount', 'date'})
+        self.assertTrue(all(error['row'] == 1 for error in response.data['errors']))
+        self.assertFalse(Transaction.objects.exists())
@@ -0,0 +1,109 @@
+import time
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Category, CustomUser, DailyRecord, Transaction
+from ..queries import TransactionQueries
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.categories import CategoryService
+from core.services.transaction_partitions import TransactionPartitionService
+from datetime import date
+
+class TestCategories(TestCase):
+    def setUp(self):
+        CategoryService.clear_cache()
+        self.user = CustomUser.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+
+    def tearDown(self):
+        # Ids remembered by executed on_commit callbacks are rolled back with the test
+        CategoryService.clear_cache()
+
+    def test_names_resolve_case_insensitively(self):
+        food = Category.objects.get(user=None, key='food')
+        self.assertEqual(CategoryService.get_id(self.user.id, ' Food '), food.id)
+        self.assertEqual(CategoryService.get_id(self.user.id, 'FOOD'), food.id)
+
+        rent = CategoryService.get_id(self.user.id, 'Rent')
+        self.assertEqual(CategoryService.get_id(self.user.id, 'rent'), rent)
+        self.assertEqual(Category.objects.get(pk=rent).name, 'Rent')
+        # Another user gets their own category
+        self.assertNotEqual(CategoryService.get_id(self.other_user.id, 'rent'), rent)
+        self.assertEqual(Category.objects.filter(key='rent').count(), 2)
+
+    def test_cache_filled_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            rent = CategoryService.get_id(self.user.id, 'Rent')
+        self.assertIsNone(CategoryService.get_cached(self.user.id, 'rent'))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(CategoryService.get_cached(self.user.id, 'rent'), rent)
+        with self.assertNumQueries(0):
+            self.assertEqual(CategoryService.get_id(self.user.id, 'RENT'), rent)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(pk=rent).delete()
+        self.assertIsNone(CategoryService.get_cached(self.user.id, 'rent'))
+
+    def test_cached_ids_expire(self):
+        # Another process's delete is only seen once the entry expires
+        with self.captureOnCommitCallbacks(execute=True):
+            rent = CategoryService.get_id(self.user.id, 'Rent')
+        Category.objects.filter(pk=rent).delete()
+        self.assertEqual(CategoryService.get_cached(self.user.id, 'rent'), rent)
+
+        with mock.patch('core.services.categories.time.monotonic', return_value=time.monotonic() + CategoryService.ttl() + 1):
+            self.assertIsNone(CategoryService.get_cached(self.user.id, 'rent'))
+            self.assertNotEqual(CategoryService.get_id(self.user.id, 'rent'), rent)
+
+    def test_writes_share_categories(self):
+        BulkTransactionService.ingest(self.user.id, [
+            {'type': 'expense', 'category': 'Rent', 'amount': 500, 'date': date(2025, 3, 1)},
+            {'type': 'expense', 'category': 'rent', 'amount': 20, 'date': date(2025, 3, 2)},
+            {'type': 'expense', 'category': 'Food', 'amount': 5, 'date': date(2025, 3, 2)},
+        ])
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('category__key', 'category__user', 'amount')),
+            [('food', None, 5), ('rent', self.user.id, 20), ('rent', self.user.id, 500)]
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        record = DailyRecord.objects.get(user=self.user, date=date(2025, 3, 1))
+        response = client.post('/api/transactions/', {
+            'daily_record': record.id, 'type': 'expense', 'category': 'RENT', 'amount': '10.00', 'date': '2025-03-01'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['category'], 'Rent')
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 1)
+
+        response = client.patch(f"/api/transactions/{response.data['id']}/", {'category': 'food'}, format='json')
+        self.assertEqual(response.data['category'], 'food')
+        self.assertEqual(TransactionQueries.get_transactions_by_type_and_category('expense', 'FOOD').count(), 2)
+
+    def test_category_filter_uses_index(self):
+        # Rows of several categories and types, in a fresh partition of March away from the
+        # bloat earlier tests leave in the default one: with empty tables every index costs the same
+        categories = [CategoryService.get_id(None, name) for name in ('food', 'salary', 'transport', 'rent')]
+        for index in range(10):
+            user = CustomUser.objects.create_user(username=f'user{index}', password='testpass123')
+            records = DailyRecord.objects.bulk_create([DailyRecord(user=user, date=date(2025, 3, day)) for day in range(1, 31)])
+            Transaction.objects.bulk_create([
+                Transaction(daily_record=record, user=user, type=type, category_id=category_id, amount=1, date=record.date)
+                for record in records for category_id in categories for type in ('income', 'expense')
+            ])
+        TransactionPartitionService.create_partition(date(2025, 3, 1))
+
+        queryset = TransactionQueries.get_transactions_by_type_and_category('expense', 'Food')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Transaction._meta.db_table}, {Category._meta.db_table}, "
+                           f"{DailyRecord._meta.db_table}, {CustomUser._meta.db_table}")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertRegex(plan, r'accounts_transaction_\w+_category_id_type_idx')
+        self.assertRegex(plan, r'accounts_ca_key_4919fe_idx|unique_global_category|unique_user_category')
@@ -0,0 +1,96 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from ..queries import TransactionQueries
+from core.services.categories import CategoryService
+from core.services.category_breakdown import CategoryBreakdownService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestCategoryBreakdown(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.salary = CategoryService.get_id(None, 'salary')
+        self.food = CategoryService.get_id(None, 'food')
+        self.transport = CategoryService.get_id(None, 'transport')
+        for day, type, category, amount in [
+            (date(2025, 1, 20), 'expense', self.food, 10), (date(2025, 2, 1), 'income', self.salary, 1000),
+            (date(2025, 2, 14), 'expense', self.food, 30), (date(2025, 2, 28), 'expense', self.transport, 5),
+            (date(2025, 3, 3), 'expense', self.food, 7), (date(2025, 3, 31), 'expense', self.transport, 2),
+        ]:
+            self.add(self.user, day, type, category, amount)
+        self.add(other_user, date(2025, 2, 14), 'expense', self.food, 999)
+
+    def add(self, user, day, type, category, amount):
+        daily_record, _ = DailyRecord.objects.get_or_create(user=user, date=day)
+        return Transaction.objects.create(daily_record=daily_record, type=type, category_id=category, amount=amount, date=day)
+
+    def totals(self, rows):
+        return {(row['type'], row['category_id']): (row['total'], row['count']) for row in rows}
+
+    def test_whole_months(self):
+        self.assertEqual(CategoryBreakdownService.whole_months(date(2025, 1, 15), date(2025, 3, 31)),
+                         (date(2025, 2, 1), date(2025, 4, 1)))
+        self.assertEqual(CategoryBreakdownService.whole_months(date(2024, 12, 1), date(2025, 1, 30)),
+                         (date(2024, 12, 1), date(2025, 1, 1)))
+        self.assertIsNone(CategoryBreakdownService.whole_months(date(2025, 1, 2), date(2025, 2, 27)))
+
+    def test_matches_transactions_aggregate(self):
+        for start_date, end_date in [(date(2025, 1, 1), date(2025, 3, 31)), (date(2025, 1, 15), date(2025, 3, 3)),
+                                     (date(2025, 2, 14), date(2025, 2, 28)), (date(2024, 12, 1), date(2026, 1, 31))]:
+            expected = {
+                (row['type'], row['category_id']): (row['total_amount'], row['transaction_count'])
+                for row in TransactionQueries.get_user_transactions_summary(self.user.id, start_date, end_date)
+            }
+            breakdown = CategoryBreakdownService.compute(self.user.id, start_date, end_date)
+            self.assertEqual(self.totals(breakdown), expected, (start_date, end_date))
+
+        breakdown = CategoryBreakdownService.compute(self.user.id, date(2025, 2, 1), date(2025, 2, 28))
+        self.assertEqual([(row['category'], row['total']) for row in breakdown],
+                         [('salary', Decimal('1000.00')), ('food', Decimal('30.00')), ('transport', Decimal('5.00'))])
+
+    def test_cached_until_the_next_write(self):
+        start_date, end_date = date(2025, 2, 1), date(2025, 3, 15)
+        CategoryBreakdownService.get_breakdown(self.user.id, start_date, end_date)
+        with self.assertNumQueries(0):
+            breakdown = CategoryBreakdownService.get_breakdown(self.user.id, start_date, end_date)
+        self.assertEqual(self.totals(breakdown)[('expense', self.food)], (Decimal('37.00'), 2))
+
+        # A category change moves the amount without changing the user's totals
+        with self.captureOnCommitCallbacks(execute=True):
+            food = Transaction.objects.get(user=self.user, date=date(2025, 3, 3))
+            food.category_id = self.transport
+            food.save()
+        breakdown = self.totals(CategoryBreakdownService.get_breakdown(self.user.id, start_date, end_date))
+        self.assertEqual(breakdown[('expense', self.food)], (Decimal('30.00'), 1))
+        self.assertEqual(breakdown[('expense', self.transport)], (Decimal('12.00'), 2))
+
+    def test_endpoint_compares_previous_period(self):
+        response = self.client.get('/api/transactions/breakdown/', {
+            'start': '2025-03-01', 'end': '2025-03-31', 'compare': 'previous'
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['previous'], {'start': '2025-01-29', 'end': '2025-02-28'})
+        rows = {(row['type'], row['category']): row for row in data['breakdown']}
+        self.assertEqual(rows[('expense', 'food')]['total'], 7.0)
+        self.assertEqual(rows[('expense', 'food')]['previous_total'], 30.0)
+        self.assertEqual(rows[('expense', 'food')]['change'], -23.0)
+        # Only in the previous period
+        self.assertEqual(rows[('income', 'salary')]['total'], 0)
+        self.assertEqual(rows[('income', 'salary')]['previous_total'], 1000.0)
+
+        response = self.client.get('/api/transactions/breakdown/', {'start': '2025-03-02', 'end': '2025-03-01'})
+        self.assertEqual(response.status_code, 400)
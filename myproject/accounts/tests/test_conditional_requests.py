@@ -0,0 +1,89 @@
+from datetime import date
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+MARCH = {'month': 3, 'year': 2025}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestConditionalRequests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.food = CategoryService.get_id(None, 'food')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.daily_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+            Transaction.objects.create(daily_record=self.daily_record, type='expense', category_id=self.food,
+                                       amount=10, date=self.daily_record.date)
+
+    def etag(self, path, params=None):
+        response = self.client.get(path, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response['ETag'].startswith('W/'))
+        return response['ETag']
+
+    def test_not_modified_without_queries(self):
+        for path, params in [('/api/dashboard/', {}), ('/api/transactions/monthly/', MARCH),
+                             ('/api/transactions/daily-expenses/', MARCH)]:
+            etag = self.etag(path, params)
+            with self.assertNumQueries(0):
+                response = self.client.get(path, params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, path)
+            self.assertEqual(response.content, b'')
+            self.assertEqual(response['ETag'], etag)
+
+    def test_etag_per_params_and_user(self):
+        etag = self.etag('/api/transactions/monthly/', MARCH)
+        self.assertNotEqual(etag, self.etag('/api/transactions/monthly/', {'month': 4, 'year': 2025}))
+        self.assertNotEqual(etag, self.etag('/api/transactions/daily-expenses/', MARCH))
+
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+        response = self.client.get('/api/transactions/monthly/', MARCH, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_change_the_etag(self):
+        etag = self.etag('/api/transactions/monthly/', MARCH)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(daily_record=self.daily_record, type='income', category_id=self.food,
+                                       amount=5, date=self.daily_record.date)
+        response = self.client.get('/api/transactions/monthly/', MARCH, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_income'], 5.0)
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyRecord.objects.create(user=self.user, date=date(2025, 3, 2))
+        self.assertNotEqual(self.etag('/api/transactions/monthly/', MARCH), etag)
+        etag = self.etag('/api/transactions/monthly/', MARCH)
+
+        # Records without transactions, deleted set-based
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/daily-records/{DailyRecord.objects.get(date=date(2025, 3, 2)).pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertNotEqual(self.etag('/api/transactions/monthly/', MARCH), etag)
+
+    def test_invalid_params(self):
+        response = self.client.get('/api/transactions/monthly/', {'month': 13, 'year': 2025})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_no_etag_without_data_version(self):
+        etag = self.etag('/api/dashboard/')
+
+        # Cache down: no version to compare, the If-None-Match never matches
+        with mock.patch.object(cache, 'get', side_effect=ConnectionError("cache down")):
+            response = self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(response.json()['data']['total_expense'], 10.0)
@@ -0,0 +1,102 @@
+from io import StringIO
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.transaction_cache import TransactionCacheService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestDailyTotals(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+        self.other_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 2))
+
+    def assertTotals(self, record, income, expense):
+        record.refresh_from_db()
+        self.assertEqual(record.total_income, Decimal(income))
+        self.assertEqual(record.total_expense, Decimal(expense))
+
+    def test_transaction_writes_update_totals(self):
+        salary = Transaction.objects.create(
+            daily_record=self.record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=100, date=self.record.date)
+        food = Transaction.objects.create(
+            daily_record=self.record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount='12.50', date=self.record.date)
+        self.assertTotals(self.record, '100.00', '12.50')
+
+        # Type change within the record
+        food.type = 'income'
+        food.save()
+        self.assertTotals(self.record, '112.50', '0.00')
+
+        # Move to another record
+        salary.daily_record = self.other_record
+        salary.amount = 80
+        salary.save()
+        self.assertTotals(self.record, '12.50', '0.00')
+        self.assertTotals(self.other_record, '80.00', '0.00')
+
+        salary.delete()
+        self.assertTotals(self.other_record, '0.00', '0.00')
+
+    def test_totals_are_read_only_in_api(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post('/api/daily-records/', {
+            'date': '2025-03-05', 'total_income': '999.00', 'total_expense': '1.00'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.data['total_income']), Decimal('0'))
+
+        response = client.post('/api/transactions/', {
+            'daily_record': response.data['id'], 'type': 'income', 'category': 'salary',
+            'amount': '25.00', 'date': '2025-03-05'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTotals(DailyRecord.objects.get(date=date(2025, 3, 5)), '25.00', '0.00')
+
+    def test_reconcile_fixes_drift(self):
+        Transaction.objects.create(
+            daily_record=self.record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=100, date=self.record.date)
+        Transaction.objects.create(
+            daily_record=self.record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=30, date=self.record.date)
+        # Drift behind the signals' back: one stale record, one record without transactions
+        DailyRecord.objects.filter(pk=self.record.pk).update(total_income=1)
+        DailyRecord.objects.filter(pk=self.other_record.pk).update(total_expense=5)
+
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        DailyRecord.objects.create(user=other_user, date=date(2025, 3, 1))
+        versions = {user.id: TransactionCacheService.get_data_version(user.id) for user in (self.user, other_user)}
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_daily_totals', '--dry-run', '--batch-size', '1', stdout=out)
+        self.assertIn("found 2 drifted daily records", out.getvalue())
+        self.assertTotals(self.record, '1.00', '30.00')
+        self.assertEqual(TransactionCacheService.get_data_version(self.user.id), versions[self.user.id])
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_daily_totals', '--batch-size', '1', stdout=out)
+        output = out.getvalue()
+        # Only the owner of the fixed records sees a new data version
+        self.assertNotEqual(TransactionCacheService.get_data_version(self.user.id), versions[self.user.id])
+        self.assertEqual(TransactionCacheService.get_data_version(other_user.id), versions[other_user.id])
+        self.assertIn(f"daily record {self.record.id}: income 1.00 -> 100.00, expense 30.00 -> 30.00", output)
+        self.assertIn("fixed 2 drifted daily records", output)
+        self.assertTotals(self.record, '100.00', '30.00')
+        self.assertTotals(self.other_record, '0.00', '0.00')
+
+        out = StringIO()
+        call_command('reconcile_daily_totals', stdout=out)
+        self.assertIn("fixed 0 drifted daily records", out.getvalue())
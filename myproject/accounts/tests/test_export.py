@@ -0,0 +1,56 @@
+import json
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from datetime import date
+
+class TestTransactionExport(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        other_user = CustomUser.objects.create_user(
+            username='otheruser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        for day, type, category, amount in [(1, 'income', 'salary', '100.00'), (2, 'expense', 'food', '20.50'), (3, 'expense', 'transport', '5.00')]:
+            daily_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, day))
+            Transaction.objects.create(daily_record=daily_record, type=type, category_id=CategoryService.get_id(None, category), amount=amount, date=daily_record.date)
+        other_record = DailyRecord.objects.create(user=other_user, date=date(2025, 3, 1))
+        Transaction.objects.create(daily_record=other_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=1, date=other_record.date)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        response = self.client.get('/api/transactions/export/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.content(response).splitlines()
+        self.assertEqual(lines[0], 'id,date,type,category,amount')
+        self.assertEqual([line.split(',')[1:] for line in lines[1:]], [
+            ['2025-03-01', 'income', 'salary', '100.00'],
+            ['2025-03-02', 'expense', 'food', '20.50'],
+            ['2025-03-03', 'expense', 'transport', '5.00'],
+        ])
+
+    def test_ndjson_export_with_filters(self):
+        response = self.client.get('/api/transactions/export/', {
+            'file_format': 'ndjson', 'start': '2025-03-02', 'end': '2025-03-03', 'type': 'expense', 'category': 'food'
+        })
+
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual({k: rows[0][k] for k in ('date', 'category', 'amount')},
+                         {'date': '2025-03-02', 'category': 'food', 'amount': '20.50'})
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get('/api/transactions/export/', {'file_format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/transactions/export/', {'start': '03/01/2025'}).status_code, 400)
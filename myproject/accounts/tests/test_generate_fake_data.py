@@ -0,0 +1,64 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestGenerateFakeData(TestCase):
+    def generate(self, *args):
+        out = StringIO()
+        call_command(
+            'generate_fake_data', '--users', '5', '--days', '3', '--end-date', '2025-03-02',
+            '--shard-size', '2', '--workers', '1', *args, stdout=out, stderr=StringIO()
+        )
+        return out.getvalue()
+
+    def snapshot(self, prefix):
+        rows = Transaction.objects.filter(
+            daily_record__user__username__startswith=prefix
+        ).order_by(
+            'daily_record__user__username', 'date', 'category__key'
+        ).values_list('daily_record__user__username', 'date', 'category__key', 'amount')
+        return [(username[len(prefix):], *row) for username, *row in rows]
+
+    def test_generates_consistent_dataset(self):
+        output = self.generate()
+
+        self.assertIn("Created 5 users, 15 daily records and 60 transactions", output)
+        users = CustomUser.objects.filter(username__startswith='customer')
+        self.assertEqual(users.count(), 5)
+        # One hash shared by every user
+        self.assertEqual(users.values('password').distinct().count(), 1)
+        self.assertTrue(users.first().check_password('password123'))
+
+        self.assertEqual(
+            set(DailyRecord.objects.values_list('date', flat=True)),
+            {date(2025, 2, 28), date(2025, 3, 1), date(2025, 3, 2)}
+        )
+        record = DailyRecord.objects.first()
+        self.assertEqual(
+            record.total_income,
+            record.transactions.filter(type='income').aggregate(total=Sum('amount'))['total']
+        )
+        self.assertEqual(
+            UserMonthlySummary.objects.aggregate(total=Sum('total'))['total'],
+            Transaction.objects.aggregate(total=Sum('amount'))['total']
+        )
+
+    def test_same_seed_same_dataset(self):
+        self.generate('--username-prefix', 'first')
+        self.generate('--username-prefix', 'second')
+        self.generate('--username-prefix', 'third', '--seed', '7')
+
+        self.assertEqual(self.snapshot('first'), self.snapshot('second'))
+        self.assertNotEqual(self.snapshot('first'), self.snapshot('third'))
+
+    def test_existing_users_require_reset(self):
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
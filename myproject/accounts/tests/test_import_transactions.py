@@ -0,0 +1,58 @@
+import csv
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from core.services.categories import CategoryService
+from datetime import date
+
+class TestImportTransactions(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.existing_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'statement.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_csv(self, rows):
+        with open(self.path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['username', 'user_id', 'date', 'type', 'category', 'amount'])
+            writer.writerows(rows)
+
+    def test_import(self):
+        self.write_csv([
+            ['testuser', '', '2025-03-01', 'income', 'salary', '100.00'],
+            ['', str(self.user.id), '2025-03-01', 'expense', 'food', '20.50'],
+            ['testuser', '', '2025-03-02', 'expense', 'food', '9.50'],
+            ['nobody', '', '2025-03-02', 'expense', 'food', '1.00'],
+            ['testuser', '', '2025-03-02', 'gift', 'food', 'abc'],
+        ])
+
+        out = StringIO()
+        call_command('import_transactions', self.path, '--chunk-size', '2', stdout=out)
+
+        self.assertIn('Imported 3 transactions (1 new daily records)', out.getvalue())
+        self.assertEqual(Transaction.objects.filter(daily_record__user=self.user).count(), 3)
+
+        self.existing_record.refresh_from_db()
+        self.assertEqual(self.existing_record.total_income, Decimal('100.00'))
+        self.assertEqual(self.existing_record.total_expense, Decimal('20.50'))
+
+        food = UserMonthlySummary.objects.get(user=self.user, year=2025, month=3, type='expense', category_id=CategoryService.get_id(None, 'food'))
+        self.assertEqual((food.total, food.count), (Decimal('30.00'), 2))
+
+        with open(self.path + '.rejects.csv', newline='') as f:
+            rejects = list(csv.DictReader(f))
+        self.assertEqual([row['line'] for row in rejects], ['5', '6'])
+        self.assertEqual(rejects[0]['error'], 'user: Unknown user')
+        self.assertIn('type:', rejects[1]['error'])
+        self.assertIn('amount:', rejects[1]['error'])
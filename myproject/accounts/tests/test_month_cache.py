@@ -0,0 +1,55 @@
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.month_cache import MonthCacheService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+MARCH = {'month': 3, 'year': 2025}
+
+@override_settings(CACHES=LOCMEM_CACHE, MONTH_CACHE_CURRENT_TTL=60, MONTH_CACHE_PAST_TTL=86400)
+class TestMonthCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.food = CategoryService.get_id(None, 'food')
+        self.add(date(2025, 3, 1), 'expense', 10)
+
+    def add(self, day, type, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            daily_record, _ = DailyRecord.objects.get_or_create(user=self.user, date=day)
+            Transaction.objects.create(daily_record=daily_record, type=type, category_id=self.food, amount=amount, date=day)
+
+    def test_timeout(self):
+        today = date(2025, 3, 10)
+        self.assertEqual(MonthCacheService.get_timeout(2025, 2, today), 86400)
+        self.assertEqual(MonthCacheService.get_timeout(2024, 12, today), 86400)
+        self.assertEqual(MonthCacheService.get_timeout(2025, 3, today), 60)
+        self.assertEqual(MonthCacheService.get_timeout(2025, 4, today), 60)
+
+    def test_cached_until_the_next_write(self):
+        for path in ('/api/transactions/monthly/', '/api/transactions/daily-expenses/'):
+            response = self.client.get(path, MARCH)
+            self.assertEqual(response.status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(path, MARCH).json(), response.json())
+
+        self.add(date(2025, 3, 2), 'income', 5)
+        self.assertEqual(self.client.get('/api/transactions/monthly/', MARCH).json()['total_income'], 5.0)
+        daily = self.client.get('/api/transactions/daily-expenses/', MARCH).json()['daily_expenses']
+        self.assertEqual([row['date'] for row in daily], ['2025-03-01', '2025-03-02'])
+
+    def test_keyed_by_user_and_month(self):
+        self.client.get('/api/transactions/monthly/', MARCH)
+        self.assertEqual(self.client.get('/api/transactions/monthly/', {'month': 4, 'year': 2025}).json()['total_expense'], 0)
+
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        self.client.force_authenticate(user=other_user)
+        self.assertEqual(self.client.get('/api/transactions/monthly/', MARCH).json()['total_expense'], 0)
@@ -0,0 +1,102 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from ..queries import TransactionQueries, month_date_range
+from core.services.categories import CategoryService
+from core.services.transaction_partitions import TransactionPartitionService
+from datetime import date, timedelta
+
+def explain(queryset):
+    """Return the text plan of a queryset with sequential scans disabled"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        # Statistics of the test rows, so the planner does not pick between indexes on guesses
+        cursor.execute(f"ANALYZE {Transaction._meta.db_table}, {DailyRecord._meta.db_table}")
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("EXPLAIN " + sql, params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+class TestMonthRange(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        for day, income, expense in [(date(2025, 2, 28), 10, 5), (date(2025, 3, 1), 100, 30), (date(2025, 3, 31), 0, 20), (date(2025, 4, 1), 7, 7)]:
+            daily_record = DailyRecord.objects.create(user=self.user, date=day)
+            if income:
+                Transaction.objects.create(daily_record=daily_record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=income, date=day)
+            Transaction.objects.create(daily_record=daily_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=expense, date=day)
+
+    def add_year_of_records(self, user, transactions_per_day=0):
+        """Records of `user` for every day of the year up to March 2025, with that many transactions each"""
+        records = DailyRecord.objects.bulk_create([
+            DailyRecord(user=user, date=date(2024, 4, 1) + timedelta(days=day)) for day in range(365)
+        ])
+        Transaction.objects.bulk_create([
+            Transaction(daily_record=record, user=user, type='expense', category_id=CategoryService.get_id(None, 'food'),
+                        amount=10, date=record.date)
+            for record in records for _ in range(transactions_per_day)
+        ])
+
+    def add_other_users(self, transactions_per_day=0):
+        """
+        A year of records of other users: neither the date nor the user alone is selective,
+        as in production. March gets its own fresh partition, away from the bloat of the
+        default partition that earlier tests leave behind
+        """
+        for index in range(20):
+            self.add_year_of_records(CustomUser.objects.create_user(username=f'other{index}', password='testpass123'),
+                                     transactions_per_day)
+        TransactionPartitionService.create_partition(date(2025, 3, 1))
+
+    def test_month_date_range(self):
+        self.assertEqual(month_date_range(2025, 3), (date(2025, 3, 1), date(2025, 4, 1)))
+        self.assertEqual(month_date_range(2024, 12), (date(2024, 12, 1), date(2025, 1, 1)))
+
+    def test_daily_expenses_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/transactions/daily-expenses/', {'month': 3, 'year': 2025})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['daily_expenses'], [
+            {'date': date(2025, 3, 1), 'income': Decimal('100.00'), 'expense': Decimal('30.00'), 'net_balance': Decimal('70.00')},
+            {'date': date(2025, 3, 31), 'income': Decimal('0'), 'expense': Decimal('20.00'), 'net_balance': Decimal('-20.00')},
+        ])
+
+    def test_monthly_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/transactions/monthly/', {'month': 3, 'year': 2025})
+
+        self.assertEqual(response.data['total_income'], Decimal('100.00'))
+        self.assertEqual(response.data['total_expense'], Decimal('50.00'))
+        self.assertEqual(response.data['net_balance'], Decimal('50.00'))
+
+    def test_invalid_month_is_rejected(self):
+        response = self.client.get('/api/transactions/daily-expenses/', {'month': 13, 'year': 2025})
+        self.assertEqual(response.status_code, 400)
+
+    def test_daily_totals_use_covering_index(self):
+        self.add_other_users(transactions_per_day=2)
+        start_date, end_date = month_date_range(2025, 3)
+        plan = explain(TransactionQueries.get_user_daily_totals(self.user.id, start_date, end_date))
+
+        # A partition's copy of the (user, date, id) INCLUDE (type, amount) index: the date range, no join
+        self.assertRegex(plan, r'Index Only Scan using accounts_transaction_\w+_user_id_date_id_type_amount_idx')
+        self.assertIn(f"Index Cond: ((user_id = {self.user.id}) AND (date >= '2025-03-01'::date) AND (date < '2025-04-01'::date))", plan)
+        self.assertNotIn('accounts_dailyrecord', plan)
+
+    def test_monthly_summary_uses_user_date_index(self):
+        self.add_other_users()
+        self.add_year_of_records(self.user)
+        start_date, end_date = month_date_range(2025, 3)
+        queryset = DailyRecord.objects.filter(user_id=self.user.id, date__gte=start_date, date__lt=end_date)
+        plan = explain(queryset)
+
+        self.assertRegex(plan, r'Index Scan (using|on) accounts_da_user_id_')
+        self.assertIn(f"Index Cond: ((user_id = {self.user.id}) AND (date >= '2025-03-01'::date) AND (date < '2025-04-01'::date))", plan)
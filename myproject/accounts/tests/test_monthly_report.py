@@ -0,0 +1,107 @@
+from unittest import mock
+from smtplib import SMTPException
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction, MonthlyReportDelivery
+from ..tasks import send_monthly_reports, send_monthly_report_chunk
+from core.services.monthly_report import MonthlyReportService
+from core.services.categories import CategoryService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestMonthlyReportPipeline(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = []
+        for index in range(5):
+            user = CustomUser.objects.create_user(
+                username=f'user{index}',
+                email=f'user{index}@example.com',
+                password='testpass123'
+            )
+            daily_record = DailyRecord.objects.create(user=user, date=date(2025, 3, 10))
+            Transaction.objects.create(daily_record=daily_record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=100 + index, date=daily_record.date)
+            Transaction.objects.create(daily_record=daily_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=40, date=daily_record.date)
+            self.users.append(user)
+        CustomUser.objects.create_user(username='noemail', password='testpass123')
+        CustomUser.objects.create_user(username='inactive', email='inactive@example.com', password='testpass123', is_active=False)
+
+    def run_pipeline(self):
+        # Run the chunk tasks inline instead of through the broker
+        with mock.patch.object(send_monthly_report_chunk, 'delay', side_effect=send_monthly_report_chunk), \
+                mock.patch.object(MonthlyReportService, 'CHUNK_SIZE', 2):
+            return send_monthly_reports(2025, 3)
+
+    def test_sends_one_report_per_active_user(self):
+        chunks = self.run_pipeline()
+
+        self.assertEqual(chunks, 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [user.email for user in self.users])
+        report = next(message for message in mail.outbox if message.to == ['user2@example.com'])
+        self.assertIn("March 2025", report.subject)
+        self.assertIn("Total Income: 102.00 VND", report.body)
+        self.assertIn("Net Balance: 62.00 VND", report.body)
+        self.assertEqual(MonthlyReportService.get_progress(2025, 3), {'chunks': 3, 'chunks_done': 3, 'sent': 5})
+
+    def test_chunk_queries(self):
+        user_ids = [user.id for user in self.users]
+
+        # Recipients, grouped totals, then one delivery marker per sent message
+        with self.assertNumQueries(2 + len(user_ids)):
+            sent = MonthlyReportService.send_chunk(user_ids, 2025, 3)
+        self.assertEqual(sent, 5)
+
+    def test_rerun_is_idempotent(self):
+        self.run_pipeline()
+        mail.outbox.clear()
+
+        self.assertEqual(self.run_pipeline(), 0)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(MonthlyReportDelivery.objects.filter(year=2025, month=3).count(), 5)
+
+    def test_retry_resumes_after_failed_message(self):
+        user_ids = [user.id for user in self.users]
+        send = EmailMessage.send
+        calls = []
+
+        def flaky_send(message, *args, **kwargs):
+            calls.append(message.to[0])
+            if len(calls) == 3:
+                raise SMTPException("connection lost")
+            return send(message, *args, **kwargs)
+
+        with mock.patch.object(EmailMessage, 'send', flaky_send):
+            with self.assertRaises(SMTPException):
+                MonthlyReportService.send_chunk(user_ids, 2025, 3)
+        self.assertEqual(len(mail.outbox), 2)
+
+        MonthlyReportService.send_chunk(user_ids, 2025, 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [user.email for user in self.users])
+
+    def test_each_delivery_recorded_before_the_next_send(self):
+        # A worker killed mid-chunk must not lose the deliveries already sent
+        send = EmailMessage.send
+        recorded = []
+
+        def counting_send(message, *args, **kwargs):
+            recorded.append(MonthlyReportDelivery.objects.filter(year=2025, month=3).count())
+            return send(message, *args, **kwargs)
+
+        with mock.patch.object(EmailMessage, 'send', counting_send):
+            MonthlyReportService.send_chunk([user.id for user in self.users], 2025, 3)
+        self.assertEqual(recorded, list(range(len(self.users))))
+
+    def test_view_sends_to_the_user_email(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+
+        with mock.patch('accounts.views.send_monthly_report.delay') as delay:
+            response = client.post('/api/transactions/send-monthly-report/')
+
+        self.assertEqual(response.status_code, 200)
+        delay.assert_called_once_with('user0@example.com', self.users[0].id)
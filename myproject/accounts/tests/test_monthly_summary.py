@@ -0,0 +1,124 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.categories import CategoryService
+from core.services.transaction_cache import TransactionCacheService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class TestMonthlySummary(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.daily_record = DailyRecord.objects.create(
+            user=self.user,
+            date=date(2025, 3, 15)
+        )
+        self.salary = Transaction.objects.create(
+            daily_record=self.daily_record,
+            type='income',
+            category_id=CategoryService.get_id(None, 'salary'),
+            amount=100.00,
+            date=date(2025, 3, 15)
+        )
+        self.food = Transaction.objects.create(
+            daily_record=self.daily_record,
+            type='expense',
+            category_id=CategoryService.get_id(None, 'food'),
+            amount=30.00,
+            date=date(2025, 3, 15)
+        )
+        Transaction.objects.create(
+            daily_record=self.daily_record,
+            type='expense',
+            category_id=CategoryService.get_id(None, 'food'),
+            amount=20.00,
+            date=date(2025, 3, 16)
+        )
+
+    def summary(self, type, category, year=2025, month=3):
+        return UserMonthlySummary.objects.get(
+            user=self.user, year=year, month=month, type=type, category__key=category
+        )
+
+    def test_create_updates_rollup(self):
+        food = self.summary('expense', 'food')
+        self.assertEqual(food.total, Decimal('50.00'))
+        self.assertEqual(food.count, 2)
+        self.assertEqual(self.summary('income', 'salary').total, Decimal('100.00'))
+
+    def test_update_moves_amount_between_rows(self):
+        self.food.amount = Decimal('45.00')
+        self.food.category_id = CategoryService.get_id(None, 'transport')
+        self.food.date = date(2025, 4, 1)
+        self.food.save()
+
+        food = self.summary('expense', 'food')
+        self.assertEqual(food.total, Decimal('20.00'))
+        self.assertEqual(food.count, 1)
+        transport = self.summary('expense', 'transport', month=4)
+        self.assertEqual(transport.total, Decimal('45.00'))
+        self.assertEqual(transport.count, 1)
+
+    def test_delete_updates_rollup(self):
+        self.salary.delete()
+        salary = self.summary('income', 'salary')
+        self.assertEqual(salary.total, Decimal('0.00'))
+        self.assertEqual(salary.count, 0)
+
+    def test_cascading_user_delete(self):
+        self.user.delete()
+        self.assertFalse(UserMonthlySummary.objects.exists())
+
+    def test_rebuild_matches_incremental(self):
+        expected = set(UserMonthlySummary.objects.values_list('user', 'year', 'month', 'type', 'category', 'total', 'count'))
+        UserMonthlySummary.objects.all().delete()
+
+        call_command('rebuild_monthly_summaries', stdout=StringIO())
+
+        rebuilt = set(UserMonthlySummary.objects.values_list('user', 'year', 'month', 'type', 'category', 'total', 'count'))
+        self.assertEqual(rebuilt, expected)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_rebuild_bumps_data_versions(self):
+        cache.clear()
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        versions = {user.id: TransactionCacheService.get_data_version(user.id) for user in (self.user, other_user)}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(MonthlySummaryService.rebuild(), 2)
+        self.assertNotEqual(TransactionCacheService.get_data_version(self.user.id), versions[self.user.id])
+        self.assertEqual(TransactionCacheService.get_data_version(other_user.id), versions[other_user.id])
+
+        # Rows left by a user without transactions are rewritten too
+        UserMonthlySummary.objects.create(user=other_user, year=2025, month=3, type='expense',
+                                          category_id=CategoryService.get_id(None, 'food'), total=5, count=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(MonthlySummaryService.rebuild(other_user.id), 0)
+        self.assertNotEqual(TransactionCacheService.get_data_version(other_user.id), versions[other_user.id])
+        self.assertFalse(UserMonthlySummary.objects.filter(user=other_user).exists())
+
+    def test_get_month_totals(self):
+        totals = MonthlySummaryService.get_month_totals(self.user.id, 2025, 3)
+        self.assertEqual(totals['total_income'], Decimal('100.00'))
+        self.assertEqual(totals['total_expense'], Decimal('50.00'))
+
+    def test_monthly_endpoint_reads_rollup(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(1):
+            response = client.get('/api/transactions/monthly/', {'month': 3, 'year': 2025})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_income'], Decimal('100.00'))
+        self.assertEqual(response.data['total_expense'], Decimal('50.00'))
+        self.assertEqual(response.data['net_balance'], Decimal('50.00'))
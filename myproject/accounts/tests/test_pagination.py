@@ -0,0 +1,103 @@
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.transaction_partitions import TransactionPartitionService
+from datetime import date, timedelta
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        other_user = CustomUser.objects.create_user(
+            username='otheruser',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.transactions = []
+        for day in [1, 2, 2, 2, 3, 5, 5]:
+            daily_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, day))
+            self.transactions.append(Transaction.objects.create(
+                daily_record=daily_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=day, date=daily_record.date
+            ))
+        self.undated = Transaction.objects.create(
+            daily_record=daily_record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=1, date=None
+        )
+        other_record = DailyRecord.objects.create(user=other_user, date=date(2025, 3, 4))
+        Transaction.objects.create(daily_record=other_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=1, date=other_record.date)
+
+    def walk(self, url, page_size):
+        ids, pages = [], 0
+        params = {'page_size': page_size}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            ids += [row['id'] for row in response.data['results']]
+            url, params, pages = response.data['next'], {}, pages + 1
+        return ids, pages
+
+    def test_transactions_pages_are_complete_and_ordered(self):
+        ids, pages = self.walk('/api/transactions/', 3)
+
+        expected = sorted(self.transactions, key=lambda t: (t.date, t.id), reverse=True)
+        self.assertEqual(ids, [t.id for t in expected] + [self.undated.id])
+        self.assertEqual(pages, 3)
+
+    def test_deep_page_costs_one_query(self):
+        first = self.client.get('/api/transactions/', {'page_size': 2})
+        second_url = first.data['next']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(second_url)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_deep_page_plan_uses_the_user_index(self):
+        # Other users' rows on the same days, so the (date, id) index is not a cheaper walk,
+        # in a fresh partition of March, away from the bloat earlier tests leave in the default one
+        for index in range(20):
+            user = CustomUser.objects.create_user(username=f'noise{index}', password='testpass123')
+            records = DailyRecord.objects.bulk_create([
+                DailyRecord(user=user, date=date(2025, 3, 1) + timedelta(days=day)) for day in range(5)
+            ])
+            Transaction.objects.bulk_create([
+                Transaction(daily_record=record, user=user, type='expense', category_id=CategoryService.get_id(None, 'food'),
+                            amount=1, date=record.date)
+                for record in records for _ in range(4)
+            ])
+        TransactionPartitionService.create_partition(date(2025, 3, 1))
+
+        # The dated query of a page after (2025-03-03, id), as built by KeysetPagination
+        last = self.transactions[4]
+        queryset = Transaction.objects.filter(user=self.user, date__lte=last.date).filter(
+            Q(date__lt=last.date) | Q(id__lt=last.id)).order_by('-date', '-id')[:3]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # Statistics of the test rows, and the planner picks between ordered index scans
+            cursor.execute(f"ANALYZE {Transaction._meta.db_table}")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        # An ordered scan of the (user, date, id) index: no sort, no other users' rows
+        self.assertRegex(plan, r'Index Scan Backward using accounts_transaction_\w+_user_id_date_id_type_amount_idx')
+        self.assertNotIn('Sort  (', plan)
+
+    def test_daily_records_pages(self):
+        ids, pages = self.walk('/api/daily-records/', 4)
+
+        expected = DailyRecord.objects.filter(user=self.user).order_by('-date', '-id')
+        self.assertEqual(ids, [record.id for record in expected])
+        self.assertEqual(pages, 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/transactions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
@@ -2,6 +2,7 @@ from django.test import TestCase
 from django.utils import timezone
 from ..models import CustomUser, DailyRecord, Transaction
 from ..queries import DailyRecordQueries, TransactionQueries
+from core.services.categories import CategoryService
 from datetime import datetime, timedelta
 
 class TestQueries(TestCase):
@@ -16,23 +17,21 @@ class TestQueries(TestCase):
         today = timezone.now().date()
         self.daily_record = DailyRecord.objects.create(
             user=self.user,
-            date=today,
-            total_income=100.00,
-            total_expense=50.00
+            date=today
         )
         
-        # Create test transactions
+        # Create test transactions, which maintain the record's totals
         Transaction.objects.create(
             daily_record=self.daily_record,
             type='income',
-            category='salary',
+            category_id=CategoryService.get_id(None, 'salary'),
             amount=100.00,
             date=today
         )
         Transaction.objects.create(
             daily_record=self.daily_record,
             type='expense',
-            category='food',
+            category_id=CategoryService.get_id(None, 'food'),
             amount=50.00,
             date=today
         )
@@ -0,0 +1,132 @@
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.categories import CategoryService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestQueryBudgets(TestCase):
+    """
+    Every endpoint has a query budget that must hold for 1, 10 and 1,000 rows:
+    a count that grows with the number of rows is an N+1
+    """
+
+    SIZES = (1, 10, 1000)
+    LAST_DAY = date(2025, 3, 31)
+
+    def create_dataset(self, size):
+        """A user with `size` daily records, one transaction each, ending on LAST_DAY"""
+        user = CustomUser.objects.create_user(username=f'user{size}', password='testpass123')
+        records = DailyRecord.objects.bulk_create([
+            DailyRecord(user=user, date=self.LAST_DAY - timedelta(days=day)) for day in range(size)
+        ])
+        Transaction.objects.bulk_create([
+            Transaction(daily_record=record, user=user, type='expense' if record.id % 2 else 'income',
+                        category_id=CategoryService.get_id(None, 'food'), amount=10, date=record.date)
+            for record in records
+        ])
+        MonthlySummaryService.rebuild(user.id)
+        return user, records
+
+    def count_queries(self, size, request):
+        """Run request(client, user, records) against a dataset of `size` rows, caches cold"""
+        cache.clear()
+        user, records = self.create_dataset(size)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = request(client, user, records)
+            # Streaming responses run their queries while being consumed
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, response.content if not response.streaming else '')
+        return len(queries)
+
+    def assertQueryBudget(self, budget, request):
+        counts = {size: self.count_queries(size, request) for size in self.SIZES}
+        for size, count in counts.items():
+            self.assertLessEqual(count, budget, f"{count} queries for {size} rows, budget {budget}: {counts}")
+            self.assertLessEqual(count, counts[self.SIZES[0]], f"Query count grows with the rows: {counts}")
+
+    def test_daily_records_list(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            '/api/daily-records/', {'page_size': 500}))
+
+    def test_daily_record_retrieve(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            f'/api/daily-records/{records[0].id}/'))
+
+    def test_daily_record_destroy(self):
+        # Cascade to up to 1,000 transactions of one record (the move costs one query)
+        def request(client, user, records):
+            Transaction.objects.filter(daily_record__user=user).update(daily_record=records[0])
+            return client.delete(f'/api/daily-records/{records[0].id}/')
+        self.assertQueryBudget(8, request)
+
+    def test_transactions_list(self):
+        self.assertQueryBudget(2, lambda client, user, records: client.get(
+            '/api/transactions/', {'page_size': 500}))
+
+    def test_transactions_next_page(self):
+        def request(client, user, records):
+            first = client.get('/api/transactions/', {'page_size': 1})
+            return client.get(first.data['next']) if first.data['next'] else first
+        self.assertQueryBudget(2, request)
+
+    def test_monthly(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            '/api/transactions/monthly/', {'month': 3, 'year': 2025}))
+
+    def test_daily_expenses(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            '/api/transactions/daily-expenses/', {'month': 3, 'year': 2025}))
+
+    def test_export(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            '/api/transactions/export/', {'file_format': 'ndjson'}))
+
+    def test_breakdown(self):
+        # Cold cache, whole month: rollup and category names (compare=previous doubles it)
+        self.assertQueryBudget(2, lambda client, user, records: client.get(
+            '/api/transactions/breakdown/', {'start': '2025-03-01', 'end': '2025-03-31'}))
+
+    def test_time_series(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get(
+            '/api/transactions/time-series/', {'start': '2020-01-01', 'end': '2025-12-31', 'granularity': 'week'}))
+
+    def test_bulk_create(self):
+        def request(client, user, records):
+            rows = [
+                {'type': 'expense', 'category': 'food', 'amount': '1.00', 'date': record.date.isoformat()}
+                for record in records
+            ]
+            return client.post('/api/transactions/bulk/', rows, format='json')
+        # Includes the category lookup: CategoryService only caches ids once a transaction commits
+        self.assertQueryBudget(8, request)
+
+    def test_transaction_destroy(self):
+        self.assertQueryBudget(5, lambda client, user, records: client.delete(
+            f'/api/transactions/{records[0].transactions.get().id}/'))
+
+    def test_dashboard(self):
+        self.assertQueryBudget(1, lambda client, user, records: client.get('/api/dashboard/'))
+
+    def test_system_stats(self):
+        def request(client, user, records):
+            user.is_staff = True
+            client.force_authenticate(user=user)
+            return client.get('/api/system-stats/')
+        self.assertQueryBudget(1, request)
+
+    def test_user_destroy(self):
+        def request(client, user, records):
+            response = client.delete(f'/api/users/{user.id}/')
+            self.assertFalse(UserMonthlySummary.objects.filter(user_id=user.id).exists())
+            return response
+        self.assertQueryBudget(18, request)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from core.services.redis_cache import RedisCacheService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestGetOrCompute(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.keys = ['test:a', 'test:b']
+
+    def compute(self):
+        self.calls += 1
+        return {'test:a': self.calls, 'test:b': self.calls * 10}
+
+    def test_miss_then_hit(self):
+        self.assertEqual(RedisCacheService.get_or_compute(self.keys, self.compute), {'test:a': 1, 'test:b': 10})
+        self.assertEqual(RedisCacheService.get_or_compute(self.keys, self.compute), {'test:a': 1, 'test:b': 10})
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_values_served_while_locked(self):
+        RedisCacheService.get_or_compute(self.keys, self.compute)
+        cache.delete('test:a' + RedisCacheService.FRESH_MARKER_SUFFIX)
+        # Another worker is already refreshing the group
+        cache.add('test:a' + RedisCacheService.LOCK_SUFFIX, 1)
+
+        self.assertEqual(RedisCacheService.get_or_compute(self.keys, self.compute), {'test:a': 1, 'test:b': 10})
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_values_refreshed_by_lock_holder(self):
+        RedisCacheService.get_or_compute(self.keys, self.compute)
+        cache.delete('test:a' + RedisCacheService.FRESH_MARKER_SUFFIX)
+
+        self.assertEqual(RedisCacheService.get_or_compute(self.keys, self.compute), {'test:a': 2, 'test:b': 20})
+        self.assertIsNone(cache.get('test:a' + RedisCacheService.LOCK_SUFFIX))
+
+    def test_partial_group_is_a_miss(self):
+        RedisCacheService.get_or_compute(self.keys, self.compute)
+        cache.delete('test:b')
+
+        self.assertEqual(RedisCacheService.get_or_compute(self.keys, self.compute), {'test:a': 2, 'test:b': 20})
+
+    def test_invalidate_namespace(self):
+        key = RedisCacheService.versioned_key('user:1', 'totals')
+        RedisCacheService.invalidate_namespace('user:1')
+        self.assertNotEqual(RedisCacheService.versioned_key('user:1', 'totals'), key)
+        self.assertEqual(RedisCacheService.versioned_key('user:2', 'totals').split(':v')[0], 'user:2')
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.request_metrics import RequestMetricsService
+from core.services.categories import CategoryService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE, METRICS_TOKEN='scrape-secret')
+class TestRequestMetrics(TestCase):
+    def setUp(self):
+        cache.clear()
+        RequestMetricsService.reset()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        daily_record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+        Transaction.objects.create(daily_record=daily_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=10, date=daily_record.date)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/transactions/monthly/', {'month': 3, 'year': 2025})
+
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('cache;desc="0 hits, 1 misses"', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_histograms_by_view(self):
+        self.client.get('/api/transactions/', {'page_size': 10})
+        self.client.get('/api/dashboard/')
+        self.client.get('/api/dashboard/')
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+
+        self.assertIn('http_request_duration_seconds_count{view="TransactionViewSet.list"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="DashboardView"} 2', body)
+        # Dated rows, then the undated rows of a short first page
+        self.assertIn('http_request_db_queries_bucket{view="TransactionViewSet.list",le="2.0"} 1', body)
+        self.assertIn('http_request_cache_lookups_total{view="DashboardView",result="hit"} 1', body)
+        self.assertIn('http_request_cache_lookups_total{view="DashboardView",result="miss"} 1', body)
+        # The scrape endpoint does not record itself
+        self.assertNotIn('view="metrics"', body)
+
+        serializer = RequestMetricsService.histograms['serializer_time'].series['TransactionViewSet.list']
+        self.assertGreater(serializer[1], 0)
+
+    def test_metrics_access(self):
+        scraper = APIClient()
+        self.assertEqual(scraper.get('/metrics').status_code, 403)
+        self.assertEqual(scraper.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(scraper.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(scraper.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+        # Session logins: staff only
+        scraper.force_login(self.user)
+        self.assertEqual(scraper.get('/metrics').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(scraper.get('/metrics').status_code, 200)
@@ -0,0 +1,106 @@
+import random
+from datetime import date, timedelta
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.spending_analytics import SpendingAnalyticsService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TODAY = date(2025, 3, 10)
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestSpendingAnalytics(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.categories = {name: CategoryService.get_id(None, name) for name in ('salary', 'food', 'transport')}
+        rng = random.Random(7)
+        self.rows = []
+        records = {}
+        for offset in range(0, 120, 3):
+            day = TODAY - timedelta(days=offset)
+            records[day] = DailyRecord.objects.create(user=self.user, date=day)
+            self.rows.append((day, 'expense', 'food', rng.randint(100, 5000)))
+            if offset % 9 == 0:
+                self.rows.append((day, 'expense', 'transport', rng.randint(100, 900)))
+        for month_start in (date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)):
+            records.setdefault(month_start, DailyRecord.objects.create(user=self.user, date=month_start))
+            self.rows.append((month_start, 'income', 'salary', 300000))
+        # Future transactions are ignored
+        records[TODAY + timedelta(days=1)] = DailyRecord.objects.create(user=self.user, date=TODAY + timedelta(days=1))
+        Transaction.objects.create(daily_record=records[TODAY + timedelta(days=1)], type='expense',
+                                   category_id=self.categories['food'], amount=999, date=TODAY + timedelta(days=1))
+
+        Transaction.objects.bulk_create([
+            Transaction(daily_record=records[day], user=self.user, type=type, category_id=self.categories[category],
+                        amount=cents / 100, date=day)
+            for day, type, category, cents in self.rows
+        ])
+
+    def expenses(self, start, end):
+        return sum(cents for day, type, _, cents in self.rows if type == 'expense' and start <= day <= end)
+
+    def test_load(self):
+        history = SpendingAnalyticsService.load(self.user.id)
+        self.assertEqual(len(history), len(self.rows) + 1)
+        self.assertEqual(history.cents.dtype, np.int64)
+        self.assertEqual(int(history.cents[history.is_income].sum()), 4 * 300000)
+
+    def test_metrics(self):
+        result = SpendingAnalyticsService.compute(SpendingAnalyticsService.load(self.user.id), TODAY)
+        self.assertEqual(result['transactions'], len(self.rows))
+
+        averages = dict(zip(result['moving_averages']['window_days'], result['moving_averages']['daily_expense']))
+        for window in (7, 30, 90):
+            expected = self.expenses(TODAY - timedelta(days=window - 1), TODAY) / 100 / window
+            self.assertAlmostEqual(averages[window], expected, places=2)
+
+        percentiles = {row['category']: row for row in result['category_percentiles']}
+        for name in ('food', 'transport'):
+            amounts = [cents / 100 for _, type, category, cents in self.rows if category == name]
+            self.assertEqual(percentiles[name]['count'], len(amounts))
+            for pct in (50, 90, 99):
+                self.assertAlmostEqual(percentiles[name][f'p{pct}'], np.percentile(amounts, pct), delta=0.01)
+        self.assertNotIn('salary', percentiles)
+
+        projection = result['month_end_projection']
+        self.assertEqual((projection['month'], projection['days_elapsed'], projection['days_in_month']), ('2025-03', 10, 31))
+        self.assertAlmostEqual(projection['expense_to_date'], self.expenses(date(2025, 3, 1), TODAY) / 100, places=2)
+        self.assertAlmostEqual(projection['projected_expense'], projection['expense_to_date'] / 10 * 31, places=1)
+
+        savings = result['savings_rate']
+        self.assertEqual(savings['months'][0], '2024-11')
+        self.assertEqual(savings['months'][-1], '2025-03')
+        self.assertIsNone(savings['rate'][0])  # No income in November
+        february = savings['months'].index('2025-02')
+        expense = self.expenses(date(2025, 2, 1), date(2025, 2, 28))
+        self.assertAlmostEqual(savings['rate'][february], (300000 - expense) / 300000, places=4)
+        self.assertIsNotNone(savings['trend_per_month'])
+
+    def test_empty_history(self):
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        result = SpendingAnalyticsService.compute(SpendingAnalyticsService.load(other_user.id), TODAY)
+        self.assertEqual(result['transactions'], 0)
+        self.assertEqual(result['category_percentiles'], [])
+        self.assertEqual(result['savings_rate']['rate'], [None])
+
+    def test_endpoint_cached_until_the_next_write(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get('/api/transactions/analytics/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/transactions/analytics/').json(), response.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record = DailyRecord.objects.create(user=self.user, date=date.today())
+            Transaction.objects.create(daily_record=record, type='income', category_id=self.categories['salary'],
+                                       amount=1, date=record.date)
+        self.assertEqual(client.get('/api/transactions/analytics/').json()['transactions'],
+                         response.json()['transactions'] + 1)
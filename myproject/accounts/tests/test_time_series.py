@@ -0,0 +1,67 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.time_series import TimeSeriesService
+from datetime import date
+
+class TestTimeSeries(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        salary = CategoryService.get_id(None, 'salary')
+        food = CategoryService.get_id(None, 'food')
+        for day, type, amount in [(date(2024, 12, 30), 'income', 100), (date(2025, 1, 2), 'expense', 20),
+                                  (date(2025, 1, 3), 'expense', '5.50'), (date(2025, 3, 10), 'income', 50)]:
+            daily_record, _ = DailyRecord.objects.get_or_create(user=self.user, date=day)
+            Transaction.objects.create(daily_record=daily_record, type=type,
+                                       category_id=salary if type == 'income' else food, amount=amount, date=day)
+        other_record = DailyRecord.objects.create(user=other_user, date=date(2025, 1, 2))
+        Transaction.objects.create(daily_record=other_record, type='expense', category_id=food, amount=999, date=other_record.date)
+
+    def test_days_are_zero_filled(self):
+        series = TimeSeriesService.get_user_series(self.user.id, date(2024, 12, 31), date(2025, 1, 3))
+        self.assertEqual(series['dates'], [date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)])
+        self.assertEqual(series['income'], [0, 0, 0, 0])
+        self.assertEqual(series['expense'], [Decimal('0'), Decimal('0'), Decimal('20.00'), Decimal('5.50')])
+
+    def test_weeks_months_years(self):
+        weeks = TimeSeriesService.get_user_series(self.user.id, date(2024, 12, 30), date(2025, 1, 12), 'week')
+        self.assertEqual(weeks['dates'], [date(2024, 12, 30), date(2025, 1, 6)])
+        self.assertEqual(weeks['income'], [Decimal('100.00'), 0])
+        self.assertEqual(weeks['expense'], [Decimal('25.50'), 0])
+
+        months = TimeSeriesService.get_user_series(self.user.id, date(2024, 12, 15), date(2025, 3, 31), 'month')
+        self.assertEqual(months['dates'], [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        self.assertEqual(months['income'], [Decimal('100.00'), 0, 0, Decimal('50.00')])
+
+        years = TimeSeriesService.get_user_series(self.user.id, date(2024, 1, 1), date(2025, 12, 31), 'year')
+        self.assertEqual(years['dates'], [date(2024, 1, 1), date(2025, 1, 1)])
+        self.assertEqual(years['expense'], [0, Decimal('25.50')])
+
+    def test_endpoint(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/transactions/time-series/', {
+                'start': '2024-12-01', 'end': '2025-03-31', 'granularity': 'month'
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'start': '2024-12-01', 'end': '2025-03-31', 'granularity': 'month',
+            'dates': ['2024-12-01', '2025-01-01', '2025-02-01', '2025-03-01'],
+            'income': [100.0, 0.0, 0.0, 50.0],
+            'expense': [0.0, 25.5, 0.0, 0.0],
+        })
+
+    def test_invalid_params(self):
+        for params in [{'granularity': 'hour'}, {'start': '2025-13-01'},
+                       {'start': '2025-03-02', 'end': '2025-03-01'},
+                       {'start': '2000-01-01', 'end': '2025-01-01', 'granularity': 'day'}]:
+            response = self.client.get('/api/transactions/time-series/', params)
+            self.assertEqual(response.status_code, 400, params)
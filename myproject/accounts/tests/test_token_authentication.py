@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from ..models import CustomUser
+from core.services.token_cache import TokenCacheService
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestTokenAuthentication(TestCase):
+    def setUp(self):
+        cache.clear()
+        TokenCacheService.clear_local()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_no_auth_query_once_cached(self):
+        with self.assertNumQueries(2):  # Token + user join, dashboard totals
+            self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+
+        # Another process: its LRU is empty, the user is read from the shared cache
+        TokenCacheService.clear_local()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.username, 'testuser')
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+    def test_deactivated_user(self):
+        self.client.get('/api/dashboard/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'detail': 'User inactive or deleted.'})
+
+    def test_deleted_token(self):
+        self.client.get('/api/dashboard/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 401)
+
+    def test_cached_user_is_not_shared(self):
+        self.client.get('/api/dashboard/')
+        user = TokenCacheService.get_user(self.token.key)
+        user.first_name = 'changed'
+        self.assertEqual(TokenCacheService.get_user(self.token.key).first_name, '')
+
+    def test_cached_entry(self):
+        self.client.get('/api/dashboard/')
+        self.assertIsNone(cache.get(f'auth:token:{self.token.key}'))
+        self.assertEqual(cache.get(TokenCacheService.get_key(self.token.key)), (self.user.id, True, False))
+
+        user = TokenCacheService.get_user(self.token.key)
+        with self.assertNumQueries(1):  # Deferred fields load on first access
+            self.assertEqual(user.username, 'testuser')
+
+    def test_lookup_racing_a_deactivation(self):
+        # The lookup reads the active user, the deactivation commits before it stores the entry
+        find_user = TokenCacheService.find_user
+
+        def racing_find_user(key):
+            user = find_user(key)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.is_active = False
+                self.user.save()
+            return user
+
+        with mock.patch.object(TokenCacheService, 'find_user', racing_find_user):
+            self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+        self.assertEqual(cache.get(TokenCacheService.get_key(self.token.key)), TokenCacheService.REVOKED)
+
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'detail': 'User inactive or deleted.'})
+
+    def test_benchmark_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'auth.json')
+            call_command('benchmark_auth', '--iterations', '3', '--output', output, stdout=io.StringIO())
+            with open(output) as f:
+                results = json.load(f)['results']
+
+        for endpoint in ('dashboard', 'monthly'):
+            self.assertEqual(results[endpoint]['token']['auth_queries_mean'], 1)
+            self.assertEqual(results[endpoint]['cached_shared']['auth_queries_mean'], 0)
+            self.assertEqual(results[endpoint]['cached_local']['auth_queries_mean'], 0)
+            self.assertEqual(results[endpoint]['token']['queries_mean'] - 1,
+                             results[endpoint]['cached_local']['queries_mean'])
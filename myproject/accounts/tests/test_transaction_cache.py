@@ -0,0 +1,145 @@
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ..models import CustomUser, DailyRecord, Transaction
+from core.services.redis_cache import RedisCacheService
+from core.services.transaction_cache import TransactionCacheService
+from core.services.categories import CategoryService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestTransactionCacheDeltas(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.daily_record = DailyRecord.objects.create(
+            user=self.user,
+            date=date(2025, 3, 15)
+        )
+        self.salary = Transaction.objects.create(
+            daily_record=self.daily_record,
+            type='income',
+            category_id=CategoryService.get_id(None, 'salary'),
+            amount=100.00,
+            date=date(2025, 3, 15)
+        )
+
+    def create_expense(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                daily_record=self.daily_record,
+                type='expense',
+                category_id=CategoryService.get_id(None, 'food'),
+                amount=amount,
+                date=date(2025, 3, 15)
+            )
+
+    def test_write_increments_cached_totals_without_recompute(self):
+        # Warm the cache
+        TransactionCacheService.get_user_totals(self.user.id)
+        TransactionCacheService.get_system_totals()
+
+        self.create_expense(Decimal('12.50'))
+
+        with self.assertNumQueries(0):
+            user_totals = TransactionCacheService.get_user_totals(self.user.id)
+            system_totals = TransactionCacheService.get_system_totals()
+
+        self.assertEqual(user_totals['total_expense'], Decimal('12.50'))
+        self.assertEqual(user_totals['total_income'], Decimal('100.00'))
+        self.assertEqual(system_totals['total_expense'], Decimal('12.50'))
+
+    def test_one_generation_lookup_per_read_and_write(self):
+        TransactionCacheService.get_user_totals(self.user.id)
+        TransactionCacheService.get_system_totals()
+
+        with mock.patch.object(RedisCacheService, 'get_generation', wraps=RedisCacheService.get_generation) as get_generation:
+            TransactionCacheService.get_user_totals(self.user.id)
+        self.assertEqual(get_generation.call_count, 1)
+
+        # The user and system namespaces of the write's increments share one get_many,
+        # their computation locks another one
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            TransactionCacheService.apply_transaction_deltas({(self.user.id, 'income'): 5, (self.user.id, 'expense'): 2})
+        self.assertEqual(get_many.call_count, 2)
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_income'], Decimal('105.00'))
+        self.assertEqual(TransactionCacheService.get_system_totals()['total_expense'], Decimal('2.00'))
+
+    def test_update_and_delete_apply_deltas(self):
+        TransactionCacheService.get_user_totals(self.user.id)
+        expense = self.create_expense(Decimal('12.50'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expense.amount = Decimal('20.00')
+            expense.save()
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_expense'], Decimal('20.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.salary.delete()
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_income'], Decimal('0.00'))
+
+    def test_missing_key_falls_back_to_recompute(self):
+        self.create_expense(Decimal('12.50'))
+
+        with self.assertNumQueries(1):
+            user_totals = TransactionCacheService.get_user_totals(self.user.id)
+
+        self.assertEqual(user_totals['total_expense'], Decimal('12.50'))
+        self.assertEqual(user_totals['total_income'], Decimal('100.00'))
+
+    def compute_racing_a_write(self, amount):
+        """get_user_totals whose computation commits a write between its query and its store"""
+        to_cents = TransactionCacheService.to_cents
+        written = []
+
+        def write_after_query(value):
+            if not written:
+                written.append(True)
+                self.create_expense(amount)
+            return to_cents(value)
+
+        with mock.patch.object(TransactionCacheService, 'to_cents', side_effect=write_after_query):
+            return TransactionCacheService.get_user_totals(self.user.id)
+
+    def test_write_during_computation_of_missing_totals(self):
+        # The write's increments miss: the totals read before it must not be kept
+        self.assertEqual(self.compute_racing_a_write(Decimal('12.50'))['total_expense'], Decimal('0.00'))
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_expense'], Decimal('12.50'))
+
+    def test_write_during_refresh_of_stale_totals(self):
+        # The write increments the stale values the refresh is about to overwrite
+        TransactionCacheService.get_user_totals(self.user.id)
+        income_key, _ = TransactionCacheService.get_total_keys(TransactionCacheService.get_user_namespace(self.user.id))
+        cache.delete(income_key + RedisCacheService.FRESH_MARKER_SUFFIX)
+
+        self.assertEqual(self.compute_racing_a_write(Decimal('12.50'))['total_expense'], Decimal('0.00'))
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_expense'], Decimal('12.50'))
+
+    def test_invalidate_user_cache_bumps_generation(self):
+        TransactionCacheService.get_user_totals(self.user.id)
+        old_key = TransactionCacheService.get_user_total_key(self.user.id, 'income')
+
+        TransactionCacheService.invalidate_user_cache(self.user.id)
+
+        new_key = TransactionCacheService.get_user_total_key(self.user.id, 'income')
+        self.assertNotEqual(old_key, new_key)
+        self.assertIsNone(cache.get(new_key))
+        with self.assertNumQueries(1):
+            TransactionCacheService.get_user_totals(self.user.id)
+
+    def test_invalidate_system_cache_keeps_user_cache(self):
+        TransactionCacheService.get_user_totals(self.user.id)
+        TransactionCacheService.get_system_totals()
+
+        TransactionCacheService.invalidate_system_cache()
+
+        with self.assertNumQueries(0):
+            TransactionCacheService.get_user_totals(self.user.id)
+        with self.assertNumQueries(1):
+            TransactionCacheService.get_system_totals()
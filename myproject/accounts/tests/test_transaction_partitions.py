@@ -0,0 +1,115 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from ..models import CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from ..queries import TransactionQueries, month_date_range
+from core.services.daily_totals import DailyTotalsService
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.transaction_cache import TransactionCacheService
+from core.services.transaction_partitions import TransactionPartitionService
+from core.services.categories import CategoryService
+from datetime import date
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql, params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+class TestTransactionPartitions(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        for day in [date(2020, 1, 15), date(2020, 2, 15), date(2020, 3, 15)]:
+            daily_record = DailyRecord.objects.create(user=self.user, date=day)
+            Transaction.objects.create(daily_record=daily_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=10, date=day)
+
+    def maintain(self, *args, **kwargs):
+        # Archiving alters tables: the test's deferred foreign key checks must not be pending
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        return TransactionPartitionService.maintain(*args, **kwargs)
+
+    def partition_names(self):
+        return [name for name, _, _ in TransactionPartitionService.get_partitions()]
+
+    def test_create_partition_moves_default_rows(self):
+        self.assertTrue(TransactionPartitionService.create_partition(date(2020, 2, 1)))
+        self.assertFalse(TransactionPartitionService.create_partition(date(2020, 2, 1)))
+        self.assertIn('accounts_transaction_p2020_02', self.partition_names())
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT date FROM accounts_transaction_p2020_02")
+            self.assertEqual(cursor.fetchall(), [(date(2020, 2, 15),)])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+        # A month-scoped query reads that month's partition only
+        start_date, end_date = month_date_range(2020, 2)
+        plan = explain(TransactionQueries.get_user_daily_totals(self.user.id, start_date, end_date))
+        self.assertIn('accounts_transaction_p2020_02', plan)
+        self.assertNotIn('accounts_transaction_default', plan)
+
+    def test_ensure_partitions(self):
+        created = TransactionPartitionService.ensure_partitions(2, today=date(2031, 11, 5))
+        self.assertEqual(created, [
+            'accounts_transaction_p2031_11',
+            'accounts_transaction_p2031_12',
+            'accounts_transaction_p2032_01',
+        ])
+        self.assertEqual(TransactionPartitionService.ensure_partitions(2, today=date(2031, 11, 5)), [])
+
+    def test_retention_detaches_old_partitions(self):
+        for month in (1, 2, 3):
+            TransactionPartitionService.create_partition(date(2020, month, 1))
+
+        created, detached = self.maintain(0, 1, today=date(2020, 3, 10))
+        self.assertEqual(created, [])
+        self.assertEqual(detached, ['accounts_transaction_p2020_01'])
+        self.assertNotIn('accounts_transaction_p2020_01', self.partition_names())
+        self.assertEqual(
+            list(Transaction.objects.order_by('date').values_list('date', flat=True)),
+            [date(2020, 2, 15), date(2020, 3, 15)]
+        )
+
+    def test_reconcile_and_rebuild_after_detach(self):
+        # January's record also holds an undated transaction, kept in the default partition
+        january = DailyRecord.objects.get(date=date(2020, 1, 15))
+        Transaction.objects.create(daily_record=january, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=5, date=None)
+        deleted_record = DailyRecord.objects.create(user=self.user, date=date(2020, 1, 20))
+        Transaction.objects.create(daily_record=deleted_record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=7, date=deleted_record.date)
+        for month in (1, 2, 3):
+            TransactionPartitionService.create_partition(date(2020, month, 1))
+        list(DailyTotalsService.reconcile())
+        MonthlySummaryService.rebuild(self.user.id)
+
+        version = TransactionCacheService.get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.maintain(0, 1, today=date(2020, 3, 10))
+        self.assertNotEqual(TransactionCacheService.get_data_version(self.user.id), version)
+
+        # Nothing left for reconcile or rebuild to change
+        self.assertEqual([rows for _, _, rows in DailyTotalsService.reconcile(fix=False) if rows], [])
+        self.assertEqual(
+            list(DailyRecord.objects.order_by('date').values_list('date', 'total_income', 'total_expense')),
+            [(date(2020, 1, 15), 5, 0), (date(2020, 2, 15), 0, 10), (date(2020, 3, 15), 0, 10)]
+        )
+        summaries = list(UserMonthlySummary.objects.order_by('year', 'month').values_list('year', 'month', 'total'))
+        self.assertEqual(summaries, [(2020, 2, 10), (2020, 3, 10)])
+        MonthlySummaryService.rebuild(self.user.id)
+        self.assertEqual(list(UserMonthlySummary.objects.order_by('year', 'month').values_list('year', 'month', 'total')), summaries)
+
+        # The detached table no longer references the live tables
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM pg_constraint WHERE conrelid = 'accounts_transaction_p2020_01'::regclass AND contype = 'f'")
+            self.assertEqual(cursor.fetchone(), (0,))
+            cursor.execute("SELECT SUM(amount) FROM accounts_transaction_p2020_01")
+            self.assertEqual(cursor.fetchone(), (17,))
+
+    def test_command_lists_partitions(self):
+        TransactionPartitionService.create_partition(date(2020, 1, 1))
+        out = StringIO()
+        call_command('manage_transaction_partitions', '--list', stdout=out)
+        self.assertIn("accounts_transaction_p2020_01: 2020-01-01 to 2020-02-01", out.getvalue())
@@ -0,0 +1,111 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from ..models import Category, CustomUser, DailyRecord, Transaction, UserMonthlySummary
+from ..queries import income_expense_aggregates
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.categories import CategoryService
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.transaction_cache import TransactionCacheService
+from datetime import date
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TestTransactionUser(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='testuser', password='testpass123')
+        self.other_user = CustomUser.objects.create_user(username='otheruser', password='testpass123')
+        self.record = DailyRecord.objects.create(user=self.user, date=date(2025, 3, 1))
+        self.other_record = DailyRecord.objects.create(user=self.other_user, date=date(2025, 3, 1))
+
+    def test_user_follows_daily_record(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post('/api/transactions/', {
+            'daily_record': self.record.id, 'user': self.other_user.id, 'type': 'income',
+            'category': 'salary', 'amount': '25.00', 'date': '2025-03-01'
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = Transaction.objects.get(pk=response.data['id'])
+        self.assertEqual(created.user_id, self.user.id)
+
+        created.daily_record = self.other_record
+        created.save()
+        created.refresh_from_db()
+        self.assertEqual(created.user_id, self.other_user.id)
+
+        BulkTransactionService.ingest(self.user.id, [
+            {'type': 'expense', 'category': 'food', 'amount': 5, 'date': date(2025, 3, 2)}
+        ])
+        self.assertTrue(Transaction.objects.filter(date=date(2025, 3, 2), user=self.user).exists())
+
+    def test_reassigned_daily_record_moves_its_transactions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(daily_record=self.record, type='income', category_id=CategoryService.get_id(None, 'salary'), amount=25, date=self.record.date)
+            Transaction.objects.create(daily_record=self.record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=10, date=self.record.date)
+        # Warm both users' cached totals, so the move must adjust them
+        self.assertEqual(TransactionCacheService.get_user_totals(self.user.id)['total_income'], 25)
+        self.assertEqual(TransactionCacheService.get_user_totals(self.other_user.id)['total_income'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record.user = self.other_user
+            self.record.save()
+
+        self.assertEqual(set(Transaction.objects.filter(daily_record=self.record).values_list('user_id', flat=True)), {self.other_user.id})
+        for user, income, expense in [(self.user, 0, 0), (self.other_user, 25, 10)]:
+            self.assertEqual(TransactionCacheService.get_user_totals(user.id), {'total_income': income, 'total_expense': expense})
+            self.assertEqual(MonthlySummaryService.get_month_totals(user.id, 2025, 3)['total_income'], income)
+            self.assertEqual(MonthlySummaryService.get_month_totals(user.id, 2025, 3)['total_expense'], expense)
+
+    def test_reassigned_daily_record_moves_to_the_new_owner_categories(self):
+        rent = CategoryService.get_id(self.user.id, 'Rent')
+        other_rent = CategoryService.get_id(self.other_user.id, 'rent')
+        with self.captureOnCommitCallbacks(execute=True):
+            for category_id in (rent, CategoryService.get_id(self.user.id, 'Books'), CategoryService.get_id(None, 'food')):
+                Transaction.objects.create(daily_record=self.record, type='expense', category_id=category_id, amount=10, date=self.record.date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record.user = self.other_user
+            self.record.save()
+
+        books = Category.objects.get(user=self.other_user, key='books')
+        expected = {other_rent, books.id, CategoryService.get_id(None, 'food')}
+        self.assertEqual(set(Transaction.objects.filter(daily_record=self.record).values_list('category_id', flat=True)), expected)
+        self.assertEqual(books.name, 'Books')
+        summaries = UserMonthlySummary.objects.filter(total__gt=0)
+        self.assertEqual(set(summaries.values_list('user_id', 'category_id', 'total')),
+                         {(self.other_user.id, category_id, 10) for category_id in expected})
+
+        # Nothing of the other user references the previous owner's categories any more
+        self.user.delete()
+        self.assertEqual(Transaction.objects.filter(daily_record=self.record).count(), 3)
+        self.assertEqual(MonthlySummaryService.get_month_totals(self.other_user.id, 2025, 3)['total_expense'], 30)
+
+    def test_user_totals_are_index_only(self):
+        # The per-type totals of TransactionCacheService.get_user_totals
+        queryset = Transaction.objects.filter(user_id=self.user.id).values('type').annotate(
+            **income_expense_aggregates())
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn('Index Only Scan using', plan)
+        self.assertNotIn('accounts_dailyrecord', plan)
+
+    def test_backfill_command(self):
+        transaction = Transaction.objects.create(
+            daily_record=self.record, type='expense', category_id=CategoryService.get_id(None, 'food'), amount=10, date=self.record.date)
+        Transaction.objects.filter(pk=transaction.pk).update(user=self.other_user)
+
+        out = StringIO()
+        call_command('backfill_transaction_users', '--batch-size', '1', stdout=out)
+        self.assertIn("Updated the user of 1 transactions", out.getvalue())
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.user_id, self.user.id)
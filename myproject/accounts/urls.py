@@ -1,5 +1,6 @@
 from django.urls import path, include
 from .views import RegisterView, LoginView, UserViewSet, DailyRecordViewSet, TransactionViewSet, DashboardView, SystemStatsView
+from .async_views import AsyncDashboardView, AsyncSystemStatsView
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -13,4 +14,7 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('system-stats/', SystemStatsView.as_view(), name='system-stats'),
+    # Async versions, for the ASGI deployment
+    path('async/dashboard/', AsyncDashboardView.as_view(), name='async-dashboard'),
+    path('async/system-stats/', AsyncSystemStatsView.as_view(), name='async-system-stats'),
 ]
\ No newline at end of file
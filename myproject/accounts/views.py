@@ -13,15 +13,77 @@ from .models import DailyRecord, Transaction
 from .serializers import UserSerializer, DailyRecordSerializer, TransactionSerializer
 from django.contrib.auth import get_user_model
 
-from django.db.models import Sum
+import hashlib
 from datetime import datetime
 from rest_framework.decorators import action
-from collections import defaultdict
+from rest_framework.exceptions import ValidationError
 from .tasks import send_monthly_report
+from .queries import TransactionQueries, month_date_range
+from .pagination import KeysetPagination
 from core.services.transaction_cache import TransactionCacheService
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.month_cache import MonthCacheService
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.transaction_export import TransactionExportService
+from core.services.categories import CategoryService
+from core.services.time_series import TimeSeriesService
+from core.services.category_breakdown import CategoryBreakdownService
+from core.services.spending_analytics import SpendingAnalyticsService
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 User = get_user_model()
 
+def get_month_params(request):
+    """
+    Read `month` and `year` query params, defaulting to the current month
+    Raises ValidationError (400) if they do not form a valid month
+    """
+    now = datetime.now()
+    try:
+        month = int(request.query_params.get('month', now.month))
+        year = int(request.query_params.get('year', now.year))
+        month_date_range(year, month)
+    except ValueError:
+        raise ValidationError({'error': 'Invalid month or year'})
+    return month, year
+
+def data_version_etag(request, *args, **kwargs):
+    """
+    Strong ETag of a per-user read: the user's data version (bumped by every
+    committed Transaction/DailyRecord write), the URL with its query params,
+    the response format and today's date, since missing month params default
+    to the current month
+    Costs one cache read, no query: matching requests get a 304 before the view runs
+    None (no ETag, a plain 200) when the data version cannot be read
+    """
+    version = TransactionCacheService.get_data_version(request.user.id)
+    if version is None:
+        return None
+    return format_data_version_etag(request, version, request.accepted_renderer.format)
+
+def format_data_version_etag(request, version: int, format: str) -> str:
+    """ETag of data_version_etag for a data version already read (sync and async views)"""
+    resource = f"{request.get_full_path()}|{format}|{datetime.now().date()}"
+    return f"{request.user.id}-{version}-{hashlib.sha1(resource.encode()).hexdigest()[:16]}"
+
+# Conditional GET (If-None-Match -> 304 Not Modified) for the actions of a DRF view
+conditional_on_data_version = method_decorator(condition(etag_func=data_version_etag))
+
+def get_date_param(request, name, default):
+    """
+    Read a YYYY-MM-DD query param, `default` when missing
+    Raises ValidationError (400) if it is not a valid date
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({'error': 'Invalid date format. Use YYYY-MM-DD.'})
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
     def post(self, request):
@@ -46,92 +108,191 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]  # For user logined
 
+    def perform_destroy(self, instance):
+        # Set-based delete of the user's records and transactions instead of per-row signals
+        BulkTransactionService.delete_daily_records(instance.id, instance.daily_records.all())
+        instance.delete()
+
 # ViewSet for DailyRecord
 class DailyRecordViewSet(viewsets.ModelViewSet):
     queryset = DailyRecord.objects.all()
     serializer_class = DailyRecordSerializer
     permission_classes = [IsAuthenticated]  # For user logined
+    pagination_class = KeysetPagination  # Cursor over (date, id), newest first
 
     def perform_create(self, serializer):
         # Assign current user to the daily record
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        # Set-based delete of the record's transactions instead of per-row signals
+        BulkTransactionService.delete_daily_records(
+            instance.user_id, DailyRecord.objects.filter(pk=instance.pk))
+
     def get_queryset(self):
-        return DailyRecord.objects.filter(user=self.request.user)
+        # DailyRecordSerializer renders the username: join it instead of one query per record
+        return DailyRecord.objects.filter(user=self.request.user).select_related('user')
 
 # ViewSet for Transaction
 class TransactionViewSet(viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]  # For user logined
+    pagination_class = KeysetPagination  # Cursor over (date, id), newest first
 
     def get_queryset(self):
-        # Filter Transactions follow Daily Records of current user
-        return Transaction.objects.filter(daily_record__user=self.request.user)
+        # Transactions of the current user (denormalized owner, no join),
+        # TransactionSerializer renders the category name: join it instead of one query per row
+        return Transaction.objects.filter(user=self.request.user).select_related('category')
 
     @action(detail=False, methods=['get'], url_path='monthly')
+    @conditional_on_data_version
     def monthly(self, request):
-        month = request.query_params.get('month', datetime.now().month)
-        year = request.query_params.get('year', datetime.now().year)
-
-        queryset = self.get_queryset()
-
-        total_expense = queryset.filter(
-            type="expense",
-            date__month=month,
-            date__year=year
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        month, year = get_month_params(request)
 
-        total_income = queryset.filter(
-            type="income",
-            date__month=month,
-            date__year=year
-        ).aggregate(total=Sum('amount'))['total'] or 0
+        def compute():
+            # Read from the per-user monthly rollup instead of scanning transactions
+            totals = MonthlySummaryService.get_month_totals(request.user.id, year, month)
+            return {"month": month,
+                    "year": year,
+                    "total_expense": totals['total_expense'],
+                    "total_income": totals['total_income'],
+                    "net_balance": totals['net_balance']}
 
-        response_data = {"month": month, 
-                         "year": year, 
-                         "total_expense": total_expense,
-                         "total_income": total_income,
-                         "net_balance": total_income - total_expense}
+        response_data = MonthCacheService.get_or_compute(request.user.id, 'monthly', year, month, compute)
 
         return Response(response_data, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['get'], url_path='daily-expenses')
+    @conditional_on_data_version
     def daily_expenses(self, request):
         # Lấy tháng và năm từ query params
-        month = request.query_params.get('month', datetime.now().month)
-        year = request.query_params.get('year', datetime.now().year)
-
-        # Lọc giao dịch theo tháng và năm dựa trên trường `date`
-        transactions = self.get_queryset().filter(
-            date__month=month,
-            date__year=year
-        ).values('date', 'type').annotate(total=Sum('amount'))
-
-        # Tổ chức dữ liệu theo ngày
-        daily_data = defaultdict(lambda: {'income': 0, 'expense': 0})
-        for transaction in transactions:
-            date = transaction['date']
-            daily_data[date][transaction['type']] += transaction['total']
-
-        # Chuyển đổi dữ liệu thành danh sách
-        result = [
-            {'date': date, 'income': data['income'], 'expense': data['expense']}
-            for date, data in sorted(daily_data.items())
-        ]
+        month, year = get_month_params(request)
+        start_date, end_date = month_date_range(year, month)
+
+        def compute():
+            # One range query on `date`, income/expense/net per day already ordered by date
+            transactions = TransactionQueries.get_user_daily_totals(request.user.id, start_date, end_date)
+            return [
+                {'date': row['date'],
+                 'income': row['total_income'],
+                 'expense': row['total_expense'],
+                 'net_balance': row['net_balance']}
+                for row in transactions
+            ]
+
+        result = MonthCacheService.get_or_compute(request.user.id, 'daily_expenses', year, month, compute)
 
         return Response({"month": month, "year": year, "daily_expenses": result})
     
+    @action(detail=False, methods=['get'], url_path='time-series')
+    def time_series(self, request):
+        """
+        Income and expense per day, week, month or year, zero-filled, as columnar arrays
+        Query params: start/end (YYYY-MM-DD, inclusive, default: the current month),
+        granularity=day|week|month|year (default: day)
+        """
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TimeSeriesService.GRANULARITIES:
+            raise ValidationError({'error': 'granularity must be day, week, month or year'})
+
+        today = datetime.now().date()
+        start_date = get_date_param(request, 'start', today.replace(day=1))
+        end_date = get_date_param(request, 'end', today)
+        if start_date > end_date:
+            raise ValidationError({'error': 'start must not be after end'})
+        if TimeSeriesService.bucket_count(start_date, end_date, granularity) > TimeSeriesService.MAX_BUCKETS:
+            raise ValidationError({'error': f'At most {TimeSeriesService.MAX_BUCKETS} buckets, use a coarser granularity'})
+
+        series = TimeSeriesService.get_user_series(request.user.id, start_date, end_date, granularity)
+        return Response({"start": start_date, "end": end_date, "granularity": granularity, **series})
+
+    @action(detail=False, methods=['get'], url_path='breakdown')
+    def breakdown(self, request):
+        """
+        Totals per (type, category) over a date range, largest first
+        Query params: start/end (YYYY-MM-DD, inclusive, default: the current month),
+        compare=previous to add the previous period of the same length
+        """
+        today = datetime.now().date()
+        start_date = get_date_param(request, 'start', today.replace(day=1))
+        end_date = get_date_param(request, 'end', today)
+        if start_date > end_date:
+            raise ValidationError({'error': 'start must not be after end'})
+
+        response_data = {"start": start_date, "end": end_date}
+        if request.query_params.get('compare') == 'previous':
+            response_data.update(CategoryBreakdownService.get_comparison(request.user.id, start_date, end_date))
+        else:
+            response_data['breakdown'] = CategoryBreakdownService.get_breakdown(request.user.id, start_date, end_date)
+        return Response(response_data)
+
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        """
+        Statistics over the user's full history: moving averages of daily expense,
+        expense percentiles per category, month-end projection and monthly savings rate
+        """
+        return Response(SpendingAnalyticsService.get_analytics(request.user.id, datetime.now().date()))
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Create many transactions in one request, e.g. an imported bank statement
+        Body: [{"type", "category", "amount", "date"}, ...] or {"transactions": [...]}
+        DailyRecords are created for new dates and their totals updated
+        """
+        rows = request.data.get('transactions') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'Expected a non-empty list of transactions'}, status=status.HTTP_400_BAD_REQUEST)
+
+        clean_rows, errors = BulkTransactionService.validate(rows)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = BulkTransactionService.ingest(request.user.id, clean_rows)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream the user's transactions as CSV (default) or NDJSON
+        Query params: file_format=csv|ndjson, start/end (YYYY-MM-DD, inclusive), type, category
+        (`format` is reserved by DRF for renderer selection)
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in TransactionExportService.FORMATS:
+            raise ValidationError({'error': 'file_format must be csv or ndjson'})
+
+        queryset = Transaction.objects.filter(user_id=request.user.id)
+        start_date = get_date_param(request, 'start', None)
+        if start_date:
+            queryset = queryset.filter(date__gte=start_date)
+        end_date = get_date_param(request, 'end', None)
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        if request.query_params.get('type'):
+            queryset = queryset.filter(type=request.query_params['type'])
+        if request.query_params.get('category'):
+            queryset = queryset.filter(category__key=CategoryService.normalize(request.query_params['category']))
+
+        content, content_type = TransactionExportService.stream(queryset, file_format)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{file_format}"'
+        return response
+
     @action(detail=False, methods=['post'], url_path='send-monthly-report')
     def send_monthly_report_view(self, request):
         user = request.user
-        hardcode_email = 'nguyendinhloc1267@gmail.com'
-        send_monthly_report.delay(hardcode_email, user.id)  # Call task Celery
+        if not user.email:
+            return Response({"error": "Your account has no email address."}, status=status.HTTP_400_BAD_REQUEST)
+        send_monthly_report.delay(user.email, user.id)  # Call task Celery
         return Response({"message": "Monthly report is being generated and will be sent to your email shortly."})
 
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_on_data_version
     def get(self, request):
         """
         Get dashboard information for user, including total income/expense
@@ -0,0 +1,149 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisSerializer
+from redis import asyncio as aioredis
+from core.services.redis_cache import RedisCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_BACKEND = 'django.core.cache.backends.redis.RedisCache'
+
+
+class AsyncRedisClient:
+    """
+    redis.asyncio client reading and writing the keys and values of Django's RedisCache
+    (same key prefix/version, integers stored raw, other values pickled), so async
+    and sync code share the same cache entries
+    """
+
+    def __init__(self, url: str):
+        self.client = aioredis.Redis.from_url(url)
+        self.serializer = RedisSerializer()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        values = await self.client.mget([cache.make_key(key) for key in keys])
+        return {key: self.serializer.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def get(self, key: str):
+        value = await self.client.get(cache.make_key(key))
+        return None if value is None else self.serializer.loads(value)
+
+    async def set_many(self, values: Dict[str, Any], timeout):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(cache.make_key(key), self.serializer.dumps(value), ex=timeout)
+            await pipe.execute()
+
+    async def set(self, key: str, value, timeout):
+        await self.client.set(cache.make_key(key), self.serializer.dumps(value), ex=timeout)
+
+    async def add(self, key: str, value, timeout) -> bool:
+        return bool(await self.client.set(cache.make_key(key), self.serializer.dumps(value), ex=timeout, nx=True))
+
+    async def delete(self, key: str):
+        await self.client.delete(cache.make_key(key))
+
+
+class DjangoCacheClient:
+    """Same interface over Django's cache async API, for non-Redis backends (local memory in dev and tests)"""
+
+    async def get_many(self, keys):
+        return await cache.aget_many(keys)
+
+    async def get(self, key):
+        return await cache.aget(key)
+
+    async def set_many(self, values, timeout):
+        await cache.aset_many(values, timeout)
+
+    async def set(self, key, value, timeout):
+        await cache.aset(key, value, timeout)
+
+    async def add(self, key, value, timeout):
+        return await cache.aadd(key, value, timeout)
+
+    async def delete(self, key):
+        await cache.adelete(key)
+
+
+class AsyncRedisCacheService:
+    """
+    Async twin of RedisCacheService for async views: same namespaces, generations
+    and get_or_compute protocol (fresh marker, stale window, single-flight lock),
+    on a redis.asyncio client, so waiting on Redis never blocks the event loop
+    """
+
+    # redis.asyncio connections belong to the event loop that opened them
+    _clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def get_client(cls):
+        config = settings.CACHES['default']
+        if config['BACKEND'] != REDIS_BACKEND:
+            return DjangoCacheClient()
+
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None:
+            location = config['LOCATION']
+            url = location[0] if isinstance(location, (list, tuple)) else location.split(',')[0]
+            client = cls._clients[loop] = AsyncRedisClient(url)
+        return client
+
+    @classmethod
+    async def aget_generation(cls, namespace: str, default: Optional[int] = 0) -> Optional[int]:
+        """Async RedisCacheService.get_generation"""
+        key = RedisCacheService.GENERATION_KEY.format(namespace=namespace)
+        client = cls.get_client()
+        try:
+            generation = await client.get(key)
+            if generation is None:
+                await client.add(key, int(time.time() * 1000), None)
+                generation = await client.get(key)
+            return generation
+        except Exception as e:
+            logger.error(f"Error getting generation for namespace {namespace}: {str(e)}")
+            return default
+
+    @classmethod
+    async def aversioned_keys(cls, namespace: str, keys: List[str]) -> List[str]:
+        """Async RedisCacheService.versioned_keys"""
+        generation = await cls.aget_generation(namespace)
+        return [RedisCacheService.format_key(namespace, generation, key) for key in keys]
+
+    @staticmethod
+    async def arun_steps(steps, client, compute: Callable[[], Awaitable[Any]]):
+        """Async RedisCacheService.run_steps: awaits the client, compute() and the polling sleeps"""
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            result, error = None, None
+            name, *args = step
+            try:
+                if name == 'compute':
+                    result = await compute()
+                elif name == 'sleep':
+                    await asyncio.sleep(*args)
+                else:
+                    result = await getattr(client, name)(*args)
+            except Exception as e:
+                error = e
+
+    @classmethod
+    async def aget_or_compute(cls, keys: List[str], compute: Callable[[], Awaitable[Dict[str, Any]]],
+                              timeout: int = None, stale_timeout: int = None) -> Dict[str, Any]:
+        """
+        Async RedisCacheService.get_or_compute, `compute` is a coroutine function
+        Same protocol (RedisCacheService.get_or_compute_steps), run on the async client
+        Returns: {key: value} for every key of the group
+        """
+        return await cls.arun_steps(
+            RedisCacheService.get_or_compute_steps(keys, timeout, stale_timeout), cls.get_client(), compute)
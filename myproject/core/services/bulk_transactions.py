@@ -0,0 +1,328 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.db import connection, transaction
+from accounts.models import Category, CustomUser, DailyRecord, Transaction
+from core.services.categories import CategoryService
+from core.services.monthly_summary import MonthlySummaryService
+from core.services.transaction_cache import TransactionCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BulkTransactionService:
+    """
+    Service class to ingest many transactions of one user at once:
+    1. Validate every row in one plain-Python pass (no per-row serializer/ORM work)
+    2. Create the missing DailyRecords of the batch's dates, resolve its category names
+    3. bulk_create the transactions
+    4. Adjust DailyRecord totals with one set-based UPDATE
+    5. Apply the rollup and cache deltas that bulk_create's skipped signals would have applied
+    Steps 2-5 run in a single DB transaction
+    delete_daily_records() and reassign_daily_record() are the set-based counterparts for
+    deleting records with their transactions and moving them to another user
+    """
+
+    MAX_ROWS = 10000
+    BATCH_SIZE = 1000
+    TRANSACTION_TYPES = {value for value, _ in Transaction.TRANSACTION_TYPES}
+    CATEGORY_MAX_LENGTH = Category._meta.get_field('name').max_length
+    # DecimalField(max_digits=10, decimal_places=2)
+    AMOUNT_LIMIT = Decimal('100000000')
+    CENT = Decimal('0.01')
+
+    @classmethod
+    def validate_row(cls, row):
+        """
+        Validate and normalize one raw transaction row
+        Returns: (clean_row, errors) where errors is a list of (field, error)
+        """
+        if not isinstance(row, dict):
+            return None, [(None, "Expected an object")]
+
+        errors = []
+
+        type = row.get('type')
+        if type not in cls.TRANSACTION_TYPES:
+            errors.append(('type', f"Must be one of: {', '.join(sorted(cls.TRANSACTION_TYPES))}"))
+
+        category = str(row.get('category') or '').strip()
+        if not category or len(category) > cls.CATEGORY_MAX_LENGTH:
+            errors.append(('category', f"Required, at most {cls.CATEGORY_MAX_LENGTH} characters"))
+
+        try:
+            amount = Decimal(str(row.get('amount'))).quantize(cls.CENT)
+            if not amount.is_finite() or abs(amount) >= cls.AMOUNT_LIMIT:
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            errors.append(('amount', "Invalid amount"))
+
+        try:
+            day = date.fromisoformat(str(row.get('date')).strip())
+        except ValueError:
+            errors.append(('date', "Invalid date format. Use YYYY-MM-DD."))
+
+        if errors:
+            return None, errors
+        return {'type': type, 'category': category, 'amount': amount, 'date': day}, []
+
+    @classmethod
+    def validate(cls, rows):
+        """
+        Validate and normalize raw transaction rows
+        Returns: (clean_rows, errors) where errors is a list of {'row', 'field', 'error'}
+        """
+        clean_rows = []
+        errors = []
+
+        if len(rows) > cls.MAX_ROWS:
+            errors.append({'row': None, 'field': None, 'error': f"At most {cls.MAX_ROWS} transactions per request"})
+            return clean_rows, errors
+
+        for index, row in enumerate(rows):
+            clean_row, row_errors = cls.validate_row(row)
+            if row_errors:
+                errors += [{'row': index, 'field': field, 'error': error} for field, error in row_errors]
+            else:
+                clean_rows.append(clean_row)
+
+        return clean_rows, errors
+
+    @classmethod
+    def get_or_create_daily_records(cls, user_id: int, dates):
+        """
+        Map each date to the user's DailyRecord, creating the missing ones in bulk
+        Returns: ({date: daily_record_id}, number of records created)
+        """
+        record_ids = {}
+        existing = DailyRecord.objects.filter(
+            user_id=user_id,
+            date__in=dates
+        ).order_by('date', 'id').values_list('date', 'id')
+        for day, record_id in existing:
+            # Older data may hold several records for a day: use the first one
+            record_ids.setdefault(day, record_id)
+
+        missing = [DailyRecord(user_id=user_id, date=day) for day in sorted(set(dates) - set(record_ids))]
+        DailyRecord.objects.bulk_create(missing, batch_size=cls.BATCH_SIZE)
+        for record in missing:
+            record_ids[record.date] = record.id
+
+        return record_ids, len(missing)
+
+    @staticmethod
+    def add_daily_totals(daily_totals: dict):
+        """
+        Add income/expense to many DailyRecords with one UPDATE ... FROM (VALUES ...)
+        Args:
+            daily_totals: {daily_record_id: (income, expense)}
+        """
+        if not daily_totals:
+            return
+
+        table = DailyRecord._meta.db_table
+        values = []
+        params = []
+        for record_id, (income, expense) in daily_totals.items():
+            values.append("(%s::bigint, %s::numeric, %s::numeric)")
+            params += [record_id, income, expense]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS dr
+                SET total_income = dr.total_income + d.income,
+                    total_expense = dr.total_expense + d.expense,
+                    updated_at = NOW()
+                FROM (VALUES {", ".join(values)}) AS d(id, income, expense)
+                WHERE dr.id = d.id
+                """,
+                params
+            )
+
+    @classmethod
+    def ingest(cls, user_id: int, rows) -> dict:
+        """
+        Store validated rows (see validate) for a user
+        Returns: counts of created transactions and daily records
+        """
+        with transaction.atomic():
+            # Serialize bulk ingests of the same user so two batches never
+            # create the same day's DailyRecord twice
+            list(CustomUser.objects.select_for_update().filter(pk=user_id).values_list('pk', flat=True))
+
+            record_ids, records_created = cls.get_or_create_daily_records(
+                user_id, {row['date'] for row in rows})
+            names = {row['category'] for row in rows}
+            ids_by_key = CategoryService.get_ids(user_id, names)
+            category_ids = {name: ids_by_key[CategoryService.normalize(name)] for name in names}
+
+            transactions = [
+                Transaction(
+                    daily_record_id=record_ids[row['date']],
+                    user_id=user_id,
+                    type=row['type'],
+                    category_id=category_ids[row['category']],
+                    amount=row['amount'],
+                    date=row['date']
+                )
+                for row in rows
+            ]
+            Transaction.objects.bulk_create(transactions, batch_size=cls.BATCH_SIZE)
+
+            # Group once in Python for the set-based follow-up writes
+            daily_totals = {}
+            monthly_totals = {}
+            cache_deltas = {}
+            for row in rows:
+                record_id = record_ids[row['date']]
+                income, expense = daily_totals.get(record_id, (0, 0))
+                if row['type'] == 'income':
+                    income += row['amount']
+                else:
+                    expense += row['amount']
+                daily_totals[record_id] = (income, expense)
+
+                key = (row['date'].year, row['date'].month, row['type'], category_ids[row['category']])
+                amount, count = monthly_totals.get(key, (0, 0))
+                monthly_totals[key] = (amount + row['amount'], count + 1)
+
+                cache_key = (user_id, row['type'])
+                cache_deltas[cache_key] = cache_deltas.get(cache_key, 0) + row['amount']
+
+            cls.add_daily_totals(daily_totals)
+            MonthlySummaryService.add_totals(user_id, monthly_totals)
+            transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(cache_deltas))
+
+        logger.info(f"Ingested {len(transactions)} transactions for user {user_id}")
+        return {
+            'transactions_created': len(transactions),
+            'daily_records_created': records_created
+        }
+
+    @staticmethod
+    def summarize_groups(groups):
+        """
+        Sum (date, type, category_id, amount, count) groups of transactions
+        Returns: (transaction count, {(year, month, type, category_id): (amount, count)}
+        for MonthlySummaryService, {type: amount})
+        """
+        transactions = 0
+        monthly_totals = {}
+        type_totals = {}
+        for day, type, category_id, group_amount, group_count in groups:
+            transactions += group_count
+            type_totals[type] = type_totals.get(type, 0) + group_amount
+            if day is None:
+                # Transactions without a date are not part of any month
+                continue
+            key = (day.year, day.month, type, category_id)
+            amount, count = monthly_totals.get(key, (0, 0))
+            monthly_totals[key] = (amount + group_amount, count + group_count)
+        return transactions, monthly_totals, type_totals
+
+    @classmethod
+    def delete_daily_records(cls, user_id: int, daily_records) -> int:
+        """
+        Delete a user's DailyRecords with their transactions in a constant number of queries
+        The cascade would send post_delete for every transaction (one rollup UPDATE
+        and one user lookup each): the transactions are deleted with one DELETE instead
+        and their rollup and cache deltas applied in bulk
+        Args:
+            daily_records: DailyRecord queryset, all owned by user_id
+        Returns: number of transactions deleted
+        """
+        with transaction.atomic():
+            record_ids = list(daily_records.values_list('id', flat=True))
+            # Plain DELETEs: no per-row collection and signals, their effects are applied in bulk
+            # from the deleted transactions, grouped by the same statement
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    WITH deleted AS (
+                        DELETE FROM {Transaction._meta.db_table}
+                        WHERE daily_record_id = ANY(%s)
+                        RETURNING date, type, category_id, amount
+                    )
+                    SELECT date, type, category_id, SUM(amount), COUNT(*)
+                    FROM deleted
+                    GROUP BY date, type, category_id
+                    """,
+                    [record_ids]
+                )
+                groups = cursor.fetchall()
+                # The records' only dependents are the transactions deleted above
+                cursor.execute(f"DELETE FROM {DailyRecord._meta.db_table} WHERE id = ANY(%s)", [record_ids])
+
+            deleted, monthly_totals, type_totals = cls.summarize_groups(groups)
+            cache_deltas = {(user_id, type): -amount for type, amount in type_totals.items()}
+            MonthlySummaryService.subtract_totals(user_id, monthly_totals)
+            # Zero delta: deleting records without transactions still changes the user's data version
+            cache_deltas.setdefault((user_id, 'expense'), 0)
+            transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(cache_deltas))
+
+        logger.info(f"Deleted {deleted} transactions of user {user_id}")
+        return deleted
+
+    @classmethod
+    def reassign_daily_record(cls, daily_record_id: int, previous_user_id: int, user_id: int) -> int:
+        """
+        Move a DailyRecord's transactions to the record's new owner: their denormalized
+        user, their private categories (remapped to the new owner's category of the same
+        key), then the two users' rollup rows and cached totals
+        Returns: number of transactions moved
+        """
+        transaction_table = Transaction._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Categories private to another user, resolved (or created) for the new owner by name
+            cursor.execute(
+                f"""
+                SELECT DISTINCT c.id, c.name
+                FROM {transaction_table} t
+                JOIN {Category._meta.db_table} c ON c.id = t.category_id
+                WHERE t.daily_record_id = %s AND c.user_id IS NOT NULL AND c.user_id <> %s
+                """,
+                [daily_record_id, user_id]
+            )
+            names = dict(cursor.fetchall())
+            ids = CategoryService.get_ids(user_id, names.values())
+            category_ids = {previous_id: ids[CategoryService.normalize(name)] for previous_id, name in names.items()}
+
+            remap = ""
+            params = [user_id]
+            if category_ids:
+                remap = f", category_id = CASE t.category_id {' '.join(['WHEN %s THEN %s'] * len(category_ids))} ELSE t.category_id END"
+                for previous_id, category_id in category_ids.items():
+                    params += [previous_id, category_id]
+            # The previous category of each row comes from the pre-update read joined in FROM
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    UPDATE {transaction_table} t
+                    SET user_id = %s{remap}
+                    FROM (SELECT id, category_id FROM {transaction_table} WHERE daily_record_id = %s) previous
+                    WHERE t.daily_record_id = %s AND t.id = previous.id
+                    RETURNING t.date, t.type, previous.category_id AS previous_category_id, t.category_id, t.amount
+                )
+                SELECT date, type, previous_category_id, category_id, SUM(amount), COUNT(*)
+                FROM moved
+                GROUP BY date, type, previous_category_id, category_id
+                """,
+                params + [daily_record_id, daily_record_id]
+            )
+            groups = cursor.fetchall()
+            moved, previous_totals, type_totals = cls.summarize_groups(
+                [(day, type, previous_id, amount, count) for day, type, previous_id, _, amount, count in groups])
+            _, monthly_totals, _ = cls.summarize_groups(
+                [(day, type, category_id, amount, count) for day, type, _, category_id, amount, count in groups])
+
+            MonthlySummaryService.subtract_totals(previous_user_id, previous_totals)
+            MonthlySummaryService.add_totals(user_id, monthly_totals)
+            # Zero deltas: both users' data versions change even for a record without transactions
+            cache_deltas = {(previous_user_id, 'expense'): 0, (user_id, 'expense'): 0}
+            for type, amount in type_totals.items():
+                cache_deltas[(previous_user_id, type)] = -amount
+                cache_deltas[(user_id, type)] = amount
+            transaction.on_commit(lambda: TransactionCacheService.apply_transaction_deltas(cache_deltas))
+
+        logger.info(f"Moved {moved} transactions of daily record {daily_record_id} from user {previous_user_id} to {user_id}")
+        return moved
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from accounts.models import Category
+
+class CategoryService:
+    """
+    Service class to resolve category names to Category ids:
+    - a name's key is its trimmed, lowercase form
+    - a key resolves to the global category first, else to the user's own category,
+      which is created on first use
+    Resolved ids are kept in an in-process LRU, so writes resolve their categories
+    without a query. Entries are only added once the transaction that read or
+    created the category commits, so the LRU never holds a rolled-back id.
+    Deleting a category drops it from this process's LRU; other processes drop it
+    when their entry expires after CATEGORY_CACHE_TTL seconds
+    """
+
+    MAX_ENTRIES = 10000
+    _ids = OrderedDict()  # (user_id or None, key) -> (expires at, category id)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def ttl() -> float:
+        return getattr(settings, 'CATEGORY_CACHE_TTL', 60)
+
+    @staticmethod
+    def normalize(name) -> str:
+        return str(name).strip().lower()
+
+    @classmethod
+    def get_cached(cls, user_id, key):
+        now = time.monotonic()
+        with cls._lock:
+            for owner in (None, user_id):
+                entry = cls._ids.get((owner, key))
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del cls._ids[(owner, key)]
+                    continue
+                cls._ids.move_to_end((owner, key))
+                return entry[1]
+        return None
+
+    @classmethod
+    def remember(cls, entries: dict):
+        expires = time.monotonic() + cls.ttl()
+        with cls._lock:
+            cls._ids.update((entry, (expires, category_id)) for entry, category_id in entries.items())
+            for entry in entries:
+                cls._ids.move_to_end(entry)
+            while len(cls._ids) > cls.MAX_ENTRIES:
+                cls._ids.popitem(last=False)
+
+    @classmethod
+    def forget(cls, user_id, key):
+        with cls._lock:
+            cls._ids.pop((user_id, key), None)
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._ids.clear()
+
+    @classmethod
+    def get_ids(cls, user_id, names) -> dict:
+        """
+        Resolve category names of a user, creating the user's missing categories
+        user_id=None resolves (and creates) global categories only
+        Returns: {key: category id}
+        """
+        # A new category is named after the first spelling in sort order, like the COPY merge
+        names_by_key = {}
+        for name in sorted(str(name).strip() for name in names):
+            names_by_key.setdefault(cls.normalize(name), name)
+
+        ids = {}
+        missing = []
+        for key in names_by_key:
+            category_id = cls.get_cached(user_id, key)
+            if category_id is None:
+                missing.append(key)
+            else:
+                ids[key] = category_id
+        if not missing:
+            return ids
+
+        found = cls.find(user_id, missing)
+        new_keys = [key for key in missing if key not in found]
+        if new_keys:
+            # Concurrent requests may create the same categories: skip conflicts and re-read
+            Category.objects.bulk_create(
+                [Category(user_id=user_id, key=key, name=names_by_key[key]) for key in new_keys],
+                ignore_conflicts=True
+            )
+            found.update(cls.find(user_id, new_keys))
+
+        ids.update({key: category_id for key, (owner, category_id) in found.items()})
+        entries = {(owner, key): category_id for key, (owner, category_id) in found.items()}
+        transaction.on_commit(lambda: cls.remember(entries))
+        return ids
+
+    @classmethod
+    def get_id(cls, user_id, name) -> int:
+        return cls.get_ids(user_id, [name])[cls.normalize(name)]
+
+    @staticmethod
+    def find(user_id, keys) -> dict:
+        """
+        Returns: {key: (owner user_id or None, category id)} of the existing categories, global first
+        """
+        owners = Q(user__isnull=True)
+        if user_id is not None:
+            owners |= Q(user_id=user_id)
+        found = {}
+        rows = Category.objects.filter(owners, key__in=keys).values_list('key', 'user_id', 'id')
+        for key, owner, category_id in rows:
+            if owner is None or key not in found:
+                found[key] = (owner, category_id)
+        return found
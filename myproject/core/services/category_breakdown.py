@@ -0,0 +1,136 @@
+from datetime import timedelta
+from django.db.models import Count, Q, Sum
+from accounts.models import Category, Transaction, UserMonthlySummary
+from accounts.queries import month_date_range
+from core.services.redis_cache import RedisCacheService
+from core.services.transaction_cache import TransactionCacheService
+
+class CategoryBreakdownService:
+    """
+    Service class to read a user's totals per (type, category) over a date range.
+    Whole months are read from the UserMonthlySummary rollup, only the partial
+    months at the edges of the range aggregate accounts_transaction.
+    Results are cached under the user's data version, so any committed write to
+    the user's transactions makes the next read recompute.
+    """
+
+    BREAKDOWN_PATTERN = "breakdown:{start}:{end}"
+
+    @staticmethod
+    def whole_months(start_date, end_date):
+        """
+        Split [start_date, end_date] (inclusive) into whole months and partial edges
+        Returns: (first month start, end month start) of the whole months, None if there are none
+        """
+        first = start_date if start_date.day == 1 else month_date_range(start_date.year, start_date.month)[1]
+        after = end_date + timedelta(days=1)
+        last = after.replace(day=1)
+        if first >= last:
+            return None
+        return first, last
+
+    @staticmethod
+    def month_filter(first, last) -> Q:
+        """Rollup rows of the months in [first, last)"""
+        months = Q()
+        for year in range(first.year, last.year + 1):
+            low = first.month if year == first.year else 1
+            high = last.month if year == last.year else 13
+            if low < high:
+                months |= Q(year=year, month__gte=low, month__lt=high)
+        return months
+
+    @classmethod
+    def compute(cls, user_id: int, start_date, end_date) -> list:
+        """
+        Get the totals of a user per (type, category) between two dates (inclusive)
+        At most one rollup query, one transactions aggregate and one Category lookup
+        Returns: [{'type', 'category_id', 'category', 'total', 'count'}], largest total first
+        """
+        totals = {}
+
+        def add(type, category_id, amount, count):
+            total, previous_count = totals.get((type, category_id), (0, 0))
+            totals[(type, category_id)] = (total + amount, previous_count + count)
+
+        months = cls.whole_months(start_date, end_date)
+        if months:
+            first, last = months
+            rows = UserMonthlySummary.objects.filter(
+                cls.month_filter(first, last), user_id=user_id, count__gt=0
+            ).values('type', 'category_id').annotate(amount=Sum('total'), rows=Sum('count')).order_by()
+            for row in rows:
+                add(row['type'], row['category_id'], row['amount'], row['rows'])
+
+            edges = Q()
+            if start_date < first:
+                edges |= Q(date__gte=start_date, date__lt=first)
+            if last <= end_date:
+                edges |= Q(date__gte=last, date__lte=end_date)
+        else:
+            edges = Q(date__gte=start_date, date__lte=end_date)
+
+        if edges:
+            rows = Transaction.objects.filter(edges, user_id=user_id).values('type', 'category_id').annotate(
+                amount=Sum('amount'), rows=Count('id')).order_by()
+            for row in rows:
+                add(row['type'], row['category_id'], row['amount'], row['rows'])
+
+        names = dict(Category.objects.filter(id__in={category_id for _, category_id in totals}).values_list('id', 'name'))
+        breakdown = [
+            {'type': type, 'category_id': category_id, 'category': names.get(category_id),
+             'total': total, 'count': count}
+            for (type, category_id), (total, count) in totals.items()
+        ]
+        breakdown.sort(key=lambda row: (-row['total'], row['type'], row['category_id']))
+        return breakdown
+
+    @classmethod
+    def get_breakdown(cls, user_id: int, start_date, end_date) -> list:
+        """
+        compute() through the cache, keyed by (user, data version, range)
+        Flow: Check Cache -> Cache Hit/Miss -> Query DB if needed -> Return Data
+        """
+        key = RedisCacheService.versioned_key(
+            TransactionCacheService.get_data_namespace(user_id),
+            cls.BREAKDOWN_PATTERN.format(start=start_date.isoformat(), end=end_date.isoformat())
+        )
+        cached = RedisCacheService.get_or_compute([key], lambda: {key: cls.compute(user_id, start_date, end_date)})
+        return cached[key]
+
+    @staticmethod
+    def previous_period(start_date, end_date):
+        """The period of the same length ending the day before start_date"""
+        return start_date - (end_date - start_date) - timedelta(days=1), start_date - timedelta(days=1)
+
+    @classmethod
+    def get_comparison(cls, user_id: int, start_date, end_date) -> dict:
+        """
+        Breakdown of a period next to the previous period of the same length
+        Each period is cached on its own, so a moving window reuses the previous result
+        Returns: {'previous': {'start', 'end'}, 'breakdown': rows with previous_total, previous_count and change}
+        """
+        previous_start, previous_end = cls.previous_period(start_date, end_date)
+        current = cls.get_breakdown(user_id, start_date, end_date)
+        previous = {(row['type'], row['category_id']): row
+                    for row in cls.get_breakdown(user_id, previous_start, previous_end)}
+
+        breakdown = []
+        for row in current:
+            before = previous.pop((row['type'], row['category_id']), None)
+            breakdown.append(cls.compare(row, before))
+        # Categories with totals in the previous period only
+        for before in previous.values():
+            breakdown.append(cls.compare(dict(before, total=0, count=0), before))
+
+        return {'previous': {'start': previous_start, 'end': previous_end}, 'breakdown': breakdown}
+
+    @staticmethod
+    def compare(row: dict, previous: dict = None) -> dict:
+        previous_total = previous['total'] if previous else 0
+        return dict(
+            row,
+            previous_total=previous_total,
+            previous_count=previous['count'] if previous else 0,
+            change=row['total'] - previous_total,
+        )
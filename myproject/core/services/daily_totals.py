@@ -0,0 +1,135 @@
+from django.db import connection, transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+from accounts.models import DailyRecord, Transaction
+from core.services.bulk_transactions import BulkTransactionService
+from core.services.transaction_cache import TransactionCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DailyTotalsService:
+    """
+    Service class to keep DailyRecord.total_income / total_expense equal to the
+    sum of the record's transactions:
+    - apply_deltas(): atomic F() updates for single transaction writes (signals)
+    - reconcile(): recompute every record in id batches and report the drift
+    Bulk writes (BulkTransactionService.ingest, TransactionImportService.merge)
+    adjust the totals with their own set-based UPDATE
+    """
+
+    BATCH_SIZE = 10000
+
+    @staticmethod
+    def add_delta(deltas: dict, daily_record_id: int, type: str, amount):
+        """
+        Add one transaction's amount to a {daily_record_id: (income, expense)} delta map
+        """
+        income, expense = deltas.get(daily_record_id, (0, 0))
+        if type == 'income':
+            income += amount
+        else:
+            expense += amount
+        deltas[daily_record_id] = (income, expense)
+
+    @staticmethod
+    def apply_deltas(deltas: dict):
+        """
+        Add income/expense to DailyRecords with one F() UPDATE per record, so
+        concurrent writes of the same record never overwrite each other
+        Args:
+            deltas: {daily_record_id: (income, expense)}
+        """
+        for daily_record_id, (income, expense) in deltas.items():
+            if not income and not expense:
+                continue
+            DailyRecord.objects.filter(pk=daily_record_id).update(
+                total_income=F('total_income') + income,
+                total_expense=F('total_expense') + expense,
+                updated_at=timezone.now()
+            )
+
+    @staticmethod
+    def find_drift(cursor, start_id: int, end_id: int, daily_record_ids=None):
+        """
+        Returns: list of (daily_record_id, stored income, stored expense, income, expense)
+        of the DailyRecords with start_id <= id < end_id whose totals differ from their transactions
+        """
+        id_filter = "AND dr.id = ANY(%s)" if daily_record_ids is not None else ""
+        params = [start_id, end_id, start_id, end_id]
+        if daily_record_ids is not None:
+            params.append(list(daily_record_ids))
+
+        cursor.execute(
+            f"""
+            SELECT dr.id, dr.total_income, dr.total_expense,
+                   COALESCE(t.income, 0), COALESCE(t.expense, 0)
+            FROM {DailyRecord._meta.db_table} dr
+            LEFT JOIN (
+                SELECT daily_record_id,
+                       SUM(amount) FILTER (WHERE type = 'income') AS income,
+                       SUM(amount) FILTER (WHERE type = 'expense') AS expense
+                FROM {Transaction._meta.db_table}
+                WHERE daily_record_id >= %s AND daily_record_id < %s
+                GROUP BY daily_record_id
+            ) t ON t.daily_record_id = dr.id
+            WHERE dr.id >= %s AND dr.id < %s {id_filter}
+              AND (dr.total_income <> COALESCE(t.income, 0)
+                   OR dr.total_expense <> COALESCE(t.expense, 0))
+            ORDER BY dr.id
+            """,
+            params
+        )
+        return cursor.fetchall()
+
+    @classmethod
+    def reconcile_batch(cls, start_id: int, end_id: int, fix: bool = True):
+        """
+        Recompute the totals of the DailyRecords with start_id <= id < end_id
+        Only the drifted records are locked and rechecked: writers that already inserted
+        a transaction hold a key-share lock on its record until they commit, so the
+        recheck (a new snapshot) sees their transaction and its total update
+        Args:
+            fix: write the recomputed totals, otherwise only report the drift
+        Returns: list of (daily_record_id, stored income, stored expense, income, expense)
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            drifted = cls.find_drift(cursor, start_id, end_id)
+            if not fix or not drifted:
+                return drifted
+
+            daily_record_ids = [row[0] for row in drifted]
+            cursor.execute(
+                f"SELECT id, user_id FROM {DailyRecord._meta.db_table} WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+                [daily_record_ids]
+            )
+            user_ids = dict(cursor.fetchall())
+            drifted = cls.find_drift(cursor, start_id, end_id, daily_record_ids)
+
+            deltas = {
+                daily_record_id: (income - stored_income, expense - stored_expense)
+                for daily_record_id, stored_income, stored_expense, income, expense in drifted
+            }
+            BulkTransactionService.add_daily_totals(deltas)
+            # Cached responses and ETags of the owners were built from the drifted totals
+            changed = {user_ids[daily_record_id] for daily_record_id in deltas}
+            transaction.on_commit(lambda: TransactionCacheService.bump_data_versions(changed))
+            return drifted
+
+    @classmethod
+    def reconcile(cls, batch_size: int = None, fix: bool = True):
+        """
+        Recompute the totals of every DailyRecord, one short transaction per id batch
+        Yields: (start_id, end_id, drifted rows) per batch, see reconcile_batch
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        bounds = DailyRecord.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            return
+
+        for start_id in range(bounds['first'], bounds['last'] + 1, batch_size):
+            end_id = start_id + batch_size
+            drifted = cls.reconcile_batch(start_id, end_id, fix=fix)
+            if drifted:
+                logger.info(f"{len(drifted)} daily records drifted in ids [{start_id}, {end_id})")
+            yield start_id, end_id, drifted
@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Any, Callable
+from django.conf import settings
+from core.services.redis_cache import RedisCacheService
+from core.services.transaction_cache import TransactionCacheService
+
+class MonthCacheService:
+    """
+    Service class to cache the per-month responses of a user (monthly totals, daily expenses)
+    Keys live in the user's data version namespace, so every committed write moves the
+    user to new keys. Past months rarely change and are kept for MONTH_CACHE_PAST_TTL,
+    the current (and any future) month for the short MONTH_CACHE_CURRENT_TTL
+    """
+
+    PATTERN = "month:{name}:{year}-{month:02d}"
+
+    @staticmethod
+    def get_timeout(year: int, month: int, today: date = None) -> int:
+        """Fresh TTL in seconds of a month's cached responses"""
+        today = today or date.today()
+        if (year, month) < (today.year, today.month):
+            return getattr(settings, 'MONTH_CACHE_PAST_TTL', 30 * 24 * 60 * 60)
+        return getattr(settings, 'MONTH_CACHE_CURRENT_TTL', 60)
+
+    @classmethod
+    def get_key(cls, user_id: int, name: str, year: int, month: int) -> str:
+        """Generate cache key for a user's month response"""
+        return RedisCacheService.versioned_key(
+            TransactionCacheService.get_data_namespace(user_id),
+            cls.PATTERN.format(name=name, year=year, month=month)
+        )
+
+    @classmethod
+    def get_or_compute(cls, user_id: int, name: str, year: int, month: int, compute: Callable[[], Any]):
+        """
+        Get a user's month response `name`, computing it on a miss
+        Flow: Check Cache -> Cache Hit/Miss -> Query DB if needed -> Return Data
+        """
+        key = cls.get_key(user_id, name, year, month)
+        cached = RedisCacheService.get_or_compute([key], lambda: {key: compute()}, timeout=cls.get_timeout(year, month))
+        return cached[key]
@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from accounts.models import CustomUser, MonthlyReportDelivery
+from core.services.monthly_summary import MonthlySummaryService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MonthlyReportService:
+    """
+    Service class for the monthly report pipeline:
+    1. recipient_chunks(): ids of the users still waiting for a month's report, in chunks
+    2. send_chunk(): one GROUP BY for the chunk's totals, then every email over one SMTP connection
+    Sent reports are recorded in MonthlyReportDelivery, so re-running a chunk skips them
+    """
+
+    CHUNK_SIZE = 500
+    FROM_EMAIL = 'noreply@financialapp.com'
+    PROGRESS_KEY = "monthly_report:{year}-{month:02d}:{field}"
+    PROGRESS_TIMEOUT = 60 * 60 * 24 * 7  # 7 days
+    ZERO_TOTALS = {
+        'total_income': Decimal('0'),
+        'total_expense': Decimal('0'),
+        'net_balance': Decimal('0'),
+    }
+
+    @staticmethod
+    def previous_month(today: date = None):
+        """Returns: (year, month) of the month before `today`"""
+        today = today or date.today()
+        if today.month == 1:
+            return today.year - 1, 12
+        return today.year, today.month - 1
+
+    @staticmethod
+    def build_message(totals: dict, year: int, month: int):
+        """Returns: (subject, body) of a user's report for one month"""
+        period = date(year, month, 1).strftime('%B %Y')
+        subject = f"Monthly Financial Report - {period}"
+        message = (
+            f"Hello,\n\n"
+            f"Here is your financial report for {period}:\n"
+            f"- Total Income: {totals['total_income']} VND\n"
+            f"- Total Expense: {totals['total_expense']} VND\n"
+            f"- Net Balance: {totals['net_balance']} VND\n\n"
+            f"Thank you for using our service!"
+        )
+        return subject, message
+
+    @staticmethod
+    def pending_recipients(year: int, month: int):
+        """
+        Active users with an email whose report for the month has not been sent yet
+        """
+        return CustomUser.objects.filter(
+            is_active=True
+        ).exclude(
+            email=''
+        ).exclude(
+            id__in=MonthlyReportDelivery.objects.filter(year=year, month=month).values('user_id')
+        )
+
+    @classmethod
+    def recipient_chunks(cls, year: int, month: int, chunk_size: int = None):
+        """
+        Yield lists of pending recipient ids, in id order
+        """
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        user_ids = cls.pending_recipients(year, month).order_by('id').values_list('id', flat=True)
+
+        chunk = []
+        for user_id in user_ids.iterator(chunk_size=chunk_size):
+            chunk.append(user_id)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @classmethod
+    def send_chunk(cls, user_ids, year: int, month: int) -> int:
+        """
+        Send the month's report to the given users that have not received it yet
+        Each delivery is recorded (and committed) right after its message is sent, so a
+        retry resumes after the last sent report even when the worker was killed mid-chunk
+        Returns: number of reports sent
+        """
+        recipients = list(
+            cls.pending_recipients(year, month).filter(id__in=user_ids).values_list('id', 'email')
+        )
+        if not recipients:
+            return 0
+
+        totals = MonthlySummaryService.get_month_totals_for_users(
+            [user_id for user_id, _ in recipients], year, month)
+
+        sent = []
+        connection = get_connection()
+        try:
+            connection.open()
+            for user_id, email in recipients:
+                subject, message = cls.build_message(totals.get(user_id, cls.ZERO_TOTALS), year, month)
+                EmailMessage(subject, message, cls.FROM_EMAIL, [email], connection=connection).send()
+                MonthlyReportDelivery.objects.bulk_create(
+                    [MonthlyReportDelivery(user_id=user_id, year=year, month=month)], ignore_conflicts=True
+                )
+                sent.append(user_id)
+        finally:
+            connection.close()
+            cls.add_progress(year, month, 'sent', len(sent))
+
+        return len(sent)
+
+    @classmethod
+    def start_progress(cls, year: int, month: int, chunks: int):
+        for field, value in (('chunks', chunks), ('chunks_done', 0), ('sent', 0)):
+            cache.set(cls.PROGRESS_KEY.format(year=year, month=month, field=field), value, cls.PROGRESS_TIMEOUT)
+
+    @classmethod
+    def add_progress(cls, year: int, month: int, field: str, delta: int):
+        try:
+            cache.incr(cls.PROGRESS_KEY.format(year=year, month=month, field=field), delta)
+        except ValueError:
+            # Progress keys expired or were never started: counters are informational only
+            pass
+
+    @classmethod
+    def get_progress(cls, year: int, month: int) -> dict:
+        """
+        Returns: {'chunks', 'chunks_done', 'sent'} of the month's run, None for unknown counters
+        """
+        fields = ('chunks', 'chunks_done', 'sent')
+        keys = {cls.PROGRESS_KEY.format(year=year, month=month, field=field): field for field in fields}
+        values = cache.get_many(keys.keys())
+        return {field: values.get(key) for key, field in keys.items()}
@@ -0,0 +1,203 @@
+from django.db import connection, transaction
+from django.db.models import F
+from accounts.models import UserMonthlySummary, Transaction
+from accounts.queries import income_expense_aggregates
+from core.services.transaction_cache import TransactionCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MonthlySummaryService:
+    """
+    Service class to maintain and read the UserMonthlySummary rollup.
+    Rows are keyed by (user, year, month, type, category id) and adjusted by the
+    delta of every Transaction write, so monthly totals never scan accounts_transaction.
+    """
+
+    @staticmethod
+    def apply_delta(user_id: int, date, type: str, category_id: int, amount, count: int):
+        """
+        Add amount/count to the rollup row of the month containing `date`
+        Negative counts (deletes) only update existing rows, so a delete that
+        cascades from a user never re-creates the user's summary rows
+        """
+        if date is None:
+            # Transactions without a date are not part of any month
+            return
+
+        if count < 0:
+            UserMonthlySummary.objects.filter(
+                user_id=user_id,
+                year=date.year,
+                month=date.month,
+                type=type,
+                category_id=category_id
+            ).update(total=F('total') + amount, count=F('count') + count)
+            return
+
+        table = UserMonthlySummary._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, year, month, type, category_id, total, count)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (user_id, year, month, type, category_id)
+                DO UPDATE SET total = {table}.total + EXCLUDED.total,
+                              count = {table}.count + EXCLUDED.count
+                """,
+                [user_id, date.year, date.month, type, category_id, amount, count]
+            )
+
+    @staticmethod
+    def add_totals(user_id: int, totals: dict):
+        """
+        Add many rollup deltas of one user with a single multi-row upsert
+        Used by bulk writes, which bypass the model signals
+        Args:
+            totals: {(year, month, type, category_id): (amount, count)}
+        """
+        if not totals:
+            return
+
+        table = UserMonthlySummary._meta.db_table
+        values = []
+        params = []
+        for (year, month, type, category_id), (amount, count) in totals.items():
+            values.append("(%s, %s, %s, %s, %s, %s, %s)")
+            params += [user_id, year, month, type, category_id, amount, count]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, year, month, type, category_id, total, count)
+                VALUES {", ".join(values)}
+                ON CONFLICT (user_id, year, month, type, category_id)
+                DO UPDATE SET total = {table}.total + EXCLUDED.total,
+                              count = {table}.count + EXCLUDED.count
+                """,
+                params
+            )
+
+    @staticmethod
+    def subtract_totals(user_id: int, totals: dict):
+        """
+        Remove many rollup deltas of one user with one UPDATE ... FROM (VALUES ...)
+        Like negative apply_delta calls, only existing rows are updated
+        Args:
+            totals: {(year, month, type, category_id): (amount, count)}
+        """
+        if not totals:
+            return
+
+        table = UserMonthlySummary._meta.db_table
+        values = []
+        params = []
+        for (year, month, type, category_id), (amount, count) in totals.items():
+            values.append("(%s::int, %s::int, %s, %s::int, %s::numeric, %s::int)")
+            params += [year, month, type, category_id, amount, count]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS s
+                SET total = s.total - d.amount,
+                    count = s.count - d.count
+                FROM (VALUES {", ".join(values)}) AS d(year, month, type, category_id, amount, count)
+                WHERE s.user_id = %s
+                  AND s.year = d.year AND s.month = d.month
+                  AND s.type = d.type AND s.category_id = d.category_id
+                """,
+                params + [user_id]
+            )
+
+    @staticmethod
+    def get_month_totals(user_id: int, year: int, month: int):
+        """
+        Get total income, expense and net balance of a user for one month from the rollup
+        Using index: unique (user, year, month, type, category)
+        """
+        totals = UserMonthlySummary.objects.filter(
+            user_id=user_id,
+            year=year,
+            month=month
+        ).aggregate(**income_expense_aggregates('total'))
+        totals['net_balance'] = totals['total_income'] - totals['total_expense']
+        return totals
+
+    @staticmethod
+    def get_month_totals_for_users(user_ids, year: int, month: int) -> dict:
+        """
+        Get total income, expense and net balance of many users for one month with one GROUP BY
+        Users without rollup rows for the month are omitted
+        Returns: {user_id: totals}
+        """
+        rows = UserMonthlySummary.objects.filter(
+            user_id__in=user_ids,
+            year=year,
+            month=month
+        ).values('user_id').annotate(**income_expense_aggregates('total')).order_by()
+
+        totals = {}
+        for row in rows:
+            row['net_balance'] = row['total_income'] - row['total_expense']
+            totals[row.pop('user_id')] = row
+        return totals
+
+    @staticmethod
+    def rebuild(user_id: int = None) -> int:
+        """
+        Recompute the rollup from accounts_transaction with a single INSERT ... SELECT
+        Rebuilds every user, or only `user_id` when given
+        The data version of every user whose rows were rewritten is bumped once the rebuild commits
+        Returns: number of summary rows written
+        """
+        summary_table = UserMonthlySummary._meta.db_table
+        transaction_table = Transaction._meta.db_table
+
+        user_filter = "AND t.user_id = %s" if user_id else ""
+        summary_filter = "WHERE user_id = %s" if user_id else ""
+        params = [user_id] if user_id else []
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    WITH deleted AS (
+                        DELETE FROM {summary_table} {summary_filter}
+                        RETURNING user_id
+                    )
+                    SELECT DISTINCT user_id FROM deleted
+                    """,
+                    params
+                )
+                user_ids = {row[0] for row in cursor.fetchall()}
+
+                cursor.execute(
+                    f"""
+                    WITH inserted AS (
+                        INSERT INTO {summary_table} (user_id, year, month, type, category_id, total, count)
+                        SELECT t.user_id,
+                               EXTRACT(YEAR FROM t.date)::int,
+                               EXTRACT(MONTH FROM t.date)::int,
+                               t.type,
+                               t.category_id,
+                               SUM(t.amount),
+                               COUNT(*)
+                        FROM {transaction_table} t
+                        WHERE t.date IS NOT NULL {user_filter}
+                        GROUP BY 1, 2, 3, 4, 5
+                        RETURNING user_id
+                    )
+                    SELECT user_id, COUNT(*) FROM inserted GROUP BY user_id
+                    """,
+                    params
+                )
+                inserted = cursor.fetchall()
+                rows = sum(count for _, count in inserted)
+                user_ids.update(user for user, _ in inserted)
+
+            # Cached month responses and ETags were built from the old rows
+            transaction.on_commit(lambda: TransactionCacheService.bump_data_versions(user_ids))
+
+        logger.info(f"Rebuilt {rows} monthly summary rows" + (f" for user {user_id}" if user_id else ""))
+        return rows
@@ -1,7 +1,10 @@
+from collections import Counter
 from django.core.cache import cache
 from django.conf import settings
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional
+from core.services.request_metrics import RequestMetricsService
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +15,42 @@ class RedisCacheService:
     2. Cache Hit -> Return Cached Data
     3. Cache Miss -> Query Database -> Store in Cache -> Return Data
     4. Transaction Change -> Invalidate Cache
+
+    Keys are grouped in namespaces (e.g. "user:123", "system") whose generation
+    counter is part of every key: "user:123:v<generation>:<key>". Invalidating a
+    namespace bumps its generation, so stale keys are never read again and
+    simply expire through their TTL.
     """
-    
-    @staticmethod
-    def get_cache(key: str) -> Optional[Any]:
+
+    GENERATION_KEY = "generation:{namespace}"
+
+    # get_or_compute: a key group is fresh while its marker exists, its values
+    # outlive the marker by the stale window and are served while one worker recomputes
+    FRESH_MARKER_SUFFIX = ":fresh"
+    LOCK_SUFFIX = ":lock"
+    LOCK_TIMEOUT = 30  # seconds
+    LOCK_WAIT = 2  # seconds a worker waits for another worker's first computation
+    LOCK_POLL_INTERVAL = 0.05
+
+    # Lookup outcomes of this process: "hit", "stale_hit", "miss"
+    stats = Counter()
+
+    @classmethod
+    def record(cls, outcome: str):
+        cls.stats[outcome] += 1
+        RequestMetricsService.record_cache(outcome)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, int]:
+        """Returns: {'hit', 'stale_hit', 'miss'} lookup counts since the last reset_stats()"""
+        return {outcome: cls.stats[outcome] for outcome in ('hit', 'stale_hit', 'miss')}
+
+    @classmethod
+    def reset_stats(cls):
+        cls.stats.clear()
+
+    @classmethod
+    def get_cache(cls, key: str) -> Optional[Any]:
         """
         Check and retrieve data from cache
         Returns: Data if cache hit, None if cache miss
@@ -24,8 +59,10 @@ class RedisCacheService:
             cached_data = cache.get(key)
             if cached_data is not None:
                 logger.info(f"Cache hit for key: {key}")
+                cls.record('hit')
                 return cached_data
             logger.info(f"Cache miss for key: {key}")
+            cls.record('miss')
             return None
         except Exception as e:
             logger.error(f"Error getting cache for key {key}: {str(e)}")
@@ -50,6 +87,161 @@ class RedisCacheService:
             logger.error(f"Error setting cache for key {key}: {str(e)}")
             return False
 
+    @classmethod
+    def get_or_compute_steps(cls, keys: List[str], timeout: int = None, stale_timeout: int = None):
+        """
+        The get_or_compute protocol, shared by the sync and async services: a generator
+        yielding the steps to run, (cache client method name, *args), ('compute',) or
+        ('sleep', seconds), and receiving each step's result (or its exception, thrown in)
+        See run_steps() and AsyncRedisCacheService.arun_steps() for the drivers
+        Returns (StopIteration value): {key: value} for every key of the group
+        """
+        timeout = timeout or getattr(settings, 'CACHE_TTL', 3600)
+        stale_timeout = stale_timeout or getattr(settings, 'CACHE_STALE_TTL', 300)
+        marker_key = keys[0] + cls.FRESH_MARKER_SUFFIX
+        lock_key = keys[0] + cls.LOCK_SUFFIX
+
+        def read():
+            try:
+                return (yield ('get_many', keys + [marker_key]))
+            except Exception as e:
+                logger.error(f"Error getting cache for keys {keys}: {str(e)}")
+                return {}
+
+        def store(values):
+            try:
+                yield ('set_many', values, timeout + stale_timeout)
+                yield ('set', marker_key, 1, timeout)
+                logger.info(f"Data stored in cache for keys: {keys}")
+            except Exception as e:
+                logger.error(f"Error setting cache for keys {keys}: {str(e)}")
+
+        def acquire_lock():
+            try:
+                return (yield ('add', lock_key, 1, cls.LOCK_TIMEOUT))
+            except Exception as e:
+                logger.error(f"Error acquiring cache lock {lock_key}: {str(e)}")
+                return True
+
+        def release_lock():
+            try:
+                yield ('delete', lock_key)
+            except Exception as e:
+                logger.error(f"Error releasing cache lock {lock_key}: {str(e)}")
+
+        def compute_and_store():
+            try:
+                values = yield ('compute',)
+                yield from store(values)
+                return values
+            finally:
+                yield from release_lock()
+
+        cached = yield from read()
+        complete = all(key in cached for key in keys)
+
+        if complete and marker_key in cached:
+            logger.info(f"Cache hit for keys: {keys}")
+            cls.record('hit')
+            return {key: cached[key] for key in keys}
+
+        if complete:
+            # Stale: one worker refreshes, everyone else serves the stale values
+            if (yield from acquire_lock()):
+                logger.info(f"Cache stale for keys: {keys}, refreshing")
+                cls.record('miss')
+                return (yield from compute_and_store())
+            logger.info(f"Cache stale hit for keys: {keys}")
+            cls.record('stale_hit')
+            return {key: cached[key] for key in keys}
+
+        logger.info(f"Cache miss for keys: {keys}")
+        cls.record('miss')
+        if (yield from acquire_lock()):
+            return (yield from compute_and_store())
+
+        # Another worker is computing the group: wait for its result
+        deadline = time.monotonic() + cls.LOCK_WAIT
+        while time.monotonic() < deadline:
+            yield ('sleep', cls.LOCK_POLL_INTERVAL)
+            cached = yield from read()
+            if all(key in cached for key in keys):
+                return {key: cached[key] for key in keys}
+
+        logger.info(f"Cache lock wait timed out for keys: {keys}")
+        return (yield ('compute',))
+
+    @staticmethod
+    def run_steps(steps, client, compute: Callable[[], Any]):
+        """Run get_or_compute_steps() on a synchronous cache client (Django's cache)"""
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            result, error = None, None
+            name, *args = step
+            try:
+                if name == 'compute':
+                    result = compute()
+                elif name == 'sleep':
+                    time.sleep(*args)
+                else:
+                    result = getattr(client, name)(*args)
+            except Exception as e:
+                error = e
+
+    @classmethod
+    def get_or_compute(cls, keys: List[str], compute: Callable[[], Dict[str, Any]],
+                       timeout: int = None, stale_timeout: int = None) -> Dict[str, Any]:
+        """
+        Read a group of keys in one get_many round trip, computing them on a miss
+        Only the worker holding the group's lock runs compute(): when the group is
+        stale the others keep serving the stale values, when it is missing they
+        wait for the lock holder's result (up to LOCK_WAIT) before computing themselves
+        Args:
+            keys: Cache keys of the group, keys[0] names the marker and lock
+            compute: Callable returning {key: value} for every key of the group
+            timeout: Fresh TTL in seconds, defaults to settings.CACHE_TTL
+            stale_timeout: How long values stay servable after the fresh TTL,
+                defaults to settings.CACHE_STALE_TTL
+        Returns: {key: value} for every key of the group
+        """
+        return cls.run_steps(cls.get_or_compute_steps(keys, timeout, stale_timeout), cache, compute)
+
+    @staticmethod
+    def increment(key: str, delta: int) -> Optional[int]:
+        """
+        Atomically add delta to an integer cached value (INCRBY on Redis)
+        The key's TTL is left unchanged
+        Returns: New value, None if the key is missing or the increment failed
+        """
+        try:
+            value = cache.incr(key, delta)
+            logger.info(f"Cache incremented by {delta} for key: {key}")
+            return value
+        except ValueError:
+            logger.info(f"Cache miss on increment for key: {key}")
+            return None
+        except Exception as e:
+            logger.error(f"Error incrementing cache for key {key}: {str(e)}")
+            return None
+
+    @classmethod
+    def get_locked(cls, keys) -> set:
+        """
+        Which get_or_compute groups, named by their keys[0], have a computation in flight
+        One get_many round trip, every group counts as locked when the cache cannot be read
+        """
+        keys = list(keys)
+        try:
+            locks = cache.get_many([key + cls.LOCK_SUFFIX for key in keys])
+        except Exception as e:
+            logger.error(f"Error reading cache locks: {str(e)}")
+            return set(keys)
+        return {key for key in keys if key + cls.LOCK_SUFFIX in locks}
+
     @staticmethod
     def invalidate_cache(key: str) -> bool:
         """
@@ -64,19 +256,77 @@ class RedisCacheService:
             logger.error(f"Error invalidating cache for key {key}: {str(e)}")
             return False
 
+    @classmethod
+    def get_generation(cls, namespace: str, default: Optional[int] = 0) -> Optional[int]:
+        """
+        Get the current generation of a namespace, creating it if needed
+        New counters start from the current time in ms, so a counter that was
+        evicted never restarts at a generation that was already used
+        Returns `default` when the cache cannot be read
+        """
+        key = cls.GENERATION_KEY.format(namespace=namespace)
+        try:
+            generation = cache.get(key)
+            if generation is None:
+                cache.add(key, int(time.time() * 1000), None)
+                generation = cache.get(key)
+            return generation
+        except Exception as e:
+            logger.error(f"Error getting generation for namespace {namespace}: {str(e)}")
+            return default
+
     @staticmethod
-    def invalidate_pattern(pattern: str) -> bool:
+    def format_key(namespace: str, generation: int, key: str) -> str:
+        """Key of `key` in a given generation of `namespace`"""
+        return f"{namespace}:v{generation}:{key}"
+
+    @classmethod
+    def get_generations(cls, namespaces) -> Dict[str, int]:
+        """
+        get_generation of several namespaces: one get_many round trip,
+        plus one add/get per namespace without a generation yet
+        Returns: {namespace: generation}
+        """
+        keys = {cls.GENERATION_KEY.format(namespace=namespace): namespace for namespace in namespaces}
+        try:
+            found = cache.get_many(list(keys))
+        except Exception as e:
+            logger.error(f"Error getting generations for namespaces {list(keys.values())}: {str(e)}")
+            return {namespace: 0 for namespace in keys.values()}
+        return {
+            namespace: found[key] if key in found else cls.get_generation(namespace)
+            for key, namespace in keys.items()
+        }
+
+    @classmethod
+    def versioned_keys(cls, namespace: str, keys: List[str]) -> List[str]:
+        """versioned_key of several keys of one namespace, one generation lookup"""
+        generation = cls.get_generation(namespace)
+        return [cls.format_key(namespace, generation, key) for key in keys]
+
+    @classmethod
+    def versioned_key(cls, namespace: str, key: str) -> str:
+        """
+        Build the key of `key` in the current generation of `namespace`
+        Example: versioned_key("user:123", "totals:income") -> "user:123:v42:totals:income"
         """
-        Delete all cache keys matching the pattern
-        Example: invalidate_pattern("user:123:*") will delete all cache for user 123
+        return cls.format_key(namespace, cls.get_generation(namespace), key)
+
+    @classmethod
+    def invalidate_namespace(cls, namespace: str) -> bool:
+        """
+        Invalidate every key of a namespace with a single counter increment
         Returns: True if successful, False if failed
         """
+        key = cls.GENERATION_KEY.format(namespace=namespace)
         try:
-            keys = cache.keys(pattern)
-            if keys:
-                cache.delete_many(keys)
-                logger.info(f"Cache invalidated for pattern: {pattern}")
+            try:
+                cache.incr(key)
+            except ValueError:
+                # No generation yet: nothing was cached under this namespace
+                cache.add(key, int(time.time() * 1000), None)
+            logger.info(f"Cache invalidated for namespace: {namespace}")
             return True
         except Exception as e:
-            logger.error(f"Error invalidating cache pattern {pattern}: {str(e)}")
-            return False 
\ No newline at end of file
+            logger.error(f"Error invalidating cache namespace {namespace}: {str(e)}")
+            return False
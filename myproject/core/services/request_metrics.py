@@ -0,0 +1,172 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RequestMetrics:
+    """
+    Measurements of the request being served: DB queries, cache lookups,
+    serializer time. Bound to the request's context by RequestMetricsService.start()
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.view = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.cache = {'hit': 0, 'stale_hit': 0, 'miss': 0}
+        self._serializer_depth = 0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook timing every query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - start
+
+    @contextmanager
+    def serializer_timer(self):
+        # Nested serializers run inside their parent: only the outermost one is timed
+        self._serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._serializer_depth -= 1
+            if not self._serializer_depth:
+                self.serializer_time += time.perf_counter() - start
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value, durations in ms"""
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries"',
+            f'cache;desc="{self.cache["hit"] + self.cache["stale_hit"]} hits, {self.cache["miss"]} misses"',
+            f'serializer;dur={self.serializer_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, Prometheus style"""
+
+    def __init__(self, name: str, help: str, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, view: str, value: float):
+        counts, total = self.series.get(view, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect_left(self.buckets, value)] += 1
+        self.series[view] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for view, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{view="{view}",le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{view="{view}"}} {total}')
+            lines.append(f'{self.name}_count{{view="{view}"}} {cumulative}')
+        return lines
+
+class RequestMetricsService:
+    """
+    Service class to collect per-request performance metrics:
+    1. start(): bind a RequestMetrics to the current request (contextvar)
+    2. RedisCacheService lookups and serializers report into current()
+    3. finish(): aggregate the request into per-view histograms
+    4. render(): Prometheus text exposition of the histograms (served on /metrics)
+    Histograms are kept per process: scrape every worker, or run a single one
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+    _current: ContextVar[Optional[RequestMetrics]] = ContextVar('request_metrics', default=None)
+    _lock = threading.Lock()
+    histograms = {
+        'total': Histogram('http_request_duration_seconds', "Request duration", DURATION_BUCKETS),
+        'db_time': Histogram('http_request_db_duration_seconds', "Time spent in DB queries", DURATION_BUCKETS),
+        'db_queries': Histogram('http_request_db_queries', "DB queries per request", QUERY_BUCKETS),
+        'serializer_time': Histogram('http_request_serializer_duration_seconds', "Time spent in serializers", DURATION_BUCKETS),
+    }
+    cache_lookups: Dict[tuple, int] = {}
+
+    @classmethod
+    def start(cls):
+        """Returns: (metrics, token) where token is passed back to finish()"""
+        metrics = RequestMetrics()
+        return metrics, cls._current.set(metrics)
+
+    @classmethod
+    def current(cls) -> Optional[RequestMetrics]:
+        return cls._current.get()
+
+    @classmethod
+    def finish(cls, metrics: RequestMetrics, token) -> float:
+        """
+        Unbind the request and record it under its view name
+        Returns: total request time in seconds
+        """
+        cls._current.reset(token)
+        total = time.perf_counter() - metrics.start
+        if metrics.view is None:
+            return total
+
+        with cls._lock:
+            cls.histograms['total'].observe(metrics.view, total)
+            cls.histograms['db_time'].observe(metrics.view, metrics.db_time)
+            cls.histograms['db_queries'].observe(metrics.view, metrics.db_queries)
+            cls.histograms['serializer_time'].observe(metrics.view, metrics.serializer_time)
+            for outcome, count in metrics.cache.items():
+                key = (metrics.view, outcome)
+                cls.cache_lookups[key] = cls.cache_lookups.get(key, 0) + count
+        return total
+
+    @classmethod
+    def record_cache(cls, outcome: str):
+        metrics = cls.current()
+        if metrics is not None:
+            metrics.cache[outcome] += 1
+
+    @classmethod
+    @contextmanager
+    def serializer_timer(cls):
+        metrics = cls.current()
+        if metrics is None:
+            yield
+            return
+        with metrics.serializer_timer():
+            yield
+
+    @classmethod
+    def render(cls) -> str:
+        with cls._lock:
+            lines = []
+            for histogram in cls.histograms.values():
+                lines += histogram.render()
+            lines += [
+                "# HELP http_request_cache_lookups_total RedisCacheService lookups by outcome",
+                "# TYPE http_request_cache_lookups_total counter",
+            ]
+            for (view, outcome), count in sorted(cls.cache_lookups.items()):
+                lines.append(f'http_request_cache_lookups_total{{view="{view}",result="{outcome}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            for histogram in cls.histograms.values():
+                histogram.series.clear()
+            cls.cache_lookups.clear()
@@ -0,0 +1,205 @@
+from datetime import date
+import numpy as np
+from django.db.models import BigIntegerField, Case, F, Func, IntegerField, Value, When
+from accounts.models import Category, Transaction
+from core.services.redis_cache import RedisCacheService
+from core.services.transaction_cache import TransactionCacheService
+
+EPOCH = date(1970, 1, 1)
+
+
+class SpendingHistory:
+    """
+    A user's dated transactions as parallel NumPy arrays, one element per transaction:
+    days (days since 1970-01-01), is_income, categories (Category id), cents (amount in cents)
+    """
+
+    def __init__(self, days, is_income, categories, cents):
+        self.days = days
+        self.is_income = is_income
+        self.categories = categories
+        self.cents = cents
+
+    def __len__(self):
+        return len(self.days)
+
+
+class SpendingAnalyticsService:
+    """
+    Service class for statistics over a user's full history:
+    moving averages, per-category percentiles, month-end projection and savings rate.
+    The history is loaded once as integer columns (no model instances, no Decimals)
+    and every metric is computed with vectorized NumPy operations, so the cost is
+    one pass over the rows plus O(days) work.
+    """
+
+    MOVING_AVERAGE_WINDOWS = (7, 30, 90)  # days
+    SERIES_WINDOW = 30  # days, moving average reported at every month end
+    PERCENTILES = (50, 90, 99)
+    TREND_MONTHS = 12
+    ANALYTICS_PATTERN = "analytics:{today}"
+
+    @staticmethod
+    def load(user_id: int) -> SpendingHistory:
+        """
+        Read the user's dated transactions with one values_list query
+        Dates and amounts are converted to integers in SQL
+        Using index: (user, type, date) INCLUDE (amount)
+        """
+        rows = Transaction.objects.filter(user_id=user_id, date__isnull=False).values_list(
+            Func(F('date'), template=f"(%(expressions)s - DATE '{EPOCH.isoformat()}')", output_field=IntegerField()),
+            Case(When(type='income', then=Value(1)), default=Value(0), output_field=IntegerField()),
+            'category_id',
+            Func(F('amount'), template="(%(expressions)s * 100)::bigint", output_field=BigIntegerField()),
+        )
+        data = np.array(list(rows), dtype=np.int64).reshape(-1, 4)
+        return SpendingHistory(data[:, 0], data[:, 1].astype(bool), data[:, 2], data[:, 3])
+
+    @staticmethod
+    def to_amount(cents):
+        """Cents (scalar or array) to a JSON-friendly amount, or list of amounts"""
+        amounts = np.round(np.asarray(cents, dtype=np.float64) / 100, 2)
+        return amounts.tolist()
+
+    @classmethod
+    def moving_averages(cls, daily_expense, month_end_indexes) -> dict:
+        """
+        Trailing average daily expense, from a per-day expense array ending today
+        Returns: current average per window and the SERIES_WINDOW average at every month end
+        """
+        cumulative = np.concatenate(([0.0], np.cumsum(daily_expense)))
+
+        def trailing(end_indexes, window):
+            # Average of days (end - window, end], days before the history count as zero
+            ends = np.asarray(end_indexes) + 1
+            return (cumulative[ends] - cumulative[np.maximum(ends - window, 0)]) / window
+
+        today_index = len(daily_expense) - 1
+        return {
+            'window_days': list(cls.MOVING_AVERAGE_WINDOWS),
+            'daily_expense': cls.to_amount([trailing([today_index], window)[0] for window in cls.MOVING_AVERAGE_WINDOWS]),
+            'series_window_days': cls.SERIES_WINDOW,
+            'series': cls.to_amount(trailing(month_end_indexes, cls.SERIES_WINDOW)),
+        }
+
+    @classmethod
+    def category_percentiles(cls, history: SpendingHistory) -> list:
+        """
+        Percentiles of the expense amounts of every category (linear interpolation, like np.percentile)
+        Computed for all categories at once on amounts sorted by (category, amount)
+        """
+        expense = ~history.is_income
+        categories = history.categories[expense]
+        if not len(categories):
+            return []
+        order = np.lexsort((history.cents[expense], categories))
+        categories = categories[order]
+        amounts = history.cents[expense][order].astype(np.float64)
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(categories)) + 1))
+        counts = np.diff(np.concatenate((starts, [len(categories)])))
+
+        values = {}
+        for pct in cls.PERCENTILES:
+            position = starts + (counts - 1) * pct / 100
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            values[pct] = amounts[low] + (amounts[high] - amounts[low]) * (position - low)
+
+        category_ids = categories[starts].tolist()
+        names = dict(Category.objects.filter(id__in=category_ids).values_list('id', 'name'))
+        totals = cls.to_amount(np.add.reduceat(amounts, starts))
+        columns = {f'p{pct}': cls.to_amount(values[pct]) for pct in cls.PERCENTILES}
+        result = [
+            {
+                'category_id': category_id,
+                'category': names.get(category_id),
+                'count': count,
+                'total': totals[index],
+                **{name: column[index] for name, column in columns.items()},
+            }
+            for index, (category_id, count) in enumerate(zip(category_ids, counts.tolist()))
+        ]
+        result.sort(key=lambda row: -row['total'])
+        return result
+
+    @classmethod
+    def compute(cls, history: SpendingHistory, today: date) -> dict:
+        """
+        Every metric of a loaded history as of `today`
+        Transactions after today are ignored
+        """
+        today_day = (today - EPOCH).days
+        month = np.datetime64(today, 'M')
+        month_start = int((month.astype('datetime64[D]') - np.datetime64(EPOCH, 'D')).astype(np.int64))
+        days_in_month = int(((month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')).astype(np.int64))
+
+        past = history.days <= today_day
+        days = history.days[past]
+        is_income = history.is_income[past]
+        cents = history.cents[past]
+        income_cents = np.where(is_income, cents, 0)
+        expense_cents = np.where(is_income, 0, cents)
+
+        first_day = int(days.min()) if len(days) else month_start
+        daily_expense = np.bincount(days - first_day, weights=expense_cents, minlength=today_day - first_day + 1)
+
+        # Month buckets, months since 1970-01
+        first_month = int(np.datetime64(first_day, 'D').astype('datetime64[M]').astype(np.int64))
+        months = np.arange(first_month, int(month.astype(np.int64)) + 1)
+        transaction_months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) - first_month
+        monthly_income = np.bincount(transaction_months, weights=income_cents, minlength=len(months))
+        monthly_expense = np.bincount(transaction_months, weights=expense_cents, minlength=len(months))
+        month_end_days = (months + 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) - 1
+        month_end_indexes = np.minimum(month_end_days, today_day) - first_day
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(monthly_income > 0, (monthly_income - monthly_expense) / monthly_income, np.nan)
+        recent = rates[-cls.TREND_MONTHS:]
+        valid = ~np.isnan(recent)
+        trend = None
+        if valid.sum() >= 2:
+            trend = round(float(np.polyfit(np.flatnonzero(valid), recent[valid], 1)[0]), 4)
+
+        in_month = days >= month_start
+        elapsed = today_day - month_start + 1
+        income_to_date = income_cents[in_month].sum()
+        expense_to_date = expense_cents[in_month].sum()
+
+        return {
+            'as_of': today.isoformat(),
+            'transactions': int(len(days)),
+            'moving_averages': cls.moving_averages(daily_expense, month_end_indexes),
+            'category_percentiles': cls.category_percentiles(SpendingHistory(days, is_income, history.categories[past], cents)),
+            'month_end_projection': {
+                'month': str(month),
+                'days_elapsed': elapsed,
+                'days_in_month': days_in_month,
+                'income_to_date': cls.to_amount(income_to_date),
+                'expense_to_date': cls.to_amount(expense_to_date),
+                # Month-to-date run rate
+                'projected_income': cls.to_amount(income_to_date / elapsed * days_in_month),
+                'projected_expense': cls.to_amount(expense_to_date / elapsed * days_in_month),
+            },
+            'savings_rate': {
+                'months': [str(value) for value in months.astype('datetime64[M]')],
+                'income': cls.to_amount(monthly_income),
+                'expense': cls.to_amount(monthly_expense),
+                # None for months without income
+                'rate': [None if np.isnan(rate) else round(float(rate), 4) for rate in rates],
+                'trend_per_month': trend,
+            },
+        }
+
+    @classmethod
+    def get_analytics(cls, user_id: int, today: date) -> dict:
+        """
+        load() and compute() through the cache, keyed by (user, data version, day)
+        Flow: Check Cache -> Cache Hit/Miss -> Query DB if needed -> Return Data
+        """
+        key = RedisCacheService.versioned_key(
+            TransactionCacheService.get_data_namespace(user_id),
+            cls.ANALYTICS_PATTERN.format(today=today.isoformat())
+        )
+        cached = RedisCacheService.get_or_compute([key], lambda: {key: cls.compute(cls.load(user_id), today)})
+        return cached[key]
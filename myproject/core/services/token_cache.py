@@ -0,0 +1,201 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from core.services.async_cache import AsyncRedisCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenCacheService:
+    """
+    Service class to resolve API tokens to their users without a query per request:
+    1. In-process LRU, entries live AUTH_TOKEN_LOCAL_TTL seconds
+    2. Cache (Redis), entries live AUTH_TOKEN_CACHE_TTL seconds
+    3. Token + user join query, the active user is stored in both levels
+
+    Entries are keyed by the token's SHA-256 and hold only the user's id, is_active
+    and is_staff, never the token itself or the password hash. Requests get a user
+    with the other fields deferred, loaded on first access.
+
+    Deleting a token or saving its user replaces the token's entry with a short-lived
+    tombstone and drops it from this process's LRU. Fills only add missing entries,
+    so a lookup that read the user before the change cannot store it back. Other
+    processes drop the token when their LRU entry expires, which is why the local
+    TTL is kept short.
+    """
+
+    KEY_PATTERN = "auth:token:{digest}"
+    FIELDS = ('id', 'is_active', 'is_staff')
+    REVOKED = 'revoked'
+    TOMBSTONE_TTL = 30
+    MAX_ENTRIES = 10000
+    _users = OrderedDict()  # token digest -> (expires at, entry)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def get_key(cls, key: str) -> str:
+        return cls.KEY_PATTERN.format(digest=cls.get_digest(key))
+
+    @staticmethod
+    def local_ttl() -> float:
+        return getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 30)
+
+    @staticmethod
+    def cache_ttl() -> int:
+        return getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300)
+
+    @classmethod
+    def to_entry(cls, user) -> tuple:
+        """Cached form of a user: (id, is_active, is_staff)"""
+        return tuple(getattr(user, name) for name in cls.FIELDS)
+
+    @classmethod
+    def to_user(cls, entry: tuple):
+        """User of a cached entry, the other fields are deferred (one query on first access)"""
+        # Every request builds its own instance, nothing cached is ever mutated
+        model = get_user_model()
+        values = dict(zip(cls.FIELDS, entry))
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+        return model.from_db('default', names, [values[name] for name in names])
+
+    @classmethod
+    def get_local(cls, key: str):
+        digest = cls.get_digest(key)
+        with cls._lock:
+            entry = cls._users.get(digest)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del cls._users[digest]
+                return None
+            cls._users.move_to_end(digest)
+            return cls.to_user(entry[1])
+
+    @classmethod
+    def remember_local(cls, key: str, entry: tuple):
+        digest = cls.get_digest(key)
+        with cls._lock:
+            cls._users[digest] = (time.monotonic() + cls.local_ttl(), entry)
+            cls._users.move_to_end(digest)
+            while len(cls._users) > cls.MAX_ENTRIES:
+                cls._users.popitem(last=False)
+
+    @classmethod
+    def clear_local(cls):
+        with cls._lock:
+            cls._users.clear()
+
+    @staticmethod
+    def find_user(key: str):
+        """Returns: the token's user (one join query), None if the token does not exist"""
+        token = Token.objects.select_related('user').filter(key=key).first()
+        return token.user if token else None
+
+    @classmethod
+    def get_user(cls, key: str):
+        """
+        Get the user of a token
+        Flow: Check LRU -> Check Cache -> Query DB if needed -> Store active users
+        Returns: user, None if the token does not exist
+        """
+        user = cls.get_local(key)
+        if user is not None:
+            return user
+
+        try:
+            entry = cache.get(cls.get_key(key))
+        except Exception as e:
+            logger.error(f"Error getting cached token user: {str(e)}")
+            entry = cls.REVOKED
+
+        if entry is None or entry == cls.REVOKED:
+            user = cls.find_user(key)
+            # Inactive users are rejected by the authentication and never cached
+            if user is None or not user.is_active or entry == cls.REVOKED:
+                return user
+            entry = cls.to_entry(user)
+            try:
+                # add: a tombstone written since the query keeps the entry out
+                if not cache.add(cls.get_key(key), entry, cls.cache_ttl()):
+                    return user
+            except Exception as e:
+                logger.error(f"Error caching token user: {str(e)}")
+                return user
+
+        cls.remember_local(key, entry)
+        return cls.to_user(entry)
+
+    @classmethod
+    async def aget_user(cls, key: str):
+        """Async get_user, same cache entries"""
+        user = cls.get_local(key)
+        if user is not None:
+            return user
+
+        client = AsyncRedisCacheService.get_client()
+        try:
+            entry = await client.get(cls.get_key(key))
+        except Exception as e:
+            logger.error(f"Error getting cached token user: {str(e)}")
+            entry = cls.REVOKED
+
+        if entry is None or entry == cls.REVOKED:
+            token = await Token.objects.select_related('user').filter(key=key).afirst()
+            user = token.user if token else None
+            if user is None or not user.is_active or entry == cls.REVOKED:
+                return user
+            entry = cls.to_entry(user)
+            try:
+                if not await client.add(cls.get_key(key), entry, cls.cache_ttl()):
+                    return user
+            except Exception as e:
+                logger.error(f"Error caching token user: {str(e)}")
+                return user
+
+        cls.remember_local(key, entry)
+        return cls.to_user(entry)
+
+    @classmethod
+    def invalidate(cls, keys):
+        """
+        Replace tokens' entries with tombstones and drop them from this process's LRU
+        For TOMBSTONE_TTL seconds lookups of these tokens query the database and
+        store nothing, so a lookup racing the change cannot cache the old user
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        with cls._lock:
+            for key in keys:
+                cls._users.pop(cls.get_digest(key), None)
+        try:
+            cache.set_many({cls.get_key(key): cls.REVOKED for key in keys}, cls.TOMBSTONE_TTL)
+            logger.info(f"Token cache invalidated for {len(keys)} tokens")
+        except Exception as e:
+            logger.error(f"Error invalidating token cache: {str(e)}")
+
+    @classmethod
+    def forget(cls, keys):
+        """Drop tokens from the cache and from this process's LRU without tombstones (benchmarks)"""
+        keys = list(keys)
+        with cls._lock:
+            for key in keys:
+                cls._users.pop(cls.get_digest(key), None)
+        try:
+            cache.delete_many([cls.get_key(key) for key in keys])
+        except Exception as e:
+            logger.error(f"Error forgetting cached tokens: {str(e)}")
+
+    @classmethod
+    def invalidate_user(cls, user_id: int):
+        """Drop the tokens of a user (after a deactivation or any other change of the user)"""
+        cls.invalidate(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
@@ -1,22 +1,86 @@
-from django.db.models import Sum
-from accounts.models import Transaction, DailyRecord
+from decimal import Decimal
+from typing import Optional
+from accounts.models import Transaction
+from accounts.queries import income_expense_aggregates
 from core.services.redis_cache import RedisCacheService
+from core.services.async_cache import AsyncRedisCacheService
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TransactionCacheService:
-    """Service class to handle Transaction data caching"""
+    """
+    Service class to handle Transaction data caching
+    Totals are cached as integer cents so writes can adjust them with an atomic
+    increment (INCRBY on Redis) instead of invalidating and recomputing
+    """
+
+    # Cache namespaces, versioned by RedisCacheService generations
+    SYSTEM_NAMESPACE = "system"
+    USER_NAMESPACE = "user:{user_id}"
+    # Generation bumped by every committed write to the user's transactions,
+    # versions the caches of values that cannot be adjusted by a delta (e.g. breakdowns)
+    DATA_NAMESPACE = "data:user:{user_id}"
+
+    # Cache key patterns (values in cents)
+    TOTAL_PATTERN = "totals:{type}_cents"  # type: income/expense
 
-    # Cache key patterns
-    SYSTEM_TOTAL_INCOME_KEY = "system:totals:income"
-    SYSTEM_TOTAL_EXPENSE_KEY = "system:totals:expense"
-    USER_TOTAL_PATTERN = "user:{user_id}:totals:{type}"  # type: income/expense
+    @classmethod
+    def get_user_namespace(cls, user_id: int) -> str:
+        """Generate cache namespace for a user"""
+        return cls.USER_NAMESPACE.format(user_id=user_id)
+
+    @classmethod
+    def get_data_namespace(cls, user_id: int) -> str:
+        """Generate the data version namespace of a user"""
+        return cls.DATA_NAMESPACE.format(user_id=user_id)
+
+    @classmethod
+    def get_data_version(cls, user_id: int) -> Optional[int]:
+        """
+        Get the version of a user's transaction data, changes after every write
+        None when the cache cannot be read: there is no version to compare against
+        """
+        return RedisCacheService.get_generation(cls.get_data_namespace(user_id), default=None)
+
+    @classmethod
+    async def aget_data_version(cls, user_id: int) -> Optional[int]:
+        """Async get_data_version"""
+        return await AsyncRedisCacheService.aget_generation(cls.get_data_namespace(user_id), default=None)
+
+    @classmethod
+    def bump_data_versions(cls, user_ids):
+        """Mark the users' transaction data as changed (O(1) generation bump each)"""
+        for user_id in user_ids:
+            RedisCacheService.invalidate_namespace(cls.get_data_namespace(user_id))
 
     @classmethod
     def get_user_total_key(cls, user_id: int, type: str) -> str:
         """Generate cache key for user total"""
-        return cls.USER_TOTAL_PATTERN.format(user_id=user_id, type=type)
+        return RedisCacheService.versioned_key(
+            cls.get_user_namespace(user_id), cls.TOTAL_PATTERN.format(type=type))
+
+    @classmethod
+    def get_system_total_key(cls, type: str) -> str:
+        """Generate cache key for system total"""
+        return RedisCacheService.versioned_key(
+            cls.SYSTEM_NAMESPACE, cls.TOTAL_PATTERN.format(type=type))
+
+    @classmethod
+    def get_total_keys(cls, namespace: str):
+        """Generate the income and expense total keys of a namespace"""
+        return RedisCacheService.versioned_keys(
+            namespace, [cls.TOTAL_PATTERN.format(type='income'), cls.TOTAL_PATTERN.format(type='expense')])
+
+    @staticmethod
+    def to_cents(amount) -> int:
+        """Convert a money amount to integer cents"""
+        return int((Decimal(str(amount)) * 100).quantize(Decimal('1')))
+
+    @staticmethod
+    def from_cents(cents: int) -> Decimal:
+        """Convert integer cents back to a 2-decimal money amount"""
+        return (Decimal(cents) / 100).quantize(Decimal('0.01'))
 
     @classmethod
     def get_system_totals(cls):
@@ -24,33 +88,23 @@ class TransactionCacheService:
         Get total income and expense for the entire system
         Flow: Check Cache -> Cache Hit/Miss -> Query DB if needed -> Return Data
         """
-        # Check cache for both income and expense
-        cached_income = RedisCacheService.get_cache(cls.SYSTEM_TOTAL_INCOME_KEY)
-        cached_expense = RedisCacheService.get_cache(cls.SYSTEM_TOTAL_EXPENSE_KEY)
-        
-        # cached_income = None
-        # cached_expense = None
+        # Generate cache keys (one generation lookup for both)
+        income_key, expense_key = cls.get_total_keys(cls.SYSTEM_NAMESPACE)
 
-        # If we have all cached data
-        if cached_income is not None and cached_expense is not None:
+        def compute():
+            # Cache miss -> Query from database (one conditional aggregate)
+            totals = Transaction.objects.aggregate(**income_expense_aggregates())
             return {
-                'total_income': cached_income,
-                'total_expense': cached_expense
+                income_key: cls.to_cents(totals['total_income']),
+                expense_key: cls.to_cents(totals['total_expense'])
             }
 
-        # Cache miss -> Query from database
-        total_income = Transaction.objects.filter(type='income').aggregate(
-            total=Sum('amount'))['total'] or 0
-        total_expense = Transaction.objects.filter(type='expense').aggregate(
-            total=Sum('amount'))['total'] or 0
-
-        # Store in cache
-        RedisCacheService.set_cache(cls.SYSTEM_TOTAL_INCOME_KEY, total_income)
-        RedisCacheService.set_cache(cls.SYSTEM_TOTAL_EXPENSE_KEY, total_expense)
+        # Both keys in one round trip, single-flight recompute
+        cached = RedisCacheService.get_or_compute([income_key, expense_key], compute)
 
         return {
-            'total_income': total_income,
-            'total_expense': total_expense
+            'total_income': cls.from_cents(cached[income_key]),
+            'total_expense': cls.from_cents(cached[expense_key])
         }
 
     @classmethod
@@ -59,54 +113,113 @@ class TransactionCacheService:
         Get total income and expense for a specific user
         Flow: Check Cache -> Cache Hit/Miss -> Query DB if needed -> Return Data
         """
-        # Generate cache keys
-        income_key = cls.get_user_total_key(user_id, 'income')
-        expense_key = cls.get_user_total_key(user_id, 'expense')
+        # Generate cache keys (one generation lookup for both)
+        income_key, expense_key = cls.get_total_keys(cls.get_user_namespace(user_id))
+
+        def compute():
+            # Cache miss -> Query from database (one conditional aggregate,
+            # index-only scan of (user, type, date) INCLUDE (amount))
+            totals = Transaction.objects.filter(
+                user_id=user_id
+            ).aggregate(**income_expense_aggregates())
+            return {
+                income_key: cls.to_cents(totals['total_income']),
+                expense_key: cls.to_cents(totals['total_expense'])
+            }
+
+        # Both keys in one round trip, single-flight recompute
+        cached = RedisCacheService.get_or_compute([income_key, expense_key], compute)
+
+        return {
+            'total_income': cls.from_cents(cached[income_key]),
+            'total_expense': cls.from_cents(cached[expense_key])
+        }
 
-        # Check cache
-        cached_income = RedisCacheService.get_cache(income_key)
-        cached_expense = RedisCacheService.get_cache(expense_key)
+    @classmethod
+    async def aget_totals(cls, namespace: str, queryset):
+        """
+        Async get_user_totals/get_system_totals: one generation lookup for both keys,
+        the same group (one get_many round trip) as the sync methods, redis.asyncio
+        round trips and, on a miss, the same single conditional aggregate on the async ORM
+        """
+        income_key, expense_key = await AsyncRedisCacheService.aversioned_keys(
+            namespace, [cls.TOTAL_PATTERN.format(type='income'), cls.TOTAL_PATTERN.format(type='expense')])
 
-        # If we have all cached data
-        if cached_income is not None and cached_expense is not None:
+        async def compute():
+            totals = await queryset.aaggregate(**income_expense_aggregates())
             return {
-                'total_income': cached_income,
-                'total_expense': cached_expense
+                income_key: cls.to_cents(totals['total_income']),
+                expense_key: cls.to_cents(totals['total_expense'])
             }
 
-        # Cache miss -> Query from database
-        # Update query to use daily_record relationship
-        daily_records = DailyRecord.objects.filter(user_id=user_id)
-        total_income = Transaction.objects.filter(
-            daily_record__in=daily_records,
-            type='income'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        total_expense = Transaction.objects.filter(
-            daily_record__in=daily_records,
-            type='expense'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        # Store in cache
-        RedisCacheService.set_cache(income_key, total_income)
-        RedisCacheService.set_cache(expense_key, total_expense)
+        cached = await AsyncRedisCacheService.aget_or_compute([income_key, expense_key], compute)
 
         return {
-            'total_income': total_income,
-            'total_expense': total_expense
+            'total_income': cls.from_cents(cached[income_key]),
+            'total_expense': cls.from_cents(cached[expense_key])
+        }
+
+    @classmethod
+    async def aget_system_totals(cls):
+        """Async get_system_totals, same cache keys"""
+        return await cls.aget_totals(cls.SYSTEM_NAMESPACE, Transaction.objects.all())
+
+    @classmethod
+    async def aget_user_totals(cls, user_id: int):
+        """Async get_user_totals, same cache keys"""
+        return await cls.aget_totals(cls.get_user_namespace(user_id), Transaction.objects.filter(user_id=user_id))
+
+    @classmethod
+    def apply_transaction_deltas(cls, deltas: dict):
+        """
+        Adjust cached user and system totals after a transaction write
+        and bump the data version of every user in `deltas`
+        Args:
+            deltas: {(user_id, type): amount} changes made by the write
+        A namespace whose increment misses, or whose totals are being computed, gets a new
+        generation: a computation that read the database before this write then stores
+        its totals under the old one, and the next read recomputes them
+        """
+        # Zero deltas included: a write can move an amount between categories or days
+        cls.bump_data_versions({user_id for user_id, _ in deltas})
+
+        changes = {}
+        for (user_id, type), amount in deltas.items():
+            cents = cls.to_cents(amount)
+            if cents:
+                changes[(cls.get_user_namespace(user_id), type)] = cents
+                changes[(cls.SYSTEM_NAMESPACE, type)] = changes.get((cls.SYSTEM_NAMESPACE, type), 0) + cents
+        if not changes:
+            return
+
+        # Generations of every touched namespace in one round trip
+        generations = RedisCacheService.get_generations({namespace for namespace, _ in changes})
+        stale = set()
+        for (namespace, type), cents in changes.items():
+            key = RedisCacheService.format_key(namespace, generations[namespace], cls.TOTAL_PATTERN.format(type=type))
+            if RedisCacheService.increment(key, cents) is None:
+                stale.add(namespace)
+
+        # Checked after the increments: a lock taken since reads the database after this write
+        groups = {
+            namespace: RedisCacheService.format_key(namespace, generation, cls.TOTAL_PATTERN.format(type='income'))
+            for namespace, generation in generations.items()
         }
+        locked = RedisCacheService.get_locked(groups.values())
+        stale.update(namespace for namespace, key in groups.items() if key in locked)
+        for namespace in stale:
+            RedisCacheService.invalidate_namespace(namespace)
 
     @classmethod
     def invalidate_user_cache(cls, user_id: int):
-        """Invalidate user's cache when transaction changes"""
-        pattern = f"user:{user_id}:totals:*"
-        RedisCacheService.invalidate_pattern(pattern)
+        """Invalidate all of the user's cache (O(1) generation bumps)"""
+        RedisCacheService.invalidate_namespace(cls.get_user_namespace(user_id))
+        cls.bump_data_versions([user_id])
 
     @classmethod
     def invalidate_system_cache(cls):
-        """Invalidate system totals cache"""
-        RedisCacheService.invalidate_cache(cls.SYSTEM_TOTAL_INCOME_KEY)
-        RedisCacheService.invalidate_cache(cls.SYSTEM_TOTAL_EXPENSE_KEY)
+        """Invalidate system totals cache (O(1) generation bump)"""
+        RedisCacheService.invalidate_namespace(cls.SYSTEM_NAMESPACE)
 
     @classmethod
     def invalidate_all_cache(cls, user_id: int = None):
@@ -0,0 +1,51 @@
+import csv
+import json
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() returns the line instead of storing it"""
+    def write(self, value):
+        return value
+
+class TransactionExportService:
+    """
+    Service class to stream a transaction queryset as CSV or NDJSON
+    Rows are read through a server-side cursor (iterator(chunk_size=...)) and
+    encoded one at a time, so memory use does not depend on the history length
+    """
+
+    FIELDS = ('id', 'date', 'type', 'category', 'amount')
+    COLUMNS = ('id', 'date', 'type', 'category__name', 'amount')
+    CHUNK_SIZE = 2000
+    FORMATS = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+
+    @classmethod
+    def rows(cls, queryset):
+        """Iterate (id, date, type, category, amount) tuples in (date, id) order"""
+        return queryset.order_by('date', 'id').values_list(*cls.COLUMNS).iterator(chunk_size=cls.CHUNK_SIZE)
+
+    @classmethod
+    def stream_csv(cls, queryset):
+        writer = csv.writer(Echo())
+        yield writer.writerow(cls.FIELDS)
+        for row in cls.rows(queryset):
+            yield writer.writerow(row)
+
+    @classmethod
+    def stream_ndjson(cls, queryset):
+        for row in cls.rows(queryset):
+            record = dict(zip(cls.FIELDS, row))
+            record['date'] = record['date'].isoformat() if record['date'] else None
+            record['amount'] = str(record['amount'])
+            yield json.dumps(record) + "\n"
+
+    @classmethod
+    def stream(cls, queryset, file_format: str):
+        """
+        Returns: (generator of text chunks, content type)
+        """
+        if file_format == 'ndjson':
+            return cls.stream_ndjson(queryset), cls.FORMATS['ndjson']
+        return cls.stream_csv(queryset), cls.FORMATS['csv']
@@ -0,0 +1,195 @@
+import csv
+import io
+from accounts.models import Category, DailyRecord, Transaction, UserMonthlySummary
+
+class TransactionImportService:
+    """
+    Service class to load large transaction files through Postgres COPY:
+    1. create_staging(): temporary staging table, dropped at commit
+    2. copy_rows(): COPY validated rows into it, one chunk at a time
+    3. merge(): set-based INSERT/UPDATE from staging into Category, DailyRecord,
+       Transaction, DailyRecord totals and the UserMonthlySummary rollup
+    All steps must run inside one transaction.atomic() block
+    """
+
+    STAGING_TABLE = "import_transaction_staging"
+    DAILY_RECORD_MAP_TABLE = "import_daily_record_map"
+    CATEGORY_MAP_TABLE = "import_category_map"
+    COLUMNS = ('user_id', 'date', 'type', 'category', 'amount')
+
+    @classmethod
+    def create_staging(cls, cursor):
+        # Leftovers of an earlier import in the same outer transaction are only dropped at its commit
+        cursor.execute(
+            f"DROP TABLE IF EXISTS {cls.STAGING_TABLE}, {cls.DAILY_RECORD_MAP_TABLE}, {cls.CATEGORY_MAP_TABLE}")
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {cls.STAGING_TABLE} (
+                user_id bigint NOT NULL,
+                date date NOT NULL,
+                type varchar(10) NOT NULL,
+                category varchar(50) NOT NULL,
+                amount numeric(10, 2) NOT NULL
+            ) ON COMMIT DROP
+            """
+        )
+
+    @classmethod
+    def copy_rows(cls, cursor, rows):
+        """
+        COPY (user_id, date, type, category, amount) tuples into the staging table
+        Returns: number of rows copied
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {cls.STAGING_TABLE} ({', '.join(cls.COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        return count
+
+    @classmethod
+    def merge(cls, cursor) -> dict:
+        """
+        Merge the staging table into the application tables
+        Returns: counts of created daily records and transactions
+        """
+        staging = cls.STAGING_TABLE
+        record_map = cls.DAILY_RECORD_MAP_TABLE
+        category_map = cls.CATEGORY_MAP_TABLE
+        category_table = Category._meta.db_table
+        daily_record_table = DailyRecord._meta.db_table
+        transaction_table = Transaction._meta.db_table
+        summary_table = UserMonthlySummary._meta.db_table
+
+        # The temporary tables are invisible to autovacuum: analyze them before joining
+        cursor.execute(f"ANALYZE {staging}")
+
+        # 1. (user, date) -> staged totals and DailyRecord id, the first record when a day
+        # has several, NULL for pairs that have none yet
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {record_map} ON COMMIT DROP AS
+            SELECT s.user_id, s.date, s.income, s.expense, MIN(dr.id) AS daily_record_id
+            FROM (
+                SELECT user_id, date,
+                       COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0) AS income,
+                       COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0) AS expense
+                FROM {staging}
+                GROUP BY user_id, date
+            ) s
+            LEFT JOIN {daily_record_table} dr ON dr.user_id = s.user_id AND dr.date = s.date
+            GROUP BY s.user_id, s.date, s.income, s.expense
+            """
+        )
+        cursor.execute(f"ANALYZE {record_map}")
+
+        # 2. Totals of the existing DailyRecords
+        cursor.execute(
+            f"""
+            UPDATE {daily_record_table} AS dr
+            SET total_income = dr.total_income + m.income,
+                total_expense = dr.total_expense + m.expense,
+                updated_at = NOW()
+            FROM {record_map} m
+            WHERE dr.id = m.daily_record_id
+            """
+        )
+
+        # 3. DailyRecords for the unmapped pairs, created with their totals, ids written back
+        # to the map. Read from the map rather than anti-joining the records table inside the
+        # INSERT: planned against an empty table, that probe rescans the rows it inserts per row
+        cursor.execute(
+            f"""
+            WITH created AS (
+                INSERT INTO {daily_record_table} (user_id, date, total_income, total_expense, created_at, updated_at)
+                SELECT user_id, date, income, expense, NOW(), NOW()
+                FROM {record_map}
+                WHERE daily_record_id IS NULL
+                RETURNING id, user_id, date
+            )
+            UPDATE {record_map} m
+            SET daily_record_id = c.id
+            FROM created c
+            WHERE m.user_id = c.user_id AND m.date = c.date
+            """
+        )
+        daily_records_created = cursor.rowcount
+
+        # 4. User categories for names without a global or user category yet
+        # (see CategoryService: keys are lowercase, global categories first)
+        cursor.execute(
+            f"""
+            INSERT INTO {category_table} (user_id, key, name)
+            SELECT DISTINCT ON (s.user_id, lower(s.category)) s.user_id, lower(s.category), s.category
+            FROM {staging} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {category_table} c
+                WHERE c.key = lower(s.category) AND (c.user_id IS NULL OR c.user_id = s.user_id)
+            )
+            ORDER BY s.user_id, lower(s.category), s.category
+            ON CONFLICT DO NOTHING
+            """
+        )
+
+        # 5. (user, name) -> Category id
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {category_map} ON COMMIT DROP AS
+            SELECT s.user_id, s.category, COALESCE(g.id, c.id) AS category_id
+            FROM (SELECT DISTINCT user_id, category FROM {staging}) s
+            LEFT JOIN {category_table} g ON g.user_id IS NULL AND g.key = lower(s.category)
+            LEFT JOIN {category_table} c ON c.user_id = s.user_id AND c.key = lower(s.category)
+            """
+        )
+        cursor.execute(f"ANALYZE {category_map}")
+
+        # 6. Transactions
+        cursor.execute(
+            f"""
+            INSERT INTO {transaction_table} (daily_record_id, user_id, type, category_id, amount, date, created_at)
+            SELECT m.daily_record_id, s.user_id, s.type, cm.category_id, s.amount, s.date, NOW()
+            FROM {staging} s
+            JOIN {record_map} m ON m.user_id = s.user_id AND m.date = s.date
+            JOIN {category_map} cm ON cm.user_id = s.user_id AND cm.category = s.category
+            """
+        )
+        transactions_created = cursor.rowcount
+
+        # 7. Monthly rollup
+        cursor.execute(
+            f"""
+            INSERT INTO {summary_table} (user_id, year, month, type, category_id, total, count)
+            SELECT s.user_id,
+                   EXTRACT(YEAR FROM s.date)::int,
+                   EXTRACT(MONTH FROM s.date)::int,
+                   s.type,
+                   cm.category_id,
+                   SUM(s.amount),
+                   COUNT(*)
+            FROM {staging} s
+            JOIN {category_map} cm ON cm.user_id = s.user_id AND cm.category = s.category
+            GROUP BY 1, 2, 3, 4, 5
+            ON CONFLICT (user_id, year, month, type, category_id)
+            DO UPDATE SET total = {summary_table}.total + EXCLUDED.total,
+                          count = {summary_table}.count + EXCLUDED.count
+            """
+        )
+
+        return {
+            'daily_records_created': daily_records_created,
+            'transactions_created': transactions_created
+        }
+
+    @classmethod
+    def cache_deltas(cls, cursor) -> dict:
+        """
+        Returns: {(user_id, type): amount} of the staged rows, for TransactionCacheService
+        """
+        cursor.execute(f"SELECT user_id, type, SUM(amount) FROM {cls.STAGING_TABLE} GROUP BY 1, 2")
+        return {(user_id, type): amount for user_id, type, amount in cursor.fetchall()}
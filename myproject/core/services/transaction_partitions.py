@@ -0,0 +1,217 @@
+import re
+from datetime import date
+from django.db import connection, transaction
+from accounts.models import DailyRecord, Transaction, UserMonthlySummary
+from core.services.transaction_cache import TransactionCacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TransactionPartitionService:
+    """
+    Service class to manage the monthly range partitions of accounts_transaction
+    (see migration 0008_partition_transaction):
+    - ensure_partitions(): create the partitions of the coming months
+    - detach_partitions_before(): detach the partitions of months past retention and
+      archive_dependents(): drop what the application derived from their rows
+    Partitions are named accounts_transaction_pYYYY_MM; the default partition holds
+    rows without a date and rows of months that have no partition yet
+    """
+
+    PARENT_TABLE = Transaction._meta.db_table
+    DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+    BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+    @staticmethod
+    def month_start(year: int, month: int) -> date:
+        """First day of the month, normalizing month overflow (month 13 = January of year + 1)"""
+        year += (month - 1) // 12
+        month = (month - 1) % 12 + 1
+        return date(year, month, 1)
+
+    @classmethod
+    def partition_name(cls, month_start: date) -> str:
+        return f"{cls.PARENT_TABLE}_p{month_start:%Y_%m}"
+
+    @classmethod
+    def get_partitions(cls):
+        """
+        Get the attached range partitions, oldest first
+        Returns: list of (name, start, end), end exclusive
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = %s
+                """,
+                [cls.PARENT_TABLE]
+            )
+            rows = cursor.fetchall()
+
+        partitions = []
+        for name, bound in rows:
+            match = cls.BOUND_PATTERN.search(bound)
+            if match:
+                partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @classmethod
+    def create_partition(cls, month_start: date) -> bool:
+        """
+        Create the partition of one month, moving its rows out of the default partition
+        The partition is built detached and then attached, which only takes a
+        SHARE UPDATE EXCLUSIVE lock on the parent (reads and writes continue) and
+        briefly locks the default partition while it is checked
+        Returns: False if the month already has a partition
+        """
+        if any(start <= month_start < end for _, start, end in cls.get_partitions()):
+            return False
+
+        name = cls.partition_name(month_start)
+        month_end = cls.month_start(month_start.year, month_start.month + 1)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {cls.PARENT_TABLE} INCLUDING DEFAULTS)")
+            # Attaching fails while the default partition holds rows of the month
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {cls.DEFAULT_PARTITION}
+                    WHERE date >= %s AND date < %s
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """,
+                [month_start, month_end]
+            )
+            moved = cursor.rowcount
+            cursor.execute(
+                f"ALTER TABLE {cls.PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                [month_start, month_end]
+            )
+
+        logger.info(f"Created partition {name}" + (f", moved {moved} rows from the default partition" if moved else ""))
+        return True
+
+    @classmethod
+    def ensure_partitions(cls, months_ahead: int, today: date = None):
+        """
+        Create the missing partitions of the current month through `months_ahead` months ahead
+        Returns: names of the created partitions
+        """
+        today = today or date.today()
+        created = []
+        for offset in range(months_ahead + 1):
+            month_start = cls.month_start(today.year, today.month + offset)
+            if cls.create_partition(month_start):
+                created.append(cls.partition_name(month_start))
+        return created
+
+    @classmethod
+    def archive_dependents(cls, name: str, start: date, end: date):
+        """
+        Remove what the application derived from a detached partition's rows, so the
+        live tables only describe attached transactions (reconcile_daily_totals,
+        MonthlySummaryService.rebuild and cache recomputes all read accounts_transaction):
+        - the detached table's foreign keys, it is a standalone archive from now on
+        - the DailyRecords of [start, end) left without transactions, the totals of the
+          others (records keep their undated transactions in the default partition)
+        - the rollup rows of those months, the affected users' caches after commit
+        Returns: ids of the affected users
+        """
+        daily_record_table = DailyRecord._meta.db_table
+        summary_table = UserMonthlySummary._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                [name]
+            )
+            for constraint, in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+
+            cursor.execute(
+                f"""
+                DELETE FROM {daily_record_table} dr
+                WHERE dr.date >= %s AND dr.date < %s
+                  AND NOT EXISTS (SELECT 1 FROM {cls.PARENT_TABLE} t WHERE t.daily_record_id = dr.id)
+                RETURNING dr.user_id
+                """,
+                [start, end]
+            )
+            user_ids = {user_id for user_id, in cursor.fetchall()}
+            cursor.execute(
+                f"""
+                UPDATE {daily_record_table} dr
+                SET total_income = t.income, total_expense = t.expense, updated_at = NOW()
+                FROM (
+                    SELECT tx.daily_record_id,
+                           COALESCE(SUM(tx.amount) FILTER (WHERE tx.type = 'income'), 0) AS income,
+                           COALESCE(SUM(tx.amount) FILTER (WHERE tx.type = 'expense'), 0) AS expense
+                    FROM {cls.PARENT_TABLE} tx
+                    JOIN {daily_record_table} r ON r.id = tx.daily_record_id
+                    WHERE r.date >= %s AND r.date < %s
+                    GROUP BY tx.daily_record_id
+                ) t
+                WHERE dr.id = t.daily_record_id
+                RETURNING dr.user_id
+                """,
+                [start, end]
+            )
+            user_ids.update(user_id for user_id, in cursor.fetchall())
+            cursor.execute(
+                f"""
+                DELETE FROM {summary_table}
+                WHERE make_date(year, month, 1) >= %s AND make_date(year, month, 1) < %s
+                RETURNING user_id
+                """,
+                [start, end]
+            )
+            user_ids.update(user_id for user_id, in cursor.fetchall())
+
+            def invalidate_caches():
+                TransactionCacheService.invalidate_system_cache()
+                for user_id in user_ids:
+                    TransactionCacheService.invalidate_user_cache(user_id)
+            transaction.on_commit(invalidate_caches)
+
+        logger.info(f"Archived {name}: daily records and monthly summaries of {len(user_ids)} users updated")
+        return user_ids
+
+    @classmethod
+    def detach_partitions_before(cls, cutoff: date):
+        """
+        Detach the partitions whose months all end on or before `cutoff`, see archive_dependents()
+        Detached tables keep their rows: archive or drop them separately
+        Postgres 14+ detaches CONCURRENTLY when not inside a transaction
+        Returns: names of the detached partitions
+        """
+        concurrently = connection.pg_version >= 140000 and not connection.in_atomic_block
+        detached = []
+        for name, start, end in cls.get_partitions():
+            if end > cutoff:
+                break
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"ALTER TABLE {cls.PARENT_TABLE} DETACH PARTITION {name}{' CONCURRENTLY' if concurrently else ''}"
+                )
+            logger.info(f"Detached partition {name}")
+            cls.archive_dependents(name, start, end)
+            detached.append(name)
+        return detached
+
+    @classmethod
+    def maintain(cls, months_ahead: int, retention_months: int = 0, today: date = None):
+        """
+        Create the coming months' partitions and, with `retention_months`, detach
+        the partitions older than the current month and that many months before it
+        Returns: (created partition names, detached partition names)
+        """
+        today = today or date.today()
+        created = cls.ensure_partitions(months_ahead, today)
+        detached = []
+        if retention_months:
+            detached = cls.detach_partitions_before(cls.month_start(today.year, today.month - retention_months))
+        return created, detached
@@ -0,0 +1,77 @@
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+from core.services.request_metrics import RequestMetricsService
+
+def get_view_name(view_func, method: str) -> str:
+    """
+    Label of a resolved view: "DashboardView", "TransactionViewSet.monthly", "home"
+    """
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        # Viewsets route one view function to an action per HTTP method
+        return f"{cls.__name__}.{actions.get(method.lower(), method.lower())}"
+    return cls.__name__
+
+class RequestMetricsMiddleware:
+    """
+    Measure every request (DB queries and time, cache lookups, serializer time, total time),
+    emit them as a Server-Timing header and aggregate them per view for /metrics
+    Must be the first middleware, so the total includes the rest of the stack
+    Sync and async capable, so async views under ASGI do not fall back to a thread
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def wrap_connections(stack: ExitStack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics.db_wrapper))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics, token = RequestMetricsService.start()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            total = RequestMetricsService.finish(metrics, token)
+
+        response['Server-Timing'] = metrics.server_timing(total)
+        return response
+
+    async def __acall__(self, request):
+        metrics, token = RequestMetricsService.start()
+        try:
+            # Connections are per thread: wrap those of the thread that runs the
+            # request's async ORM calls (thread-sensitive sync_to_async)
+            stack = ExitStack()
+            await sync_to_async(self.wrap_connections)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            total = RequestMetricsService.finish(metrics, token)
+
+        response['Server-Timing'] = metrics.server_timing(total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'metrics_exempt', False):
+            return None
+        metrics = RequestMetricsService.current()
+        if metrics is not None:
+            metrics.view = get_view_name(view_func, request.method)
+        return None
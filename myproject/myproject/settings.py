@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 from decouple import config
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +32,23 @@ ALLOWED_HOSTS = []
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'django-db' # django-celery-results to store results
 CELERY_TASK_RESULT_EXPIRES = 60 * 60 * 24  # 24 hours
+CELERY_BEAT_SCHEDULE = {
+    # Previous month's report for every user, fanned out in chunks
+    'send-monthly-reports': {
+        'task': 'accounts.tasks.send_monthly_reports',
+        'schedule': crontab(minute=0, hour=6, day_of_month=1),
+    },
+    # Create the coming months' transaction partitions, detach the expired ones
+    'manage-transaction-partitions': {
+        'task': 'accounts.tasks.manage_transaction_partitions',
+        'schedule': crontab(minute=30, hour=3),
+    },
+}
+
+# Monthly partitions of accounts_transaction (manage.py manage_transaction_partitions)
+TRANSACTION_PARTITION_MONTHS_AHEAD = config('TRANSACTION_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+# 0 keeps every partition attached
+TRANSACTION_PARTITION_RETENTION_MONTHS = config('TRANSACTION_PARTITION_RETENTION_MONTHS', default=0, cast=int)
 # Application definition
 
 INSTALLED_APPS = [
@@ -50,7 +68,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -58,6 +76,7 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'myproject.middleware.RequestMetricsMiddleware',  # First, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -103,6 +122,33 @@ DATABASES = {
     }
 }
 
+# Cache
+# Redis when REDIS_CACHE_URL is set, otherwise Django's local-memory cache
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+CACHE_TTL = 60 * 60  # 1 hour
+CACHE_STALE_TTL = 5 * 60  # stale values served while one worker refreshes them
+# Token -> user lookups: cached in Redis, and in each process for a short time
+# (another process's LRU only drops a deleted token or deactivated user on expiry)
+AUTH_TOKEN_CACHE_TTL = 5 * 60
+AUTH_TOKEN_LOCAL_TTL = 30
+# Category name -> id lookups, kept in each process (a category deleted by another
+# process stays resolvable here until its entry expires)
+CATEGORY_CACHE_TTL = 60
+# monthly/daily-expenses responses, keyed by the user's data version (writes move to new keys)
+MONTH_CACHE_CURRENT_TTL = 60
+MONTH_CACHE_PAST_TTL = 30 * 24 * 60 * 60  # Bounded so keys orphaned by later writes expire
+
+# /metrics: scraped with "Authorization: Bearer <METRICS_TOKEN>", or viewed by a staff session.
+# Empty: staff only
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
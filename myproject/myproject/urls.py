@@ -16,10 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from myproject.views import home
+from myproject.views import home, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', home),  # Trang chủ
+    path('metrics', metrics, name='metrics'),  # Prometheus scrape endpoint
     path('api/', include('accounts.urls')), # Đăng ký
 ]
@@ -1,4 +1,23 @@
-from django.http import HttpResponse
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from core.services.request_metrics import RequestMetricsService
 
 def home(request):
     return HttpResponse("Hello, Django!")
+
+def metrics_authorized(request) -> bool:
+    """Staff sessions, or the scraper's METRICS_TOKEN bearer token"""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+def metrics(request):
+    """Prometheus scrape endpoint of the per-view request metrics"""
+    if not metrics_authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(RequestMetricsService.render(), content_type=RequestMetricsService.CONTENT_TYPE)
+
+metrics.metrics_exempt = True
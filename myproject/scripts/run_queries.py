@@ -45,8 +45,15 @@ def analyze_query_performance(query, description):
         return None
 
 def main():
-    # Get a test user with data
-    user = CustomUser.objects.get(id=2468)  # Using user with known data
+    # Get a test user with data: the id given on the command line, else the first user with records
+    # For latency tracking use `manage.py benchmark_api` instead
+    if len(sys.argv) > 1:
+        user = CustomUser.objects.get(id=int(sys.argv[1]))
+    else:
+        user = CustomUser.objects.filter(daily_records__isnull=False).order_by('id').first()
+        if user is None:
+            logger.error("No user with daily records, generate data with `manage.py generate_fake_data`")
+            return
     logger.info(f"Using user: {user.username} (ID: {user.id})")
 
     # Set date range for analysis
@@ -49,13 +49,13 @@ def get_database_stats():
     
     # Transactions by Category
     print("\nTransactions by Category:")
-    category_stats = Transaction.objects.values('category').annotate(
+    category_stats = Transaction.objects.values('category__name').annotate(
         count=Count('id'),
         total=Sum('amount')
     ).order_by('-count')
     
     for stat in category_stats:
-        print(f"{stat['category']}: {stat['count']:,} transactions, Total: ${stat['total']:,.2f}")
+        print(f"{stat['category__name']}: {stat['count']:,} transactions, Total: ${stat['total']:,.2f}")
     
     # Database Size
     with connection.cursor() as cursor: